@@ -0,0 +1,347 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from forecast import (
+    INPUT_PATH, INPUT_COLUMNS, INPUT_DTYPES, MEASURES, CHANGEPOINTS,
+    CONFIDENCE_INTERVAL, CV_INITIAL, CV_PERIOD, CV_HORIZON, FORECAST_SEED,
+    build_monthly_totals, build_model
+)
+
+# ── Logging ───────────────────────────────────────────────────────────────────
+# force=True — importing forecast.py has already configured its own log file
+os.makedirs('pca_data/logs', exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('pca_data/logs/backtest.log'),
+        logging.StreamHandler()
+    ],
+    force=True
+)
+logger = logging.getLogger(__name__)
+
+# ── File Paths ────────────────────────────────────────────────────────────────
+REPORT_PATH = 'pca_data/backtest_report.csv'   # ranked grid, one row per setting
+CACHE_DIR   = 'pca_data/backtest'              # one JSON file per fitted cutoff
+
+# ── Backtest Configuration ────────────────────────────────────────────────────
+# Every combination is backtested for every measure in forecast.MEASURES.
+# changepoints=None lets Prophet place changepoints itself; CHANGEPOINTS is
+# the explicit 2022 genericisation break forecast.py uses.
+GRID = {
+    'changepoint_prior_scale': [0.01, 0.05, 0.10, 0.30, 0.50],
+    'seasonality_mode'       : ['additive', 'multiplicative'],
+    'changepoints'           : [CHANGEPOINTS, None],
+}
+
+# Worker processes — each task is one (measure, setting, cutoff) fit
+BACKTEST_WORKERS = os.cpu_count() or 1
+
+# Settings shown per measure in the console summary
+TOP_N = 5
+
+
+def generate_cutoffs(monthly, initial=CV_INITIAL, period=CV_PERIOD, horizon=CV_HORIZON):
+    """
+    Walk-forward cutoff dates, as Prophet's cross_validation would choose them.
+
+    Args:
+        monthly : DataFrame with a ds column
+        initial, period, horizon : Prophet-style durations ('730 days')
+
+    Returns:
+        List of pd.Timestamp cutoffs, earliest first
+    """
+    from prophet.diagnostics import generate_cutoffs as prophet_cutoffs
+
+    return list(prophet_cutoffs(
+        monthly[['ds']],
+        horizon = pd.Timedelta(horizon),
+        initial = pd.Timedelta(initial),
+        period  = pd.Timedelta(period)
+    ))
+
+
+def grid_settings():
+    """Every combination in GRID as a list of dicts."""
+    keys = list(GRID)
+    return [dict(zip(keys, values)) for values in product(*GRID.values())]
+
+
+def task_cache_path(train_df, test_df, settings):
+    """
+    Cache file for one cutoff fit.
+
+    The key hashes the training series, the holdout actuals, the settings
+    and the Prophet version — so a cutoff is only refitted when its data
+    or configuration changes.
+    """
+    import prophet
+
+    key = json.dumps({
+        'settings'      : settings,
+        'interval_width': CONFIDENCE_INTERVAL,
+        'prophet'       : prophet.__version__,
+    }, sort_keys=True)
+    digest = hashlib.sha256(
+        train_df.to_csv(index=False).encode()
+        + test_df.to_csv(index=False).encode()
+        + key.encode()
+    ).hexdigest()[:24]
+    return os.path.join(CACHE_DIR, f'{digest}.json')
+
+
+def cutoff_changepoints(changepoints, train_df, cutoff):
+    """
+    Explicit changepoints a fit on the data up to a cutoff can use.
+
+    Changepoints outside the training window are dropped — the model cannot
+    know about a break it has not seen yet. When none is left the fit falls
+    back to Prophet's own changepoints (None) rather than an empty list,
+    which would fit a single straight trend.
+
+    Args:
+        changepoints : list of date strings, or None for automatic placement
+        train_df     : training rows (ds, y) up to the cutoff
+        cutoff       : pd.Timestamp
+
+    Returns:
+        List of date strings, or None
+    """
+    if changepoints is None:
+        return None
+
+    kept = [
+        point for point in changepoints
+        if train_df['ds'].min() < pd.Timestamp(point) < cutoff
+    ]
+    return kept or None
+
+
+def backtest_cutoff(task):
+    """
+    Fit one setting on the data up to a cutoff and predict the horizon after it.
+
+    Explicit changepoints are narrowed to the training window by
+    cutoff_changepoints(); the cache key uses the changepoints actually fitted.
+
+    Args:
+        task : tuple of (prophet_df, settings, cutoff, horizon)
+
+    Returns:
+        tuple of (cache file path, DataFrame with ds, y, yhat, yhat_lower,
+        yhat_upper for the horizon)
+    """
+    prophet_df, settings, cutoff, horizon = task
+
+    train_df = prophet_df[prophet_df['ds'] <= cutoff]
+    test_df  = prophet_df[
+        (prophet_df['ds'] > cutoff) & (prophet_df['ds'] <= cutoff + pd.Timedelta(horizon))
+    ]
+
+    settings   = {**settings, 'changepoints': cutoff_changepoints(settings['changepoints'], train_df, cutoff)}
+    cache_path = task_cache_path(train_df, test_df, settings)
+    if os.path.exists(cache_path):
+        return cache_path, pd.read_json(cache_path, orient='records', convert_dates=['ds'])
+
+    model = build_model(
+        settings['changepoint_prior_scale'],
+        seasonality_mode = settings['seasonality_mode'],
+        changepoints     = settings['changepoints']
+    )
+    model.fit(train_df)
+
+    np.random.seed(FORECAST_SEED)
+    predicted = model.predict(test_df[['ds']])
+
+    result = test_df.reset_index(drop=True).assign(
+        yhat       = predicted['yhat'].to_numpy(),
+        yhat_lower = predicted['yhat_lower'].to_numpy(),
+        yhat_upper = predicted['yhat_upper'].to_numpy(),
+    )
+
+    # Written to a temporary file and renamed — workers never see half a file
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    result.to_json(tmp_path, orient='records', date_format='iso', double_precision=15)
+    os.replace(tmp_path, cache_path)
+
+    return cache_path, result
+
+
+def prune_cache(used_paths):
+    """
+    Delete cached cutoff fits that the latest run did not use.
+
+    Cache keys include the data, so every change to the staged series
+    leaves the previous run's files behind; temporary files from
+    interrupted workers are removed too.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    used    = {os.path.abspath(path) for path in used_paths}
+    removed = 0
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.abspath(os.path.join(CACHE_DIR, name))
+        if name.endswith(('.json', '.tmp')) and path not in used:
+            os.remove(path)
+            removed += 1
+
+    if removed:
+        logger.info(f"Pruned {removed} stale cache file(s) from {CACHE_DIR}")
+
+
+def run_backtest(monthly, workers=BACKTEST_WORKERS):
+    """
+    Backtest every GRID setting for every measure across all cutoffs.
+
+    All (measure, setting, cutoff) fits are independent and are spread over
+    a process pool; cached cutoffs return without fitting. Results are
+    collected in submission order, so the report does not depend on the
+    worker count. Cached fits not used by this run are pruned afterwards.
+
+    MAPE and coverage come from Prophet's performance_metrics() over the
+    pooled cutoffs, averaged across horizons — the definition
+    forecast.validate_model() reports, so the current setting's MAPE here
+    matches the one forecast.py prints. auto_cutoffs counts the cutoffs a
+    setting with explicit changepoints fitted with Prophet's own instead,
+    because its training window held none of them.
+
+    Args:
+        monthly : DataFrame from build_monthly_totals()
+        workers : number of worker processes (1 = serial, in this process)
+
+    Returns:
+        Ranked report DataFrame — one row per measure and setting
+    """
+    from prophet.diagnostics import performance_metrics
+
+    cutoffs  = generate_cutoffs(monthly)
+    settings = grid_settings()
+    logger.info(
+        f"Backtesting {len(MEASURES)} measures × {len(settings)} settings × "
+        f"{len(cutoffs)} cutoffs ({cutoffs[0]:%Y-%m} to {cutoffs[-1]:%Y-%m}) "
+        f"on {workers} worker(s)..."
+    )
+
+    keys  = []
+    tasks = []
+    for target_col, label, _ in MEASURES:
+        prophet_df = monthly[['ds', target_col]].rename(columns={target_col: 'y'})
+        for index, setting in enumerate(settings):
+            for cutoff in cutoffs:
+                keys.append((label, index, cutoff))
+                tasks.append((prophet_df, setting, cutoff, CV_HORIZON))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(backtest_cutoff, tasks, chunksize=4))
+    else:
+        results = [backtest_cutoff(task) for task in tasks]
+
+    prune_cache([cache_path for cache_path, _ in results])
+
+    # Pool the holdout predictions of every cutoff per measure and setting,
+    # in the layout cross_validation() returns, and count the cutoffs whose
+    # training window holds none of the setting's explicit changepoints
+    pooled    = {}
+    automatic = {}
+    for (label, index, cutoff), (_, result) in zip(keys, results):
+        pooled.setdefault((label, index), []).append(result.assign(cutoff=cutoff))
+        train_df = monthly[monthly['ds'] <= cutoff]
+        explicit = settings[index]['changepoints']
+        automatic[(label, index)] = automatic.get((label, index), 0) + (
+            explicit is not None and cutoff_changepoints(explicit, train_df, cutoff) is None
+        )
+
+    configured = {label: scale for _, label, scale in MEASURES}
+    rows = []
+    for (label, index), parts in pooled.items():
+        setting = settings[index]
+        metrics = performance_metrics(pd.concat(parts, ignore_index=True))
+
+        rows.append({
+            'measure'                : label,
+            'changepoint_prior_scale': setting['changepoint_prior_scale'],
+            'seasonality_mode'       : setting['seasonality_mode'],
+            'changepoints'           : ','.join(setting['changepoints']) if setting['changepoints'] else 'auto',
+            'cutoffs'                : len(parts),
+            'auto_cutoffs'           : automatic[(label, index)],
+            'mape'                   : round(metrics['mape'].mean() * 100, 2),
+            'coverage'               : round(metrics['coverage'].mean() * 100, 1),
+            'current'                : (
+                setting['changepoint_prior_scale'] == configured[label]
+                and setting['seasonality_mode'] == 'additive'
+                and setting['changepoints'] == CHANGEPOINTS
+            ),
+        })
+
+    report = pd.DataFrame(rows).sort_values(['measure', 'mape'], kind='stable')
+    report.insert(1, 'rank', report.groupby('measure').cumcount() + 1)
+    return report.reset_index(drop=True)
+
+
+def print_backtest_summary(report):
+    """Print the best settings per measure and where forecast.py's current setting ranks."""
+    print()
+    print("=" * 90)
+    print("BACKTEST SUMMARY — ranked by MAPE across all cutoffs")
+    print("=" * 90)
+
+    for label, ranked in report.groupby('measure', sort=False):
+        print(f"\n{label}")
+        print(f"{'Rank':>4}  {'Scale':>6}  {'Seasonality':<15}{'Changepoints':<14}{'MAPE %':>8}{'Coverage %':>12}")
+        shown = pd.concat([ranked.head(TOP_N), ranked[ranked['current']]]).drop_duplicates()
+        for _, row in shown.iterrows():
+            print(
+                f"{row['rank']:>4}  "
+                f"{row['changepoint_prior_scale']:>6.2f}  "
+                f"{row['seasonality_mode']:<15}"
+                f"{row['changepoints']:<14}"
+                f"{row['mape']:>8.2f}"
+                f"{row['coverage']:>12.1f}"
+                f"{'   ← current' if row['current'] else ''}"
+            )
+
+    print("=" * 90)
+
+
+def main():
+    logger.info("=" * 60)
+    logger.info("NHS PCA BACKTEST — STARTING")
+    logger.info(f"Input  : {INPUT_PATH}")
+    logger.info(f"Report : {REPORT_PATH}")
+    logger.info(f"Cache  : {CACHE_DIR}")
+    logger.info("=" * 60)
+
+    if not os.path.exists(INPUT_PATH):
+        raise FileNotFoundError(
+            f"Staged file not found: {INPUT_PATH}\n"
+            f"Run processor.py first to generate this file."
+        )
+
+    df      = pd.read_csv(INPUT_PATH, usecols=INPUT_COLUMNS, dtype=INPUT_DTYPES)
+    monthly = build_monthly_totals(df)
+
+    report = run_backtest(monthly)
+    report.to_csv(REPORT_PATH, index=False)
+    logger.info(f"Backtest report saved: {len(report):,} rows → {REPORT_PATH}")
+
+    print_backtest_summary(report)
+
+    logger.info("=" * 60)
+    logger.info("BACKTEST COMPLETE")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import sqlite3
+import sys
+import logging
+import re
+import os
+import mysql.connector
+from dotenv import load_dotenv
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# DATABASE BACKENDS
+
+# loader.py and the queries in sql/analysis.sql were written for MySQL, which
+# needs a running server and a configured .env before anything can be loaded
+# or queried. For local re-runs and benchmarks the same star schema can live
+# in an embedded SQLite file instead (DB_BACKEND=sqlite).
+#
+# The SQLite backend is a drop-in for a mysql.connector connection:
+#   1. SCHEMA   — sql/schema.sql, forecast.sql and rollups.sql are
+#                 translated to SQLite DDL and applied on connect, so the
+#                 tables always exist. Nothing has to be run by hand first.
+#   2. DIALECT  — every statement the loader sends is rewritten on the fly
+#                 (%s placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE,
+#                 NOW()), so the load functions are unchanged.
+#   3. ERRORS   — sqlite3 errors are re-raised as mysql.connector errors,
+#                 so the loader's existing error handling still applies.
+#
+# MySQL-only load paths (LOAD DATA LOCAL INFILE, the connection pool) are
+# switched off by loader.py when the SQLite backend is selected.
+
+load_dotenv()
+
+# 'mysql' (default) or 'sqlite'
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').strip().lower()
+
+# SQLite database file — created on first connect
+SQLITE_PATH = os.getenv('DB_SQLITE_PATH', 'pca_data/nhs_prescribing.db')
+
+MYSQL_CONFIG = {
+    'host'    : os.getenv('DB_HOST'),
+    'port'    : int(os.getenv('DB_PORT', 3306)),
+    'user'    : os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME'),
+}
+
+# DDL applied automatically by the SQLite backend, in order
+SCHEMA_FILES  = ['sql/schema.sql', 'sql/forecast.sql', 'sql/rollups.sql']
+ANALYSIS_PATH = 'sql/analysis.sql'
+
+# MySQL statements with no SQLite equivalent — skipped when applying scripts
+SKIPPED_STATEMENTS = ('CREATE DATABASE', 'USE ', 'SHOW ')
+
+
+# SQL SCRIPTS
+
+def split_statements(script):
+    """
+    Split a .sql script into (title, statement) pairs.
+
+    Line comments are dropped; the last '-- N.N Title' heading seen before a
+    statement becomes its title (None when there is none), which labels
+    the result sets of analysis.sql.
+
+    Parameters
+    ----------
+    script : str — contents of a .sql file
+
+    Returns
+    -------
+    list of (str or None, str)
+    """
+    statements = []
+    title      = None
+    current    = []
+
+    for line in script.splitlines():
+        stripped = line.strip()
+        heading  = re.match(r'--\s*(\d+\.\d+\s+[A-Z].*)', stripped)
+        if heading:
+            title = heading.group(1).strip()
+        if stripped.startswith('--'):
+            continue
+
+        current.append(re.sub(r'\s--\s.*$', '', line))
+        if stripped.endswith(';'):
+            statement = '\n'.join(current).strip().rstrip(';').strip()
+            if statement:
+                statements.append((title, statement))
+            current = []
+
+    return statements
+
+
+def _split_columns(body):
+    """Split a CREATE TABLE body on commas that are not inside parentheses."""
+    items, depth, current = [], 0, ''
+    for char in body:
+        depth += (char == '(') - (char == ')')
+        if char == ',' and depth == 0:
+            items.append(current.strip())
+            current = ''
+        else:
+            current += char
+    items.append(current.strip())
+    return [item for item in items if item]
+
+
+def sqlite_ddl(statement):
+    """
+    Translate one MySQL CREATE TABLE statement to SQLite.
+
+    AUTO_INCREMENT keys become INTEGER PRIMARY KEY AUTOINCREMENT, UNIQUE KEY
+    becomes a table constraint, inline INDEX entries become separate
+    CREATE INDEX statements, and table options (ENGINE, CHARSET, COMMENT)
+    are dropped. DECIMAL columns become REAL — SQLite's NUMERIC affinity
+    would store whole amounts as integers and turn ratios of them into
+    integer division. Other statements are returned unchanged.
+
+    Parameters
+    ----------
+    statement : str — one statement from split_statements()
+
+    Returns
+    -------
+    list of str — SQLite statements
+    """
+    match = re.match(
+        r'CREATE TABLE IF NOT EXISTS\s+(\w+)\s*\(', statement, re.IGNORECASE
+    )
+    if not match:
+        return [statement]
+
+    table = match.group(1)
+
+    # Body up to the matching parenthesis — table options after it are dropped
+    depth = 1
+    for end in range(match.end(), len(statement)):
+        depth += (statement[end] == '(') - (statement[end] == ')')
+        if depth == 0:
+            break
+    body = statement[match.end() : end]
+
+    columns, indexes, autoincrement = [], [], None
+
+    for item in _split_columns(body):
+        upper = item.upper()
+
+        auto = re.match(r'(`?\w+`?)\s+INT\b.*\bAUTO_INCREMENT\b', item, re.IGNORECASE)
+        if auto:
+            autoincrement = auto.group(1).strip('`')
+            columns.append(f"{auto.group(1)} INTEGER PRIMARY KEY AUTOINCREMENT")
+        elif upper.startswith('PRIMARY KEY') and autoincrement and \
+                re.fullmatch(r'PRIMARY KEY\s*\(\s*`?' + autoincrement + r'`?\s*\)', item, re.IGNORECASE):
+            continue
+        elif upper.startswith('UNIQUE KEY'):
+            columns.append(re.sub(r'UNIQUE KEY\s+\w+\s*', 'UNIQUE ', item, flags=re.IGNORECASE))
+        elif upper.startswith(('INDEX ', 'KEY ')):
+            name, cols = re.match(r'(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))', item, re.IGNORECASE).groups()
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {cols}")
+        else:
+            columns.append(re.sub(r'\bDECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)', 'REAL', item, flags=re.IGNORECASE))
+
+    create = f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ',\n    '.join(columns) + "\n)"
+    return [create] + indexes
+
+
+def sqlite_statement(sql):
+    """
+    Rewrite one MySQL DML statement in SQLite dialect.
+
+    Handles %s placeholders, INSERT IGNORE, NOW() and
+    ON DUPLICATE KEY UPDATE col = VALUES(col) (as an ON CONFLICT upsert).
+    """
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\bINSERT IGNORE\b', 'INSERT OR IGNORE', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bNOW\(\)', 'CURRENT_TIMESTAMP', sql, flags=re.IGNORECASE)
+
+    upsert = re.search(r'\bON DUPLICATE KEY UPDATE\b', sql, re.IGNORECASE)
+    if upsert:
+        head, tail = sql[: upsert.start()], sql[upsert.end() :]
+        # INSERT ... SELECT needs a WHERE before ON CONFLICT to parse
+        if re.search(r'\bSELECT\b', head, re.IGNORECASE) and \
+                not re.search(r'\bWHERE\b', head, re.IGNORECASE):
+            head = head.rstrip() + '\n    WHERE true\n'
+        tail = re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', tail, flags=re.IGNORECASE)
+        sql  = head + 'ON CONFLICT DO UPDATE SET' + tail
+
+    return sql
+
+
+# SQLITE BACKEND
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3 that accepts MySQL dialect."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, sql, params=None):
+        try:
+            self._cursor.execute(sqlite_statement(sql), params or ())
+        except sqlite3.Error as e:
+            raise mysql.connector.DatabaseError(msg=str(e)) from e
+
+    def executemany(self, sql, rows):
+        try:
+            self._cursor.executemany(sqlite_statement(sql), rows)
+        except sqlite3.Error as e:
+            raise mysql.connector.DatabaseError(msg=str(e)) from e
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Embedded stand-in for a mysql.connector connection.
+
+    Opens (or creates) the SQLite file and applies SCHEMA_FILES, so the
+    star schema and forecast table exist before anything is loaded.
+    """
+
+    def __init__(self, path=SQLITE_PATH, schema_files=SCHEMA_FILES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path  = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        for schema_path in schema_files:
+            self.apply_script(schema_path)
+
+    def apply_script(self, path):
+        """Translate a MySQL .sql file and run it; CREATE ... IF NOT EXISTS keeps it idempotent."""
+        with open(path, encoding='utf-8') as f:
+            script = f.read()
+
+        for _, statement in split_statements(script):
+            if statement.upper().startswith(SKIPPED_STATEMENTS):
+                continue
+            for translated in sqlite_ddl(statement):
+                self._conn.execute(translated)
+        self._conn.commit()
+
+    def cursor(self, **kwargs):
+        return SQLiteCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(backend=DB_BACKEND, **mysql_config):
+    """
+    Open a connection on the configured backend.
+
+    Parameters
+    ----------
+    backend      : str  — 'mysql' or 'sqlite'
+    mysql_config : dict — mysql.connector.connect() arguments (MySQL only)
+
+    Returns
+    -------
+    mysql.connector connection or SQLiteConnection
+    """
+    if backend == 'sqlite':
+        return SQLiteConnection()
+    if backend == 'mysql':
+        return mysql.connector.connect(**(mysql_config or MYSQL_CONFIG))
+    raise ValueError(f"Unknown DB_BACKEND '{backend}' — expected 'mysql' or 'sqlite'.")
+
+
+# ANALYSIS QUERIES
+
+def run_analysis(conn, path=ANALYSIS_PATH):
+    """
+    Run every query in analysis.sql on an open connection.
+
+    Parameters
+    ----------
+    conn : connection from connect()
+    path : str — .sql file of SELECT queries
+
+    Returns
+    -------
+    list of (str, pd.DataFrame) — query heading and its result
+    """
+    with open(path, encoding='utf-8') as f:
+        statements = split_statements(f.read())
+
+    results = []
+    cursor  = conn.cursor()
+    for title, statement in statements:
+        if statement.upper().startswith(SKIPPED_STATEMENTS):
+            continue
+        cursor.execute(statement)
+        columns = [column[0] for column in cursor.description]
+        results.append((title, pd.DataFrame(cursor.fetchall(), columns=columns)))
+    cursor.close()
+
+    return results
+
+
+def main():
+    # Optional argument: another query file, e.g. sql/analysis_rollups.sql
+    path = sys.argv[1] if len(sys.argv) > 1 else ANALYSIS_PATH
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger.info(f"Running {path} on the {DB_BACKEND} backend...")
+
+    conn = connect()
+    try:
+        for title, result in run_analysis(conn, path):
+            print(f"\n{title}")
+            print(result.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import pandas as pd
 import numpy as np
 import os
+import re
+import json
+import hashlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 os.makedirs('pca_data/logs', exist_ok=True)
@@ -19,11 +23,64 @@ logger = logging.getLogger(__name__)
 # ── File Paths ────────────────────────────────────────────────────────────────
 INPUT_PATH  = 'pca_data/staged_pca_data.csv'  # output of processor.py
 OUTPUT_PATH = 'pca_data/forecast.csv'         # input to loader.py
+DETAIL_OUTPUT_PATH = 'pca_data/forecast_detail.csv'  # drug x region forecasts, input to loader.py
+
+# Only these staged columns are needed for national totals. YEAR_MONTH is
+# read as a categorical — each month repeats on every drug-region row.
+INPUT_COLUMNS = ['YEAR_MONTH', 'ITEMS', 'NIC']
+INPUT_DTYPES  = {'YEAR_MONTH': 'category'}
+
+# Extra columns read when FORECAST_DETAIL is on
+DETAIL_COLUMNS = ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE']
+DETAIL_DTYPES  = {'REGION_NAME': 'category', 'BNF_CHEMICAL_SUBSTANCE': 'category'}
 
 # ── Forecast Configuration ────────────────────────────────────────────────────
 FORECAST_PERIODS   = 12      # number of months to forecast ahead
 CONFIDENCE_INTERVAL = 0.80   # 80% confidence interval — matches Power BI template
 
+# Measures forecast: (target column, label, changepoint_prior_scale).
+# Items uses conservative changepoint scale — trend is smooth and steady.
+# NIC and CPI use higher scale — the 2022 genericisation was a sharp break.
+MEASURES = [
+    ('total_items', 'Items',         0.05),
+    ('total_nic',   'Cost (NIC)',    0.30),
+    ('total_cpi',   'Cost Per Item', 0.30),
+]
+
+# Batch mode: also forecast every drug × region series (several hundred
+# extra Prophet fits) and reconcile them to the national forecasts above,
+# written to DETAIL_OUTPUT_PATH. Off by default; loading the output needs the
+# forecast_detail table from sql/forecast.sql. Only the additive measures
+# (items and NIC) are forecast per series — cost per item is a ratio and
+# does not sum across series.
+FORECAST_DETAIL = False
+DETAIL_MEASURES = [measure for measure in MEASURES if measure[0] in ('total_items', 'total_nic')]
+
+# Structural break marked explicitly for every model — the Sertraline
+# genericisation in January 2022
+CHANGEPOINTS = ['2022-01-01']
+
+# Cross-validation: train on first 24 months, step 6 months, predict 6 months ahead
+CV_INITIAL = '730 days'
+CV_PERIOD  = '180 days'
+CV_HORIZON = '180 days'
+
+# Worker processes for the independent per-measure fits.
+# 1 runs them one after another in this process.
+FORECAST_WORKERS = os.cpu_count() or 1
+
+# Prophet draws its uncertainty intervals from numpy's global random state.
+# It is reseeded before every final prediction, so forecast.csv is identical
+# whatever the worker count, the order fits finish in, or whether the model
+# came from the cache.
+FORECAST_SEED = 42
+
+# Fitted models are cached here as Prophet JSON, keyed by a hash of the input
+# series and every setting that affects the fit or its MAPE. A rerun on
+# unchanged staged data loads them instead of fitting.
+MODEL_CACHE_DIR = 'pca_data/models'
+USE_MODEL_CACHE = True
+
 
 def build_monthly_totals(df):
     """
@@ -31,12 +88,13 @@ def build_monthly_totals(df):
     The staged data is at drug-region-month level — we sum across all drugs
     and regions to get the national monthly total for items and cost (NIC).
     """
-    monthly = df.groupby('YEAR_MONTH', as_index=False).agg(
+    monthly = df.groupby('YEAR_MONTH', as_index=False, observed=True).agg(
         total_items=('ITEMS', 'sum'),
         total_nic  =('NIC',   'sum')
     )
 
     # Convert YEAR_MONTH string (2021-01) to datetime for Prophet
+    monthly['YEAR_MONTH'] = monthly['YEAR_MONTH'].astype(str)
     monthly['ds'] = pd.to_datetime(monthly['YEAR_MONTH'])
     monthly = monthly.sort_values('ds').reset_index(drop=True)
 
@@ -47,46 +105,124 @@ def build_monthly_totals(df):
     return monthly
 
 
-def fit_and_forecast(monthly, target_col, label, changepoint_scale):
+def build_model(changepoint_scale, seasonality_mode='additive', changepoints=CHANGEPOINTS):
     """
-    Fit a Prophet model on a single target column and generate a forecast.
-
-    Args:
-        monthly           : DataFrame with ds and the target column
-        target_col        : Column name to forecast (total_items, total_nic, total_cpi)
-        label             : Human-readable label for logging
-        changepoint_scale : Prophet changepoint_prior_scale — higher = more flexible
-
-    Returns:
-        DataFrame with ds, yhat, yhat_lower, yhat_upper columns
+    Create an unfitted Prophet model with the pipeline's settings.
+    seasonality_mode and changepoints are only overridden by backtest.py.
+
+    yearly_seasonality=True — captures annual prescribing patterns (e.g. March surge)
+    weekly/daily seasonality=False — data is monthly, not daily/weekly
+    interval_width — 80% CI
+    changepoints — explicitly marks the Sertraline genericisation structural
+    break so Prophet models it cleanly rather than auto-detecting it.
     """
     from prophet import Prophet
 
-    # Prepare Prophet input — requires exactly two columns: ds and y
-    prophet_df = monthly[['ds', target_col]].rename(columns={target_col: 'y'})
-
-    # Initialise model
-    # yearly_seasonality=True — captures annual prescribing patterns (e.g. March surge)
-    # weekly/daily seasonality=False — data is monthly, not daily/weekly
-    # interval_width — 80% CI
-    # changepoints=['2022-01-01'] — explicitly marks the Sertraline genericisation
-    # structural break so Prophet models it cleanly rather than auto-detecting it.
-    model = Prophet(
+    return Prophet(
         yearly_seasonality      =True,
         weekly_seasonality      =False,
         daily_seasonality       =False,
         changepoint_prior_scale =changepoint_scale,
         interval_width          =CONFIDENCE_INTERVAL,
-        seasonality_mode        ='additive',
-        changepoints            =['2022-01-01']
+        seasonality_mode        =seasonality_mode,
+        changepoints            =changepoints
     )
 
-    # Fit
-    model.fit(prophet_df)
-    logger.info(f"  {label}: model fitted on {len(prophet_df)} months of data.")
 
+def model_cache_path(prophet_df, label, changepoint_scale):
+    """
+    Cache file for a model fitted on prophet_df with these settings.
+
+    The key hashes the series itself and every setting that changes the
+    fitted parameters or the cross-validated MAPE, plus the Prophet version.
+    """
+    import prophet
+
+    settings = {
+        'changepoint_prior_scale': changepoint_scale,
+        'interval_width'         : CONFIDENCE_INTERVAL,
+        'changepoints'           : CHANGEPOINTS,
+        'cv'                     : [CV_INITIAL, CV_PERIOD, CV_HORIZON],
+        'prophet'                : prophet.__version__,
+    }
+    digest = hashlib.sha256(
+        prophet_df.to_csv(index=False).encode()
+        + json.dumps(settings, sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    slug = re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+    return os.path.join(MODEL_CACHE_DIR, f'{slug}_{digest}.json')
+
+
+def load_cached_model(path):
+    """Return (model, mape) from a cache file, or None if it is missing or unreadable."""
+    from prophet.serialize import model_from_json
+
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            cached = json.load(f)
+        return model_from_json(cached['model']), cached['mape']
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"  Ignoring unreadable model cache {path}: {e}")
+        return None
+
+
+def save_cached_model(path, model, mape):
+    """
+    Write a fitted model and its MAPE to the cache, replacing older entries
+    for the same measure. Written to a temporary file and renamed, so a
+    crash never leaves a half-written model behind.
+    """
+    from prophet.serialize import model_to_json
+
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'model': model_to_json(model), 'mape': mape}, f)
+    os.replace(tmp_path, path)
+
+    slug = os.path.basename(path).rsplit('_', 1)[0]
+    for name in os.listdir(MODEL_CACHE_DIR):
+        if name.rsplit('_', 1)[0] == slug and name != os.path.basename(path):
+            os.remove(os.path.join(MODEL_CACHE_DIR, name))
+
+
+def validate_model(model, label):
+    """
+    Run walk-forward cross-validation on a fitted model and return the mean MAPE.
+    cross_validation refits copies of the model at each cutoff; the fitted
+    model itself is not changed.
+    Returns MAPE as a percentage (e.g. 2.1 means 2.1%).
+    """
+    from prophet.diagnostics import cross_validation, performance_metrics
+
+    cv_results = cross_validation(
+        model,
+        initial =CV_INITIAL,
+        period  =CV_PERIOD,
+        horizon =CV_HORIZON
+    )
+
+    metrics = performance_metrics(cv_results)
+    mape    = metrics['mape'].mean() * 100
+    logger.info(f"  {label} MAPE: {mape:.2f}%")
+    return round(mape, 2)
+
+
+def forecast_from_model(model, label):
+    """
+    Generate the forecast from a fitted model.
+
+    Returns:
+        DataFrame with ds, yhat, yhat_lower, yhat_upper columns
+    """
     # Generate future dates — monthly frequency, 12 months beyond the last data point
     future = model.make_future_dataframe(periods=FORECAST_PERIODS, freq='MS')
+
+    # Interval sampling is random — seed it so every run gives the same bounds
+    np.random.seed(FORECAST_SEED)
     forecast = model.predict(future)
 
     logger.info(f"  {label}: forecast generated for {FORECAST_PERIODS} months ahead.")
@@ -94,41 +230,255 @@ def fit_and_forecast(monthly, target_col, label, changepoint_scale):
     return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
 
 
-def validate_model(monthly, target_col, label, changepoint_scale):
+def forecast_measure(task):
     """
-    Run walk-forward cross-validation and return the mean MAPE.
-    Uses the last 12 months as a holdout — train on all prior months, predict 6 ahead.
-    Returns MAPE as a percentage (e.g. 2.1 means 2.1%).
+    Fit (or load), validate and forecast one measure — the unit of work
+    for run_models().
+
+    One model is fitted per measure and used for both cross-validation and
+    the final forecast. With USE_MODEL_CACHE an unchanged series loads the
+    fitted model and its MAPE from disk and skips fitting entirely.
+
+    Args:
+        task : tuple of (monthly, target_col, label, changepoint_scale),
+               optionally followed by validate (default True) — the
+               drug × region series skip cross-validation
+
+    Returns:
+        (mape, forecast DataFrame) — mape is None when not validated
     """
-    from prophet import Prophet
-    from prophet.diagnostics import cross_validation, performance_metrics
+    monthly, target_col, label, changepoint_scale, *options = task
+    validate = options[0] if options else True
 
+    # Prepare Prophet input — requires exactly two columns: ds and y
     prophet_df = monthly[['ds', target_col]].rename(columns={target_col: 'y'})
+    cache_path = model_cache_path(prophet_df, label, changepoint_scale)
+
+    cached = load_cached_model(cache_path) if USE_MODEL_CACHE else None
+    if cached is not None:
+        model, mape = cached
+        logger.info(
+            f"  {label}: fitted model{f' and MAPE ({mape:.2f}%)' if mape is not None else ''} "
+            f"loaded from cache."
+        )
+    else:
+        model = build_model(changepoint_scale)
+        model.fit(prophet_df)
+        logger.info(f"  {label}: model fitted on {len(prophet_df)} months of data.")
 
-    model = Prophet(
-        yearly_seasonality      =True,
-        weekly_seasonality      =False,
-        daily_seasonality       =False,
-        changepoint_prior_scale =changepoint_scale,
-        interval_width          =CONFIDENCE_INTERVAL,
-        seasonality_mode        ='additive',
-        changepoints            =['2022-01-01']
+        mape = validate_model(model, label) if validate else None
+        if USE_MODEL_CACHE:
+            save_cached_model(cache_path, model, mape)
+
+    return mape, forecast_from_model(model, label)
+
+
+def run_models(monthly, workers=FORECAST_WORKERS):
+    """
+    Fit, validate and forecast every measure in MEASURES, in parallel when
+    workers > 1.
+
+    The measures are independent, so with one process each the wall time
+    is roughly that of the slowest model. Results are collected in
+    submission order, so the output matches a serial run.
+
+    Args:
+        monthly : DataFrame from build_monthly_totals()
+        workers : number of worker processes (1 = serial, in this process)
+
+    Returns:
+        (mapes, forecasts) — lists aligned with MEASURES
+    """
+    tasks = [
+        (monthly, target_col, label, changepoint_scale)
+        for target_col, label, changepoint_scale in MEASURES
+    ]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(forecast_measure, tasks))
+    else:
+        results = [forecast_measure(task) for task in tasks]
+
+    mapes, forecasts = zip(*results)
+    return list(mapes), list(forecasts)
+
+
+def build_series_totals(df):
+    """
+    Aggregate staged data to one monthly series per drug × region.
+
+    Returns:
+        DataFrame with REGION_NAME, BNF_CHEMICAL_SUBSTANCE, ds, total_items, total_nic
+    """
+    series = df.groupby(
+        ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'YEAR_MONTH'], as_index=False, observed=True
+    ).agg(
+        total_items=('ITEMS', 'sum'),
+        total_nic  =('NIC',   'sum')
     )
+    series['ds'] = pd.to_datetime(series['YEAR_MONTH'].astype(str))
+    return series.sort_values(['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ds']).reset_index(drop=True)
 
-    model.fit(prophet_df)
 
-    # Cross-validate: train on first 24 months, step 6 months, predict 6 months ahead
-    cv_results = cross_validation(
-        model,
-        initial ='730 days',
-        period  ='180 days',
-        horizon ='180 days'
+def forecast_series(task):
+    """
+    Fit and forecast one drug × region series — the unit of work for
+    run_detail_models(). Uses forecast_measure() without cross-validation,
+    so series models are cached exactly like the national ones.
+
+    Args:
+        task : tuple of (region, drug, series) — series has ds and the
+               DETAIL_MEASURES columns
+
+    Returns:
+        DataFrame with ds and <measure>_forecast/_lower/_upper columns,
+        or None if Prophet could not fit the series (e.g. under 2 months)
+    """
+    region, drug, series = task
+
+    result = None
+    for target_col, label, changepoint_scale in DETAIL_MEASURES:
+        prefix = target_col.replace('total_', '')
+        try:
+            _, fc = forecast_measure(
+                (series, target_col, f'{label} {region} {drug}', changepoint_scale, False)
+            )
+        except ValueError as e:
+            logger.warning(f"  {region} / {drug}: skipped — {e}")
+            return None
+
+        fc = fc.rename(columns={
+            'yhat'      : f'{prefix}_forecast',
+            'yhat_lower': f'{prefix}_lower',
+            'yhat_upper': f'{prefix}_upper'
+        })
+        result = fc if result is None else result.merge(fc, on='ds')
+
+    return result
+
+
+def run_detail_models(series, workers=FORECAST_WORKERS):
+    """
+    Forecast every drug × region series across a process pool.
+
+    Series are independent, so runtime scales with the number of workers.
+    Results come back in submission order, so the output does not depend
+    on the worker count.
+
+    Returns:
+        Long DataFrame with REGION_NAME, BNF_CHEMICAL_SUBSTANCE, ds and the
+        unreconciled forecast columns — empty, with the same columns, when
+        no series could be fitted
+    """
+    tasks = [
+        (str(region), str(drug), group[['ds'] + [m[0] for m in DETAIL_MEASURES]])
+        for (region, drug), group in series.groupby(
+            ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'], observed=True, sort=True
+        )
+    ]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(forecast_series, tasks, chunksize=4))
+    else:
+        results = [forecast_series(task) for task in tasks]
+
+    forecasts = [
+        fc.assign(REGION_NAME=region, BNF_CHEMICAL_SUBSTANCE=drug)
+        for (region, drug, _), fc in zip(tasks, results)
+        if fc is not None
+    ]
+    logger.info(f"Drug × region forecasts: {len(forecasts)} of {len(tasks)} series fitted.")
+
+    if not forecasts:
+        logger.warning("No drug × region series could be fitted — the detail forecast is empty.")
+        columns = [
+            f"{target_col.replace('total_', '')}_{suffix}"
+            for target_col, _, _ in DETAIL_MEASURES
+            for suffix in ('forecast', 'lower', 'upper')
+        ]
+        return pd.DataFrame(columns=['ds'] + columns + DETAIL_COLUMNS).astype(
+            {'ds': 'datetime64[ns]', **{col: float for col in columns}}
+        )
+
+    return pd.concat(forecasts, ignore_index=True)
+
+
+def reconcile_to_national(detail, national, prefix):
+    """
+    Scale drug × region forecasts so they add up to the national forecast.
+
+    For every month each series' forecast, lower and upper bound are
+    clipped at zero and multiplied by national / sum of series, so the
+    series — and therefore every region and every drug total — sum to the
+    national model's figures. Months where all series are zero stay zero.
+
+    Args:
+        detail   : output of run_detail_models(), updated in place
+        national : national forecast for the measure (ds, yhat, yhat_lower, yhat_upper)
+        prefix   : 'items' or 'nic'
+    """
+    national = national.set_index('ds')
+
+    for suffix, national_col in [('forecast', 'yhat'), ('lower', 'yhat_lower'), ('upper', 'yhat_upper')]:
+        col    = f'{prefix}_{suffix}'
+        bottom = detail[col].clip(lower=0)
+        total  = bottom.groupby(detail['ds']).transform('sum')
+        target = detail['ds'].map(national[national_col].clip(lower=0))
+
+        detail[col] = np.where(total > 0, bottom * target / total.where(total > 0, 1), 0.0)
+
+
+def build_detail_table(series, detail, monthly, fc_items, fc_nic):
+    """
+    Reconcile the drug × region forecasts and lay them out as the long
+    forecast_detail table — one row per month, region and drug.
+
+    Only months covered by the national forecast are kept. Prophet extends
+    each series from its own last month, so a series that stopped before
+    the national data ends has predictions for months that are history
+    nationally — those are dropped rather than reconciled against the
+    series that do have actuals.
+    """
+    last_actual = series.groupby(
+        ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'], observed=True, as_index=False
+    )['ds'].max().rename(columns={'ds': 'last_actual'}).astype(
+        {'REGION_NAME': str, 'BNF_CHEMICAL_SUBSTANCE': str}
     )
+    detail = detail.merge(last_actual, on=['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'], how='left')
 
-    metrics = performance_metrics(cv_results)
-    mape    = metrics['mape'].mean() * 100
-    logger.info(f"  {label} MAPE: {mape:.2f}%")
-    return round(mape, 2)
+    stale  = (detail['ds'] > detail['last_actual']) & (detail['ds'] <= monthly['ds'].max())
+    detail = detail[detail['ds'].isin(fc_items['ds']) & ~stale].drop(columns='last_actual').copy()
+
+    reconcile_to_national(detail, fc_items, 'items')
+    reconcile_to_national(detail, fc_nic,   'nic')
+
+    actuals = series[['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ds', 'total_items', 'total_nic']].rename(columns={
+        'total_items': 'actual_items',
+        'total_nic'  : 'actual_nic'
+    })
+    actuals['REGION_NAME']            = actuals['REGION_NAME'].astype(str)
+    actuals['BNF_CHEMICAL_SUBSTANCE'] = actuals['BNF_CHEMICAL_SUBSTANCE'].astype(str)
+    detail = detail.merge(actuals, on=['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ds'], how='left')
+
+    detail['is_forecast'] = detail['ds'] > monthly['ds'].max()
+    detail['year_month']  = detail['ds'].dt.strftime('%Y-%m')
+
+    numeric_cols = [c for c in detail.columns if c.startswith(('items_', 'nic_', 'actual_'))]
+    detail[numeric_cols] = detail[numeric_cols].round(2)
+
+    detail = detail.rename(columns={
+        'REGION_NAME'           : 'region_name',
+        'BNF_CHEMICAL_SUBSTANCE': 'bnf_chemical_substance'
+    })
+    return detail[[
+        'year_month', 'region_name', 'bnf_chemical_substance',
+        'actual_items', 'actual_nic',
+        'items_forecast', 'items_lower', 'items_upper',
+        'nic_forecast',   'nic_lower',   'nic_upper',
+        'is_forecast'
+    ]].sort_values(['year_month', 'region_name', 'bnf_chemical_substance']).reset_index(drop=True)
 
 
 def build_forecast_table(monthly, fc_items, fc_nic, fc_cpi):
@@ -251,27 +601,28 @@ def main():
         )
 
     logger.info("Loading staged data...")
-    df = pd.read_csv(INPUT_PATH)
+    if FORECAST_DETAIL:
+        df = pd.read_csv(
+            INPUT_PATH,
+            usecols=INPUT_COLUMNS + DETAIL_COLUMNS,
+            dtype={**INPUT_DTYPES, **DETAIL_DTYPES}
+        )
+    else:
+        df = pd.read_csv(INPUT_PATH, usecols=INPUT_COLUMNS, dtype=INPUT_DTYPES)
     logger.info(f"Loaded {len(df):,} rows from staged CSV.")
 
     # Build monthly national totals
     logger.info("Aggregating to monthly national totals...")
     monthly = build_monthly_totals(df)
 
-    # Validate models and report MAPE
-    # Validation runs before fitting the final model to surface accuracy early.
-    # Items uses conservative changepoint scale — trend is smooth and steady.
-    # NIC and CPI use higher scale — the 2022 genericisation was a sharp break.
-    logger.info("Validating models (cross-validation)...")
-    mape_items = validate_model(monthly, 'total_items', 'Items',         changepoint_scale=0.05)
-    mape_nic   = validate_model(monthly, 'total_nic',   'Cost (NIC)',    changepoint_scale=0.30)
-    mape_cpi   = validate_model(monthly, 'total_cpi',   'Cost Per Item', changepoint_scale=0.30)
-
-    #Fit final models and generate forecasts
-    logger.info("Fitting final models and generating forecasts...")
-    fc_items = fit_and_forecast(monthly, 'total_items', 'Items',         changepoint_scale=0.05)
-    fc_nic   = fit_and_forecast(monthly, 'total_nic',   'Cost (NIC)',    changepoint_scale=0.30)
-    fc_cpi   = fit_and_forecast(monthly, 'total_cpi',   'Cost Per Item', changepoint_scale=0.30)
+    # Fit one model per measure, validate it (cross-validation) and forecast
+    # from it. The measures run side by side in FORECAST_WORKERS processes;
+    # unchanged series are served from MODEL_CACHE_DIR without fitting.
+    logger.info(
+        f"Fitting, validating and forecasting {len(MEASURES)} models "
+        f"({min(FORECAST_WORKERS, len(MEASURES))} worker process(es))..."
+    )
+    (mape_items, mape_nic, mape_cpi), (fc_items, fc_nic, fc_cpi) = run_models(monthly)
 
     # Build combined forecast table 
     logger.info("Building combined forecast table...")
@@ -281,6 +632,19 @@ def main():
     # Save forecast CSV
     forecast_df.to_csv(OUTPUT_PATH, index=False)
     logger.info(f"Forecast saved: {len(forecast_df):,} rows → {OUTPUT_PATH}")
+
+    # Drug × region forecasts, reconciled to the national totals
+    if FORECAST_DETAIL:
+        series = build_series_totals(df)
+        logger.info(
+            f"Forecasting {series.groupby(['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'], observed=True).ngroups} "
+            f"drug × region series ({FORECAST_WORKERS} worker process(es))..."
+        )
+        detail    = run_detail_models(series)
+        detail_df = build_detail_table(series, detail, monthly, fc_items, fc_nic)
+        detail_df.to_csv(DETAIL_OUTPUT_PATH, index=False)
+        logger.info(f"Detail forecast saved: {len(detail_df):,} rows → {DETAIL_OUTPUT_PATH}")
+
     logger.info("Next step: run loader.py to load into MySQL.")
 
     # Step 7: Print summary 
@@ -1,10 +1,16 @@
 import pandas as pd
-import mysql.connector
-from mysql.connector import Error
+import numpy as np
+from mysql.connector import Error, pooling
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import os
+import hashlib
+import tempfile
+import time
 import logging
 
+from database import DB_BACKEND, MYSQL_CONFIG, SQLITE_PATH, connect
+
 # Logging 
 os.makedirs('pca_data/logs', exist_ok=True)
 
@@ -21,24 +27,91 @@ logger = logging.getLogger(__name__)
 # Reads database credentials from the .env file.
 load_dotenv()
 
+# Optional bulk-load mode for the prescriptions fact table (set
+# LOADER_BULK_LOAD=true in .env). Rows are written to a temporary file and
+# sent with one LOAD DATA LOCAL INFILE instead of batches of INSERTs.
+# The MySQL server must allow it too: SET GLOBAL local_infile = 1;
+BULK_LOAD = os.getenv('LOADER_BULK_LOAD', 'false').strip().lower() in ('1', 'true', 'yes')
+
+# Optional upsert mode for the prescriptions fact table (set
+# LOADER_UPSERT=true in .env). Only months whose staged content differs from
+# the hash recorded in load_state are sent, and each of them replaces the
+# month as a whole — its rows are deleted and re-inserted in one transaction
+# rather than ignored — so restated NHS figures replace the old ones and rows
+# dropped from a restated month disappear.
+UPSERT = os.getenv('LOADER_UPSERT', 'false').strip().lower() in ('1', 'true', 'yes')
+
+# Parallel load of the prescriptions fact table (set LOADER_WORKERS in .env).
+# With more than one worker the rows are split by date_id and each month is
+# sent in its own transaction on a pooled connection; 1 keeps the original
+# single-connection batched INSERTs. Ignored in bulk mode.
+LOAD_WORKERS = max(1, int(os.getenv('LOADER_WORKERS', 1)))
+
+# Attempts per month partition before it is reported as failed
+LOAD_RETRIES = 3
+
+# Keep the rollup tables in sql/rollups.sql current after each load (set
+# LOADER_ROLLUPS=false in .env to skip). Only the months and years touched
+# by the load are recomputed. A database without the rollup tables is
+# skipped with a warning.
+ROLLUPS = os.getenv('LOADER_ROLLUPS', 'true').strip().lower() in ('1', 'true', 'yes')
+
+# Target database (set DB_BACKEND in .env): 'mysql' (default) or 'sqlite' for
+# an embedded file that needs no server — see database.py. Bulk and pooled
+# loading are MySQL features and are ignored on SQLite.
+MYSQL_BACKEND = DB_BACKEND == 'mysql'
+
 DB_CONFIG = {
-    'host'    : os.getenv('DB_HOST'),
-    'port'    : int(os.getenv('DB_PORT', 3306)),
-    'user'    : os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME')
+    **MYSQL_CONFIG,
+    'allow_local_infile': BULK_LOAD
+}
+
+# Covering secondary indexes on prescriptions (sql/schema.sql and
+# sql/partitioning.sql). Bulk loads drop them first and rebuild them in one
+# pass afterwards when the load adds at least INDEX_REBUILD_RATIO of the
+# table's current rows; smaller loads keep them and maintain them per row.
+COVERING_INDEXES = {
+    'idx_prescriptions_drug'  : '(drug_id,   region_id, date_id, items, nic)',
+    'idx_prescriptions_region': '(region_id, date_id,   drug_id, items, nic)',
+}
+INDEX_REBUILD_RATIO = 0.5
+
+# Single-column indexes backing the region and drug foreign keys of the
+# unpartitioned prescriptions table, so the covering indexes can be dropped.
+# Added to databases created before sql/schema.sql declared them.
+FOREIGN_KEY_INDEXES = {
+    'idx_prescriptions_region_fk': '(region_id)',
+    'idx_prescriptions_drug_fk'  : '(drug_id)',
 }
 
 # File Paths
 STAGED_INPUT_PATH   = 'pca_data/staged_pca_data.csv'  # output of processor.py
 FORECAST_INPUT_PATH = 'pca_data/forecast.csv'         # output of forecast.py
+FORECAST_DETAIL_INPUT_PATH = 'pca_data/forecast_detail.csv'  # drug x region output of forecast.py
+
+# Staged text columns repeat a handful of values on every row — read them as
+# categoricals rather than one Python string per row.
+STAGED_DTYPES = {
+    'YEAR_MONTH'            : 'category',
+    'REGION_NAME'           : 'category',
+    'BNF_CHEMICAL_SUBSTANCE': 'category',
+}
 
 
 # Connection
 def get_connection():
-    """Connect to MySQL using credentials from the .env file."""
+    """
+    Connect to the configured backend.
+    MySQL uses credentials from the .env file; SQLite opens DB_SQLITE_PATH
+    and creates the schema if it is missing.
+    """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        if not MYSQL_BACKEND:
+            conn = connect(DB_BACKEND)
+            logger.info(f"Opened SQLite database {conn.path} (schema applied).")
+            return conn
+
+        conn = connect('mysql', **DB_CONFIG)
         logger.info("Connected to MySQL successfully.")
         return conn
     except Error as e:
@@ -52,132 +125,914 @@ def get_connection():
         raise
 
 
-# Load dimension tables
-def load_dates(conn, df):
+def get_pool(size):
     """
-    Insert one row per unique year-month into dates.
-    Derives month number and month name from the YEAR_MONTH column.
-    Note: `year` and `month` are reserved words — backticks used in SQL.
+    Create a MySQL connection pool with one connection per load worker.
+
+    Uses the same credentials as get_connection(). mysql.connector caps
+    pool_size at 32.
     """
-    cursor = conn.cursor()
+    try:
+        pool = pooling.MySQLConnectionPool(
+            pool_name = 'loader',
+            pool_size = min(size, 32),
+            **DB_CONFIG
+        )
+        logger.info(f"Connection pool ready — {pool.pool_size} connection(s).")
+        return pool
+    except Error as e:
+        logger.error(f"Failed to create MySQL connection pool: {e}")
+        raise
 
-    unique_dates = df[['YEAR', 'YEAR_MONTH']].drop_duplicates()
-    inserted = 0
 
-    for _, row in unique_dates.iterrows():
-        year_month = row['YEAR_MONTH']
-        year       = int(row['YEAR'])
-        month      = int(year_month.split('-')[1])
-        month_name = pd.to_datetime(year_month + '-01').strftime('%B')
+# Surrogate keys seen this session, per dimension table: natural key → id.
+# Filled by the dimension loaders so load_prescriptions() can resolve
+# foreign keys without reading the dimension tables back.
+KEY_CACHE = {}
 
-        cursor.execute("""
-            INSERT IGNORE INTO dates (`year_month`, `year`, `month`, month_name)
-            VALUES (%s, %s, %s, %s)
-        """, (year_month, year, month, month_name))
-        inserted += cursor.rowcount
+# (id column, natural key column) per dimension table
+DIMENSION_KEYS = {
+    'dates'  : ('date_id',   '`year_month`'),
+    'regions': ('region_id', 'region_name'),
+    'drugs'  : ('drug_id',   'bnf_chemical_substance'),
+}
+
+
+# Load dimension tables
+def insert_dimension(conn, table, columns, rows):
+    """
+    Insert dimension rows with one multi-row INSERT IGNORE and cache their keys.
+
+    The first column of each row must be the table's natural key. After the
+    insert, one SELECT restricted to those keys fetches the surrogate IDs —
+    new and pre-existing alike — into KEY_CACHE[table].
+
+    Args:
+        conn    : MySQL connection
+        table   : 'dates', 'regions' or 'drugs'
+        columns : column names (SQL, backticked where reserved)
+        rows    : list of tuples, natural key first
+
+    Returns:
+        Number of new rows inserted.
+    """
+    if not rows:
+        return 0
+
+    id_column, key_column = DIMENSION_KEYS[table]
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    cursor = conn.cursor()
 
+    cursor.execute(
+        f"INSERT IGNORE INTO {table} ({', '.join(columns)}) "
+        f"VALUES {', '.join([placeholders] * len(rows))}",
+        [value for row in rows for value in row]
+    )
+    inserted = cursor.rowcount
     conn.commit()
+
+    keys = [row[0] for row in rows]
+    cursor.execute(
+        f"SELECT {id_column}, {key_column} FROM {table} "
+        f"WHERE {key_column} IN ({', '.join(['%s'] * len(keys))})",
+        keys
+    )
+    KEY_CACHE.setdefault(table, {}).update(
+        {row[1]: row[0] for row in cursor.fetchall()}
+    )
+
     cursor.close()
+    return inserted
+
+
+def dimension_lookup(conn, table):
+    """
+    Natural key → surrogate ID map for a dimension table.
+
+    Served from KEY_CACHE when the dimension was loaded this session,
+    otherwise read from the table once and cached.
+    """
+    if table not in KEY_CACHE:
+        id_column, key_column = DIMENSION_KEYS[table]
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {id_column}, {key_column} FROM {table}")
+        KEY_CACHE[table] = {row[1]: row[0] for row in cursor.fetchall()}
+        cursor.close()
+
+    return KEY_CACHE[table]
+
+
+def load_dates(conn, df):
+    """
+    Insert one row per unique year-month into dates.
+    Derives month number and month name from the YEAR_MONTH column,
+    once per distinct month rather than per row.
+    Note: `year` and `month` are reserved words — backticks used in SQL.
+    """
+    unique_dates = df[['YEAR_MONTH', 'YEAR']].drop_duplicates('YEAR_MONTH')
+    year_months  = unique_dates['YEAR_MONTH'].astype(str)
+    first_days   = pd.to_datetime(year_months + '-01', format='%Y-%m-%d')
+
+    rows = list(zip(
+        year_months.tolist(),
+        unique_dates['YEAR'].astype(int).tolist(),
+        first_days.dt.month.tolist(),
+        first_days.dt.month_name().tolist()
+    ))
+
+    inserted = insert_dimension(
+        conn, 'dates', ['`year_month`', '`year`', '`month`', 'month_name'], rows
+    )
     logger.info(f"dates: {inserted} new rows inserted.")
 
 
 def load_regions(conn, df):
     """Insert one row per unique NHS region into regions."""
-    cursor = conn.cursor()
-
-    inserted = 0
-    for region_name in df['REGION_NAME'].unique():
-        cursor.execute("""
-            INSERT IGNORE INTO regions (region_name)
-            VALUES (%s)
-        """, (region_name,))
-        inserted += cursor.rowcount
+    rows = [(str(region_name),) for region_name in df['REGION_NAME'].dropna().unique()]
 
-    conn.commit()
-    cursor.close()
+    inserted = insert_dimension(conn, 'regions', ['region_name'], rows)
     logger.info(f"regions: {inserted} new rows inserted.")
 
 
 def load_drugs(conn, df):
     """Insert one row per unique antidepressant substance into drugs."""
+    rows = [(str(drug_name),) for drug_name in df['BNF_CHEMICAL_SUBSTANCE'].dropna().unique()]
+
+    inserted = insert_dimension(conn, 'drugs', ['bnf_chemical_substance'], rows)
+    logger.info(f"drugs: {inserted} new rows inserted.")
+
+
+# Load fact table
+def month_hashes(df):
+    """
+    SHA-256 of each month's staged rows, in a canonical form.
+
+    Rows are sorted by region and drug and written as
+    'region|drug|items|nic' with NIC to 2 dp, so the hash depends only on
+    the data, not on row order or how the CSV was read.
+
+    Returns a dict of year_month ('2021-01') → (hex digest, row count).
+    """
+    canonical = pd.DataFrame({
+        'YEAR_MONTH': df['YEAR_MONTH'].astype(str),
+        'line'      : (
+            df['REGION_NAME'].astype(str) + '|'
+            + df['BNF_CHEMICAL_SUBSTANCE'].astype(str) + '|'
+            + df['ITEMS'].astype(np.int64).astype(str) + '|'
+            + df['NIC'].astype(float).map('{:.2f}'.format)
+        ),
+    }).sort_values(['YEAR_MONTH', 'line'])
+
+    return {
+        year_month: (
+            hashlib.sha256('\n'.join(group['line']).encode()).hexdigest(),
+            len(group)
+        )
+        for year_month, group in canonical.groupby('YEAR_MONTH')
+    }
+
+
+def changed_months(conn, hashes):
+    """Months whose staged hash differs from the one recorded in load_state."""
     cursor = conn.cursor()
+    cursor.execute("SELECT `year_month`, content_hash FROM load_state")
+    loaded = {row[0]: row[1] for row in cursor.fetchall()}
+    cursor.close()
+
+    return sorted(
+        year_month for year_month, (content_hash, _) in hashes.items()
+        if loaded.get(year_month) != content_hash
+    )
 
-    inserted = 0
-    for drug_name in df['BNF_CHEMICAL_SUBSTANCE'].unique():
-        cursor.execute("""
-            INSERT IGNORE INTO drugs (bnf_chemical_substance)
-            VALUES (%s)
-        """, (drug_name,))
-        inserted += cursor.rowcount
 
+def record_load_state(conn, hashes, months):
+    """Record the content hashes of months just loaded into prescriptions."""
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO load_state (`year_month`, content_hash, row_count, loaded_at)
+        VALUES (%s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            content_hash = VALUES(content_hash),
+            row_count    = VALUES(row_count),
+            loaded_at    = VALUES(loaded_at)
+    """, [(month, *hashes[month]) for month in months])
     conn.commit()
     cursor.close()
-    logger.info(f"drugs: {inserted} new rows inserted.")
 
 
-# Load fact table
-def load_prescriptions(conn, df):
+def resolve_ids(values, lookup):
+    """
+    Map a column of dimension values to their IDs.
+
+    The lookup runs once per distinct value (category) and the IDs are then
+    spread to every row through the categorical codes, so the cost does not
+    grow with the number of rows.
+
+    Returns a numpy int64 array aligned with values, 0 where unresolved.
+    """
+    values = values.astype('category')  # no-op when already categorical
+    ids = np.array(
+        [lookup.get(value, 0) for value in values.cat.categories] + [0],
+        dtype=np.int64
+    )
+    # Missing values have code -1, which picks the trailing 0
+    return ids[values.cat.codes.to_numpy()]
+
+
+def load_prescriptions(conn, df, bulk=BULK_LOAD, upsert=UPSERT, pool=None, rollups=ROLLUPS):
     """
     Load all prescription records into prescriptions.
     Looks up foreign key IDs from memory then batch inserts into the table.
+    Key resolution is vectorized — no per-row Python work until the final
+    tuples are built straight from the column arrays.
+
+    With bulk=True the resolved rows are loaded by bulk_load_prescriptions()
+    instead of batched INSERTs — or, when prescriptions is partitioned
+    (sql/partitioning.sql), by exchange_load_prescriptions(). On a
+    partitioned table the other paths first add any missing month
+    partitions with add_month_partitions().
+
+    With upsert=True only months whose content hash differs from load_state
+    are sent, each of them replaces the month's existing rows in a single
+    transaction (replace_month()), and the new hashes are recorded once the
+    rows are committed.
+
+    With a connection pool the rows are loaded one month per transaction
+    by parallel_load_prescriptions(). Months that still fail after retries
+    are reported, left out of load_state, and raise once the rest are in.
+
+    With rollups=True the rollup tables are refreshed for every month that
+    was loaded, before any failure is raised.
     """
+    if upsert:
+        hashes = month_hashes(df)
+        months = changed_months(conn, hashes)
+        logger.info(
+            f"prescriptions: {len(months)} month(s) new or changed, "
+            f"{len(hashes) - len(months)} unchanged."
+        )
+        if not months:
+            logger.info("prescriptions: nothing to load.")
+            if rollups:
+                refresh_rollups(conn, [])
+            return
+        df = df[df['YEAR_MONTH'].astype(str).isin(months)]
+
+    # ID lookups — cached by the dimension loaders, queried only if not run
+    date_lookup   = dimension_lookup(conn, 'dates')
+    region_lookup = dimension_lookup(conn, 'regions')
+    drug_lookup   = dimension_lookup(conn, 'drugs')
+
     cursor = conn.cursor()
 
-    # Build ID lookup dictionaries from dimension tables
-    cursor.execute("SELECT date_id, `year_month` FROM dates")
-    date_lookup = {row[1]: row[0] for row in cursor.fetchall()}
+    # Resolve foreign keys for every row at once
+    date_ids   = resolve_ids(df['YEAR_MONTH'],             date_lookup)
+    region_ids = resolve_ids(df['REGION_NAME'],            region_lookup)
+    drug_ids   = resolve_ids(df['BNF_CHEMICAL_SUBSTANCE'], drug_lookup)
 
-    cursor.execute("SELECT region_id, region_name FROM regions")
-    region_lookup = {row[1]: row[0] for row in cursor.fetchall()}
+    resolved = (date_ids != 0) & (region_ids != 0) & (drug_ids != 0)
+    skipped  = int((~resolved).sum())
 
-    cursor.execute("SELECT drug_id, bnf_chemical_substance FROM drugs")
-    drug_lookup = {row[1]: row[0] for row in cursor.fetchall()}
+    if skipped > 0:
+        logger.warning(f"Skipped {skipped:,} rows — could not resolve lookup IDs.")
 
-    # Build rows to insert
-    rows_to_insert = []
-    skipped = 0
+    failed_months = []
 
-    for _, row in df.iterrows():
-        date_id   = date_lookup.get(row['YEAR_MONTH'])
-        region_id = region_lookup.get(row['REGION_NAME'])
-        drug_id   = drug_lookup.get(row['BNF_CHEMICAL_SUBSTANCE'])
+    # Resolved rows as a frame — the input of both bulk loaders
+    if bulk:
+        resolved_df = pd.DataFrame({
+            'date_id'  : date_ids[resolved],
+            'region_id': region_ids[resolved],
+            'drug_id'  : drug_ids[resolved],
+            'items'    : df['ITEMS'].to_numpy(dtype=np.int64)[resolved],
+            'nic'      : df['NIC'].to_numpy(dtype=np.float64)[resolved],
+        })
 
-        if not all([date_id, region_id, drug_id]):
-            skipped += 1
-            continue
+    partitioned = prescriptions_partitioned(conn)
+    if partitioned and not bulk:
+        # The row-by-row paths need every month's partition to exist first
+        add_month_partitions(cursor, date_ids[resolved].tolist())
 
-        rows_to_insert.append((
-            date_id,
-            region_id,
-            drug_id,
-            int(row['ITEMS']),
-            float(row['NIC'])
+    if bulk and partitioned:
+        cursor.close()
+        exchange_load_prescriptions(conn, resolved_df)
+
+    elif bulk:
+        cursor.close()
+        bulk_load_prescriptions(conn, resolved_df, upsert=upsert)
+
+    elif pool is not None:
+        cursor.close()
+        failed = parallel_load_prescriptions(
+            pool,
+            date_ids[resolved],
+            region_ids[resolved],
+            drug_ids[resolved],
+            df['ITEMS'].to_numpy(dtype=np.int64)[resolved],
+            df['NIC'].to_numpy(dtype=np.float64)[resolved],
+            upsert=upsert
+        )
+        month_lookup  = {date_id: year_month for year_month, date_id in date_lookup.items()}
+        failed_months = sorted(month_lookup[date_id] for date_id in failed)
+
+    elif upsert:
+        # One transaction per month — delete its rows, insert the staged ones
+        rows_to_insert = list(zip(
+            date_ids[resolved].tolist(),
+            region_ids[resolved].tolist(),
+            drug_ids[resolved].tolist(),
+            df['ITEMS'].to_numpy(dtype=np.int64)[resolved].tolist(),
+            df['NIC'].to_numpy(dtype=np.float64)[resolved].tolist()
         ))
+        month_ids, partitions = split_by_month(date_ids[resolved])
+        inserted = 0
 
-    if skipped > 0:
-        logger.warning(f"Skipped {skipped:,} rows — could not resolve lookup IDs.")
+        for done, (date_id, positions) in enumerate(zip(month_ids, partitions), start=1):
+            try:
+                inserted += replace_month(
+                    cursor, int(date_id), [rows_to_insert[i] for i in positions]
+                )
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+            logger.info(f"  Progress: {done:,} / {len(month_ids):,} months replaced.")
 
-    # Batch insert in groups of 1,000
+        cursor.close()
+        logger.info(
+            f"prescriptions: {inserted:,} rows inserted, "
+            f"replacing {len(month_ids):,} month(s)."
+        )
+
+    else:
+        # Build rows to insert — tolist() yields plain Python ints and floats
+        rows_to_insert = list(zip(
+            date_ids[resolved].tolist(),
+            region_ids[resolved].tolist(),
+            drug_ids[resolved].tolist(),
+            df['ITEMS'].to_numpy(dtype=np.int64)[resolved].tolist(),
+            df['NIC'].to_numpy(dtype=np.float64)[resolved].tolist()
+        ))
+
+        # Batch insert in groups of 1,000
+        batch_size = 1000
+        inserted   = 0
+        total      = len(rows_to_insert)
+
+        for i in range(0, total, batch_size):
+            batch = rows_to_insert[i : i + batch_size]
+            cursor.executemany("""
+                INSERT IGNORE INTO prescriptions
+                    (date_id, region_id, drug_id, items, nic)
+                VALUES
+                    (%s, %s, %s, %s, %s)
+            """, batch)
+            inserted += cursor.rowcount
+            conn.commit()
+            logger.info(
+                f"  Progress: {min(i + batch_size, total):,} / {total:,} rows processed."
+            )
+
+        cursor.close()
+        logger.info(f"prescriptions: {inserted:,} new rows inserted.")
+
+    loaded_months = sorted(
+        set(df['YEAR_MONTH'].astype(str)[resolved]) - set(failed_months)
+    )
+
+    if upsert:
+        record_load_state(conn, hashes, loaded_months)
+        logger.info(f"load_state: hashes recorded for {len(loaded_months)} month(s).")
+
+    if rollups:
+        refresh_rollups(conn, loaded_months)
+
+    if failed_months:
+        raise RuntimeError(
+            f"prescriptions: {len(failed_months)} month(s) failed to load "
+            f"after {LOAD_RETRIES} attempts: {', '.join(failed_months)}. "
+            f"All other months were committed — re-run loader.py to retry."
+        )
+
+
+def split_by_month(date_ids):
+    """
+    Group row positions by month without a Python loop over rows.
+
+    Returns:
+        tuple of (sorted unique date_ids, list of position arrays, one per month)
+    """
+    order          = np.argsort(date_ids, kind='stable')
+    months, starts = np.unique(date_ids[order], return_index=True)
+    return months, np.split(order, starts[1:])
+
+
+def replace_month(cursor, date_id, rows):
+    """
+    Delete one month's prescription rows and insert the staged rows in
+    their place, in batches of 1,000. Used in upsert mode, so a
+    (region, drug) row dropped from a restated month is removed too.
+
+    Does not commit — the caller commits or rolls back the month as one
+    transaction, so other sessions see either the old month or the new one.
+
+    Returns:
+        Number of rows inserted.
+    """
     batch_size = 1000
-    inserted   = 0
-    total      = len(rows_to_insert)
 
-    for i in range(0, total, batch_size):
-        batch = rows_to_insert[i : i + batch_size]
+    cursor.execute("DELETE FROM prescriptions WHERE date_id = %s", (date_id,))
+    inserted = 0
+    for i in range(0, len(rows), batch_size):
         cursor.executemany("""
-            INSERT IGNORE INTO prescriptions
+            INSERT INTO prescriptions
                 (date_id, region_id, drug_id, items, nic)
             VALUES
                 (%s, %s, %s, %s, %s)
-        """, batch)
+        """, rows[i : i + batch_size])
         inserted += cursor.rowcount
-        conn.commit()
-        logger.info(
-            f"  Progress: {min(i + batch_size, total):,} / {total:,} rows processed."
+    return inserted
+
+
+def load_partition(pool, date_id, rows, upsert=False):
+    """
+    Load one month of prescription rows in a single transaction.
+
+    Takes its own connection from the pool, inserts every row for the
+    month in batches of 1,000 and commits once at the end. Any error rolls
+    the whole month back and is retried up to LOAD_RETRIES times with a
+    short backoff, so a month is either fully loaded or not at all.
+
+    Args:
+        pool    : MySQLConnectionPool from get_pool()
+        date_id : the month being loaded (for logging)
+        rows    : list of (date_id, region_id, drug_id, items, nic) tuples
+        upsert  : replace the month's existing rows instead of ignoring
+                  duplicates (replace_month())
+
+    Returns:
+        Number of affected rows reported by MySQL.
+    """
+    batch_size = 1000
+
+    for attempt in range(1, LOAD_RETRIES + 1):
+        conn = pool.get_connection()
+        try:
+            cursor = conn.cursor()
+            if upsert:
+                inserted = replace_month(cursor, date_id, rows)
+            else:
+                inserted = 0
+                for i in range(0, len(rows), batch_size):
+                    cursor.executemany("""
+                        INSERT IGNORE INTO prescriptions
+                            (date_id, region_id, drug_id, items, nic)
+                        VALUES
+                            (%s, %s, %s, %s, %s)
+                    """, rows[i : i + batch_size])
+                    inserted += cursor.rowcount
+            conn.commit()
+            cursor.close()
+            return inserted
+
+        except Error as e:
+            try:
+                conn.rollback()
+            except Error:
+                pass  # connection is gone — nothing was committed anyway
+            if attempt == LOAD_RETRIES:
+                raise
+            logger.warning(
+                f"  date_id {date_id}: attempt {attempt}/{LOAD_RETRIES} failed ({e}) — retrying."
+            )
+            time.sleep(2 ** attempt)
+
+        finally:
+            # Returns the connection to the pool
+            conn.close()
+
+
+def parallel_load_prescriptions(pool, date_ids, region_ids, drug_ids, items, nic, upsert=False):
+    """
+    Load resolved prescription rows month by month across the pool.
+
+    Rows are grouped by date_id and each month is handed to load_partition()
+    on its own worker thread and connection. Months never share a
+    transaction, so one failing month cannot roll back or half-load another.
+
+    Args:
+        pool       : MySQLConnectionPool from get_pool()
+        date_ids, region_ids, drug_ids, items, nic : aligned numpy arrays
+        upsert     : replace each month's existing rows instead of
+                     ignoring duplicates
+
+    Returns:
+        List of date_ids that still failed after LOAD_RETRIES attempts.
+    """
+    months, partitions = split_by_month(date_ids)
+
+    inserted = 0
+    failed   = []
+    total    = len(months)
+
+    with ThreadPoolExecutor(max_workers=pool.pool_size) as executor:
+        futures = {
+            executor.submit(
+                load_partition,
+                pool,
+                int(date_id),
+                list(zip(
+                    date_ids[positions].tolist(),
+                    region_ids[positions].tolist(),
+                    drug_ids[positions].tolist(),
+                    items[positions].tolist(),
+                    nic[positions].tolist()
+                )),
+                upsert
+            ): int(date_id)
+            for date_id, positions in zip(months, partitions)
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            date_id = futures[future]
+            try:
+                inserted += future.result()
+            except Error as e:
+                logger.error(f"  date_id {date_id}: failed after {LOAD_RETRIES} attempts — {e}")
+                failed.append(date_id)
+            logger.info(f"  Progress: {done:,} / {total:,} months processed.")
+
+    logger.info(
+        f"prescriptions: {inserted:,} "
+        f"{'rows inserted into replaced months' if upsert else 'new rows inserted'}"
+        f" across {total:,} month(s) on {pool.pool_size} connection(s)."
+    )
+    return sorted(failed)
+
+
+def bulk_load_prescriptions(conn, resolved_df, upsert=False):
+    """
+    Bulk-load resolved prescription rows with one LOAD DATA and one merge.
+
+    The rows are written to a temporary tab-separated file, sent with
+    LOAD DATA LOCAL INFILE into a temporary staging table, then merged into
+    prescriptions with a single INSERT IGNORE ... SELECT — so existing
+    (date_id, region_id, drug_id) rows are left untouched, exactly as with
+    the batched INSERT IGNORE path. In upsert mode the staged months' rows
+    are deleted first and the merge is a plain INSERT, so each month is
+    replaced as a whole. One commit, no per-batch round trips.
+    When the load is large relative to the table, the covering indexes are
+    dropped for the merge and rebuilt once afterwards.
+
+    Args:
+        conn        : MySQL connection opened with allow_local_infile=True
+        resolved_df : DataFrame with date_id, region_id, drug_id, items, nic
+        upsert      : replace the staged months' existing rows instead of
+                      ignoring duplicates
+    """
+    cursor   = conn.cursor()
+    tmp_path = write_bulk_file(resolved_df)
+    logger.info(f"  Bulk load: {len(resolved_df):,} rows written to {tmp_path}")
+
+    try:
+        cursor.execute("""
+            CREATE TEMPORARY TABLE IF NOT EXISTS prescriptions_staging (
+                date_id   INT            NOT NULL,
+                region_id INT            NOT NULL,
+                drug_id   INT            NOT NULL,
+                items     INT            NOT NULL,
+                nic       DECIMAL(12, 2) NOT NULL
+            )
+        """)
+        cursor.execute("TRUNCATE TABLE prescriptions_staging")
+
+        load_data_infile(cursor, tmp_path, 'prescriptions_staging')
+        logger.info(f"  Bulk load: {cursor.rowcount:,} rows loaded into staging table.")
+
+        # Large loads: drop the covering indexes and rebuild them once after.
+        # An exact count — information_schema.TABLES.TABLE_ROWS is an estimate.
+        cursor.execute("SELECT COUNT(*) FROM prescriptions")
+        existing_rows = cursor.fetchone()[0]
+        dropped = []
+        if len(resolved_df) >= INDEX_REBUILD_RATIO * existing_rows:
+            add_foreign_key_indexes(cursor, 'prescriptions')
+            dropped = drop_secondary_indexes(cursor, 'prescriptions')
+
+        # Merge into the fact table with one set-based statement
+        try:
+            if upsert:
+                cursor.execute("""
+                    DELETE FROM prescriptions
+                    WHERE date_id IN (SELECT DISTINCT date_id FROM prescriptions_staging)
+                """)
+            cursor.execute(f"""
+                {'INSERT' if upsert else 'INSERT IGNORE'} INTO prescriptions
+                    (date_id, region_id, drug_id, items, nic)
+                SELECT
+                    date_id, region_id, drug_id, items, nic
+                FROM prescriptions_staging
+            """)
+            inserted = cursor.rowcount
+            conn.commit()
+        except Error:
+            # Roll back before the index rebuild — its ALTER commits implicitly
+            conn.rollback()
+            raise
+        finally:
+            add_secondary_indexes(cursor, 'prescriptions', dropped)
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS prescriptions_staging")
+
+    finally:
+        cursor.close()
+        os.remove(tmp_path)
+
+    logger.info(
+        f"prescriptions: {inserted:,} "
+        f"{'rows inserted into replaced months' if upsert else 'new rows inserted'}."
+    )
+
+
+def write_bulk_file(resolved_df):
+    """Write resolved rows to a temporary tab-separated file and return its path."""
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, newline='') as f:
+        resolved_df.to_csv(f, sep='\t', header=False, index=False, lineterminator='\n')
+    return f.name
+
+
+def load_data_infile(cursor, path, table):
+    """Send a file from write_bulk_file() into table with LOAD DATA LOCAL INFILE."""
+    # MySQL accepts forward slashes in file paths on every platform
+    cursor.execute(f"""
+        LOAD DATA LOCAL INFILE %s
+        INTO TABLE {table}
+        FIELDS TERMINATED BY '\\t'
+        LINES TERMINATED BY '\\n'
+        (date_id, region_id, drug_id, items, nic)
+    """, (path.replace('\\', '/'),))
+
+
+def index_names(cursor, table):
+    """Names of the indexes currently on table."""
+    cursor.execute("""
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def add_foreign_key_indexes(cursor, table):
+    """
+    Add whichever FOREIGN_KEY_INDEXES are missing from table, in one ALTER.
+
+    Until they exist InnoDB backs the region and drug foreign keys with the
+    covering indexes, and refuses to drop those (error 1553).
+    """
+    present = index_names(cursor, table)
+    missing = [name for name in FOREIGN_KEY_INDEXES if name not in present]
+    if not missing:
+        return
+    cursor.execute(
+        f"ALTER TABLE {table} "
+        + ', '.join(f"ADD INDEX {name} {FOREIGN_KEY_INDEXES[name]}" for name in missing)
+    )
+    logger.info(f"  {table}: added {len(missing)} foreign key index(es).")
+
+
+def drop_secondary_indexes(cursor, table):
+    """
+    Drop whichever COVERING_INDEXES exist on table, in one ALTER.
+
+    Returns the names dropped, for add_secondary_indexes() to rebuild.
+    """
+    present = index_names(cursor, table)
+    dropped = [name for name in COVERING_INDEXES if name in present]
+
+    if dropped:
+        cursor.execute(
+            f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX {name}" for name in dropped)
         )
+        logger.info(f"  {table}: dropped {len(dropped)} secondary index(es) for the load.")
+    return dropped
+
+
+def add_secondary_indexes(cursor, table, names):
+    """Rebuild indexes dropped by drop_secondary_indexes() in one ALTER."""
+    if not names:
+        return
+    cursor.execute(
+        f"ALTER TABLE {table} "
+        + ', '.join(f"ADD INDEX {name} {COVERING_INDEXES[name]}" for name in names)
+    )
+    logger.info(f"  {table}: rebuilt {len(names)} secondary index(es).")
 
+
+def prescriptions_partitioned(conn):
+    """True when prescriptions was created from sql/partitioning.sql (MySQL only)."""
+    if not MYSQL_BACKEND:
+        return False
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'prescriptions'
+          AND PARTITION_NAME IS NOT NULL
+    """)
+    partitioned = cursor.fetchone()[0] > 0
     cursor.close()
-    logger.info(f"prescriptions: {inserted:,} new rows inserted.")
+    return partitioned
+
+
+def add_month_partitions(cursor, date_ids):
+    """
+    Add a partition p<date_id> to the partitioned prescriptions table for
+    every month it has no partition for yet.
+
+    A LIST-partitioned table rejects rows with no matching partition —
+    INSERT IGNORE drops them silently, plain INSERT fails with error 1526 —
+    so every load path calls this before sending rows.
+    """
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'prescriptions'
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    new      = [date_id for date_id in sorted(set(date_ids)) if f'p{date_id}' not in existing]
+    if new:
+        cursor.execute(
+            "ALTER TABLE prescriptions ADD PARTITION ("
+            + ', '.join(f"PARTITION p{date_id} VALUES IN ({date_id})" for date_id in new)
+            + ")"
+        )
+        logger.info(f"  prescriptions: added {len(new)} month partition(s).")
+
+
+def exchange_load_prescriptions(conn, resolved_df):
+    """
+    Load a partitioned prescriptions table one month at a time by
+    exchanging partitions.
+
+    A partition p<date_id> is added for every new month. Each month's rows
+    are sent with LOAD DATA into an unpartitioned, unindexed copy of the
+    table; its covering indexes are then built in one pass and the copy is
+    swapped with the month's partition. Readers see either the old month or
+    the new one, never a half-loaded partition, and the rest of the table
+    is not touched. The staged data replaces the month as a whole.
+
+    Args:
+        conn        : MySQL connection opened with allow_local_infile=True
+        resolved_df : DataFrame with date_id, region_id, drug_id, items, nic
+    """
+    cursor   = conn.cursor()
+    date_ids = sorted(int(date_id) for date_id in resolved_df['date_id'].unique())
+
+    add_month_partitions(cursor, date_ids)
+
+    # Unpartitioned copy to load into and swap with each month's partition
+    cursor.execute("DROP TABLE IF EXISTS prescriptions_exchange")
+    cursor.execute("CREATE TABLE prescriptions_exchange LIKE prescriptions")
+    cursor.execute("ALTER TABLE prescriptions_exchange REMOVE PARTITIONING")
+    indexes = drop_secondary_indexes(cursor, 'prescriptions_exchange')
+
+    loaded = 0
+    try:
+        for done, (date_id, month_df) in enumerate(resolved_df.groupby('date_id', sort=True), start=1):
+            tmp_path = write_bulk_file(month_df)
+            try:
+                load_data_infile(cursor, tmp_path, 'prescriptions_exchange')
+                loaded += cursor.rowcount
+            finally:
+                os.remove(tmp_path)
+
+            add_secondary_indexes(cursor, 'prescriptions_exchange', indexes)
+            # Every row belongs to p<date_id>, so MySQL need not re-check them
+            cursor.execute(f"""
+                ALTER TABLE prescriptions
+                EXCHANGE PARTITION p{int(date_id)} WITH TABLE prescriptions_exchange
+                WITHOUT VALIDATION
+            """)
+
+            # The copy now holds the month's previous rows — clear it for the next
+            cursor.execute("TRUNCATE TABLE prescriptions_exchange")
+            drop_secondary_indexes(cursor, 'prescriptions_exchange')
+            logger.info(f"  Progress: {done:,} / {len(date_ids):,} months exchanged.")
+
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS prescriptions_exchange")
+        cursor.close()
+
+    logger.info(
+        f"prescriptions: {loaded:,} rows loaded by partition exchange "
+        f"across {len(date_ids):,} month(s)."
+    )
+
+
+# Rollup tables
+def refresh_rollups(conn, months):
+    """
+    Recompute the rollup tables for the months just loaded.
+
+    rollup_national_monthly is rebuilt for those months only; the three
+    yearly rollups are rebuilt for the years those months fall in. Each
+    slice is deleted and re-inserted from prescriptions in one transaction,
+    so a restated month replaces its old totals. If the rollups are empty
+    (first run, or sql/rollups.sql just applied) every month is rebuilt.
+
+    If the rollup tables do not exist (sql/rollups.sql has not been run on
+    this database) the refresh is skipped with a warning.
+
+    Args:
+        conn   : database connection
+        months : list of year_month strings ('2021-01') touched by the load
+    """
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT COUNT(*) FROM rollup_national_monthly")
+    except Error as e:
+        cursor.close()
+        logger.warning(
+            f"rollups: skipped — rollup tables not available ({e}). "
+            f"Run sql/rollups.sql to enable them, or set LOADER_ROLLUPS=false."
+        )
+        return
+    rebuild = cursor.fetchone()[0] == 0
+
+    # Read from dates itself — KEY_CACHE only holds the months of this load
+    cursor.execute("SELECT `year_month`, date_id FROM dates")
+    date_lookup = {year_month: date_id for year_month, date_id in cursor.fetchall()}
+    if rebuild:
+        months = list(date_lookup)
+
+    months = [month for month in months if month in date_lookup]
+    if not months:
+        cursor.close()
+        return
+
+    date_ids = sorted({date_lookup[month] for month in months})
+    years    = sorted({int(month[:4]) for month in months})
+
+    in_dates = ', '.join(['%s'] * len(date_ids))
+    in_years = ', '.join(['%s'] * len(years))
+
+    cursor.execute(f"DELETE FROM rollup_national_monthly WHERE date_id IN ({in_dates})", date_ids)
+    cursor.execute(f"""
+        INSERT INTO rollup_national_monthly
+            (date_id, `year_month`, `year`, `month`, month_name, total_items, total_nic)
+        SELECT
+            d.date_id, d.`year_month`, d.`year`, d.`month`, d.month_name,
+            SUM(p.items), SUM(p.nic)
+        FROM prescriptions p
+        JOIN dates d ON p.date_id = d.date_id
+        WHERE p.date_id IN ({in_dates})
+        GROUP BY d.date_id, d.`year_month`, d.`year`, d.`month`, d.month_name
+    """, date_ids)
+
+    cursor.execute(f"DELETE FROM rollup_region_year WHERE `year` IN ({in_years})", years)
+    cursor.execute(f"""
+        INSERT INTO rollup_region_year
+            (region_id, `year`, total_items, total_nic, months)
+        SELECT
+            p.region_id, d.`year`,
+            SUM(p.items), SUM(p.nic), COUNT(DISTINCT p.date_id)
+        FROM prescriptions p
+        JOIN dates d ON p.date_id = d.date_id
+        WHERE d.`year` IN ({in_years})
+        GROUP BY p.region_id, d.`year`
+    """, years)
+
+    cursor.execute(f"DELETE FROM rollup_drug_year WHERE `year` IN ({in_years})", years)
+    cursor.execute(f"""
+        INSERT INTO rollup_drug_year
+            (drug_id, `year`, total_items, total_nic)
+        SELECT
+            p.drug_id, d.`year`,
+            SUM(p.items), SUM(p.nic)
+        FROM prescriptions p
+        JOIN dates d ON p.date_id = d.date_id
+        WHERE d.`year` IN ({in_years})
+        GROUP BY p.drug_id, d.`year`
+    """, years)
+
+    cursor.execute(f"DELETE FROM rollup_drug_region_year WHERE `year` IN ({in_years})", years)
+    cursor.execute(f"""
+        INSERT INTO rollup_drug_region_year
+            (drug_id, region_id, `year`, total_items, total_nic)
+        SELECT
+            p.drug_id, p.region_id, d.`year`,
+            SUM(p.items), SUM(p.nic)
+        FROM prescriptions p
+        JOIN dates d ON p.date_id = d.date_id
+        WHERE d.`year` IN ({in_years})
+        GROUP BY p.drug_id, p.region_id, d.`year`
+    """, years)
+
+    conn.commit()
+    cursor.close()
+    logger.info(
+        f"rollups: refreshed {len(date_ids)} month(s) and "
+        f"{len(years)} year(s) ({', '.join(map(str, years))})."
+    )
 
 
 # Load forecast table
@@ -260,17 +1115,117 @@ def load_forecast(conn, df):
     logger.info(f"forecast: {inserted:,} new rows inserted.")
 
 
+def load_forecast_detail(conn, df, upsert=UPSERT):
+    """
+    Load the reconciled drug × region forecasts into forecast_detail.
+    Reads from pca_data/forecast_detail.csv — output of forecast.py.
+
+    Region and drug names are resolved to their dimension IDs in one
+    vectorized pass, as in load_prescriptions(). Rows for regions or drugs
+    not in the dimension tables are skipped with a warning.
+
+    Uses INSERT IGNORE like load_forecast(); with upsert=True existing
+    (year_month, region_id, drug_id) rows are updated with the new run.
+    """
+    region_ids = resolve_ids(df['region_name'],            dimension_lookup(conn, 'regions'))
+    drug_ids   = resolve_ids(df['bnf_chemical_substance'], dimension_lookup(conn, 'drugs'))
+
+    resolved = (region_ids != 0) & (drug_ids != 0)
+    skipped  = int((~resolved).sum())
+    if skipped > 0:
+        logger.warning(f"Skipped {skipped:,} forecast_detail rows — could not resolve lookup IDs.")
+
+    # Actuals are NULL for future forecast months
+    actual_items = df['actual_items'].to_numpy(dtype=np.float64)[resolved]
+    actual_nic   = df['actual_nic'].to_numpy(dtype=np.float64)[resolved]
+
+    rows_to_insert = list(zip(
+        df['year_month'].astype(str).to_numpy()[resolved].tolist(),
+        region_ids[resolved].tolist(),
+        drug_ids[resolved].tolist(),
+        [None if np.isnan(value) else int(value)   for value in actual_items],
+        [None if np.isnan(value) else float(value) for value in actual_nic],
+        *(df[name].to_numpy(dtype=np.float64)[resolved].tolist() for name in (
+            'items_forecast', 'items_lower', 'items_upper',
+            'nic_forecast',   'nic_lower',   'nic_upper'
+        )),
+        df['is_forecast'].astype(int).to_numpy()[resolved].tolist()
+    ))
+
+    update_clause = """
+        ON DUPLICATE KEY UPDATE
+            actual_items   = VALUES(actual_items),
+            actual_nic     = VALUES(actual_nic),
+            items_forecast = VALUES(items_forecast),
+            items_lower    = VALUES(items_lower),
+            items_upper    = VALUES(items_upper),
+            nic_forecast   = VALUES(nic_forecast),
+            nic_lower      = VALUES(nic_lower),
+            nic_upper      = VALUES(nic_upper),
+            is_forecast    = VALUES(is_forecast)
+    """
+
+    cursor = conn.cursor()
+
+    # Batch insert in groups of 1,000
+    batch_size = 1000
+    inserted   = 0
+    total      = len(rows_to_insert)
+
+    for i in range(0, total, batch_size):
+        batch = rows_to_insert[i : i + batch_size]
+        cursor.executemany(f"""
+            {'INSERT' if upsert else 'INSERT IGNORE'} INTO forecast_detail (
+                `year_month`, region_id, drug_id,
+                actual_items, actual_nic,
+                items_forecast, items_lower, items_upper,
+                nic_forecast,   nic_lower,   nic_upper,
+                is_forecast
+            )
+            VALUES (
+                %s, %s, %s,
+                %s, %s,
+                %s, %s, %s,
+                %s, %s, %s,
+                %s
+            )
+            {update_clause if upsert else ''}
+        """, batch)
+        inserted += cursor.rowcount
+        conn.commit()
+        logger.info(
+            f"  Progress: {min(i + batch_size, total):,} / {total:,} rows processed."
+        )
+
+    cursor.close()
+    logger.info(
+        f"forecast_detail: {inserted:,} "
+        f"{'rows affected (inserts count 1, updates 2)' if upsert else 'new rows inserted'}."
+    )
+
+
 def main():
+    bulk     = BULK_LOAD and MYSQL_BACKEND
+    parallel = LOAD_WORKERS > 1 and MYSQL_BACKEND and not bulk
+    target   = f"MySQL -> {DB_CONFIG['database']}" if MYSQL_BACKEND else f"SQLite -> {SQLITE_PATH}"
+
     logger.info("=" * 60)
     logger.info("NHS PCA DATA LOADER — STARTING")
     logger.info(f"Input   : {STAGED_INPUT_PATH}")
     logger.info(f"Forecast: {FORECAST_INPUT_PATH}")
-    logger.info(f"Target  : MySQL -> {DB_CONFIG['database']}")
-    logger.info("=" * 60)
+    logger.info(f"Target  : {target}")
     logger.info(
-        "NOTE: This script assumes the database and tables already exist.\n"
-        "      If not, run sql/01_schema.sql and sql/04_forecast_schema.sql first."
+        f"Mode    : {'bulk LOAD DATA' if bulk else 'batched INSERT'}"
+        f"{', upsert changed months' if UPSERT else ''}"
+        f"{f', {LOAD_WORKERS} workers' if parallel else ''}"
     )
+    logger.info("=" * 60)
+    if MYSQL_BACKEND:
+        logger.info(
+            "NOTE: This script assumes the database and tables already exist.\n"
+            "      If not, run sql/schema.sql and sql/forecast.sql first"
+            f"{' (and sql/rollups.sql)' if ROLLUPS else ''}."
+        )
 
     #  Load staged CSV
     if not os.path.exists(STAGED_INPUT_PATH):
@@ -280,11 +1235,12 @@ def main():
         )
 
     logger.info("Loading staged data...")
-    df = pd.read_csv(STAGED_INPUT_PATH)
+    df = pd.read_csv(STAGED_INPUT_PATH, dtype=STAGED_DTYPES)
     logger.info(f"Loaded {len(df):,} rows from staged CSV.")
 
     # Connect and load
     conn = get_connection()
+    pool = get_pool(LOAD_WORKERS) if parallel else None
 
     try:
         # Load dimension tables first — prescriptions depends on their IDs
@@ -295,7 +1251,7 @@ def main():
 
         # Load prescriptions fact table
         logger.info("Loading prescriptions...")
-        load_prescriptions(conn, df)
+        load_prescriptions(conn, df, bulk=bulk, pool=pool)
 
         # Load forecast table — only if forecast.csv exists
         # forecast.py must be run before loader.py to generate this file.
@@ -310,6 +1266,16 @@ def main():
                 f"Skipping forecast load. Run forecast.py to generate this file."
             )
 
+        # Drug × region forecasts — only written when FORECAST_DETAIL is on
+        if os.path.exists(FORECAST_DETAIL_INPUT_PATH):
+            logger.info("Loading drug × region forecast data...")
+            detail_df = pd.read_csv(FORECAST_DETAIL_INPUT_PATH, dtype={
+                'region_name'           : 'category',
+                'bnf_chemical_substance': 'category',
+            })
+            logger.info(f"Loaded {len(detail_df):,} rows from forecast detail CSV.")
+            load_forecast_detail(conn, detail_df)
+
         logger.info("=" * 60)
         logger.info("LOADING COMPLETE")
         logger.info("Next step: open Power BI and refresh all tables.")
@@ -322,7 +1288,7 @@ def main():
 
     finally:
         conn.close()
-        logger.info("MySQL connection closed.")
+        logger.info(f"{'MySQL' if MYSQL_BACKEND else 'SQLite'} connection closed.")
 
 
 if __name__ == "__main__":
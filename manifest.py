@@ -0,0 +1,567 @@
+import sqlite3
+import threading
+import logging
+import csv
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+# DOWNLOAD MANIFEST
+
+# The manifest records every file the scraper downloads: what was downloaded,
+# when, from where, how big it was and whether it succeeded.
+#
+# This serves two purposes in industry:
+#   1. AUDITABILITY  — In regulated sectors like healthcare, you must be able
+#                      to prove exactly what raw data you received and when.
+#   2. INCREMENTAL   — The manifest lets the scraper skip files already
+#      LOADING          downloaded on a re-run, rather than hammering the
+#                      NHS BSA server again unnecessarily.
+#
+# Storage is an embedded SQLite database, so every append is an atomic
+# transaction and several download workers (or processes) can write safely.
+# The current state of each month is also held in an in-memory index, loaded
+# once at startup, so "do we already have month X?" never touches disk.
+#
+# Each file's SHA-256 and the server's ETag / Last-Modified validators are
+# kept alongside it, so the scraper can revalidate a month with a single
+# conditional request and resume interrupted downloads safely.
+#
+# The original download_log.csv audit file is still appended to on every
+# record, and can be regenerated in full from the database with export_csv().
+
+
+# Columns added to the files table after the first release of the manifest.
+# Older databases are migrated in place when opened.
+FILES_ADDED_COLUMNS = {
+    'etag'         : 'TEXT',
+    'last_modified': 'TEXT',
+}
+
+# Column order of the CSV audit log — unchanged from the original format.
+LOG_FIELDS = [
+    'downloaded_at', 'year_month', 'filename',
+    'source_url', 'file_size_bytes', 'status', 'error_message'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS download_log (
+    log_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    downloaded_at   TEXT    NOT NULL,
+    year_month      TEXT    NOT NULL,
+    filename        TEXT,
+    source_url      TEXT,
+    file_size_bytes INTEGER,
+    status          TEXT    NOT NULL,
+    error_message   TEXT
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    year_month      TEXT    PRIMARY KEY,
+    filename        TEXT    NOT NULL,
+    source_url      TEXT,
+    file_size_bytes INTEGER,
+    sha256          TEXT,
+    etag            TEXT,
+    last_modified   TEXT,
+    downloaded_at   TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS resource_urls (
+    resource_id     TEXT    PRIMARY KEY,
+    download_url    TEXT    NOT NULL,
+    resolved_at     TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS combined_sources (
+    output_path     TEXT    NOT NULL,
+    filename        TEXT    NOT NULL,
+    file_size_bytes INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    sha256          TEXT    NOT NULL,
+    partitions      TEXT,
+    combined_at     TEXT    NOT NULL,
+    PRIMARY KEY (output_path, filename)
+);
+
+CREATE TABLE IF NOT EXISTS partial_downloads (
+    year_month      TEXT    PRIMARY KEY,
+    etag            TEXT,
+    last_modified   TEXT,
+    started_at      TEXT    NOT NULL
+);
+"""
+
+
+class DownloadManifest:
+    """
+    Indexed, concurrency-safe record of downloaded PCA files.
+
+    Five tables are kept in the SQLite database:
+      download_log      — append-only history of every attempt (the audit trail)
+      files             — one row per year_month: the latest successful download
+      resource_urls     — cache of CKAN resource_id → direct download URL
+      combined_sources  — raw files already included in each combined output
+      partial_downloads — validators of interrupted downloads awaiting resume
+
+    Usage
+
+        manifest = DownloadManifest('pca_data/logs/download_manifest.db',
+                                    csv_log_path='pca_data/logs/download_log.csv')
+        if not manifest.is_downloaded('202101', file_size_bytes=1234):
+            ...
+            manifest.record('202101', 'PCA_202101.csv', url, file_size_bytes=1234)
+    """
+
+    def __init__(self, db_path, csv_log_path=None):
+        """
+        Open (or create) the manifest database and load the in-memory index.
+
+        If the database is new and an existing CSV download log is found,
+        its history is imported so previously downloaded months are not
+        fetched again.
+
+        Parameters
+
+        db_path      : str — path to the SQLite manifest file
+        csv_log_path : str — path to the CSV audit log, or None to disable it
+        """
+        self.db_path      = db_path
+        self.csv_log_path = csv_log_path
+        self._lock        = threading.RLock()
+        self._index       = {}
+        self._url_cache   = {}
+
+        # isolation_level=None — transactions are opened explicitly below.
+        # check_same_thread=False — access is serialised by self._lock instead.
+        self._conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+        self._initialise_csv_log()
+        self._import_csv_log()
+        self._load_index()
+
+    # Setup
+
+    def _migrate(self):
+        """Add any columns missing from a manifest created by an older version."""
+        existing = {
+            row['name'] for row in self._conn.execute("PRAGMA table_info(files)")
+        }
+        for column, column_type in FILES_ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE files ADD COLUMN {column} {column_type}"
+                )
+                logger.info(f"Manifest migrated: added files.{column}")
+
+    def _initialise_csv_log(self):
+        """Create the CSV audit log with headers if it does not already exist."""
+        if self.csv_log_path and not os.path.exists(self.csv_log_path):
+            with open(self.csv_log_path, 'w', newline='') as f:
+                csv.DictWriter(f, fieldnames=LOG_FIELDS).writeheader()
+            logger.info(f"Download log initialised at {self.csv_log_path}")
+
+    def _import_csv_log(self):
+        """
+        Seed an empty manifest from an existing CSV download log.
+
+        Runs at most once per manifest — as soon as download_log holds any
+        rows, the database is the source of truth.
+        """
+        if not self.csv_log_path or not os.path.exists(self.csv_log_path):
+            return
+
+        with self._lock:
+            already_seeded = self._conn.execute(
+                "SELECT 1 FROM download_log LIMIT 1"
+            ).fetchone()
+            if already_seeded:
+                return
+
+            with open(self.csv_log_path, 'r', newline='') as f:
+                rows = list(csv.DictReader(f))
+            if not rows:
+                return
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in rows:
+                    self._insert(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        logger.info(
+            f"Manifest seeded with {len(rows):,} records from {self.csv_log_path}"
+        )
+
+    def _load_index(self):
+        """Load the current state of every month into memory."""
+        with self._lock:
+            self._index = {
+                row['year_month']: dict(row)
+                for row in self._conn.execute("SELECT * FROM files")
+            }
+            self._url_cache = {
+                row['resource_id']: row['download_url']
+                for row in self._conn.execute("SELECT * FROM resource_urls")
+            }
+        logger.info(
+            f"Download manifest loaded: {len(self._index):,} months on record, "
+            f"{len(self._url_cache):,} cached download URLs ({self.db_path})"
+        )
+
+    # Writes
+
+    def _insert(self, row):
+        """
+        Insert one log record and, if successful, update the files table.
+        A successful record also clears any pending partial download.
+        Must be called inside an open transaction.
+        """
+        file_size = row.get('file_size_bytes')
+        file_size = int(file_size) if file_size not in (None, '') else None
+
+        self._conn.execute("""
+            INSERT INTO download_log
+                (downloaded_at, year_month, filename, source_url,
+                 file_size_bytes, status, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            row['downloaded_at'], row['year_month'], row.get('filename'),
+            row.get('source_url'), file_size, row['status'],
+            row.get('error_message') or ''
+        ))
+
+        if row['status'] == 'success':
+            self._conn.execute("""
+                INSERT INTO files
+                    (year_month, filename, source_url, file_size_bytes,
+                     sha256, etag, last_modified, downloaded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (year_month) DO UPDATE SET
+                    filename        = excluded.filename,
+                    source_url      = excluded.source_url,
+                    file_size_bytes = excluded.file_size_bytes,
+                    sha256          = excluded.sha256,
+                    etag            = excluded.etag,
+                    last_modified   = excluded.last_modified,
+                    downloaded_at   = excluded.downloaded_at
+            """, (
+                row['year_month'], row.get('filename'), row.get('source_url'),
+                file_size, row.get('sha256'), row.get('etag'),
+                row.get('last_modified'), row['downloaded_at']
+            ))
+            self._conn.execute(
+                "DELETE FROM partial_downloads WHERE year_month = ?",
+                (row['year_month'],)
+            )
+
+    def record(self, year_month, filename, source_url, file_size_bytes=None,
+               status='success', error_message='', sha256=None,
+               etag=None, last_modified=None):
+        """
+        Atomically append a download attempt to the manifest.
+
+        Parameters
+
+        year_month      : str   — e.g. '202101'
+        filename        : str   — local filename saved to the raw directory
+        source_url      : str   — the URL the file was downloaded from
+        file_size_bytes : int   — size of the downloaded file in bytes
+        status          : str   — 'success', 'not_modified' or 'failed'
+        error_message   : str   — populated only when status is 'failed'
+        sha256          : str   — hex digest of the file contents, if known
+        etag            : str   — server ETag header for the file, if sent
+        last_modified   : str   — server Last-Modified header, if sent
+
+        Only 'success' records change the stored state of a month;
+        'not_modified' records a revalidation that confirmed the local copy.
+        """
+        row = {
+            'downloaded_at'  : datetime.now().isoformat(),
+            'year_month'     : year_month,
+            'filename'       : filename,
+            'source_url'     : source_url,
+            'file_size_bytes': file_size_bytes,
+            'status'         : status,
+            'error_message'  : error_message,
+            'sha256'         : sha256,
+            'etag'           : etag,
+            'last_modified'  : last_modified,
+        }
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._insert(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            if status == 'success':
+                self._index[year_month] = {
+                    key: row[key] for key in (
+                        'year_month', 'filename', 'source_url',
+                        'file_size_bytes', 'sha256', 'etag',
+                        'last_modified', 'downloaded_at'
+                    )
+                }
+
+            # Keep the human-readable CSV audit trail in step
+            if self.csv_log_path:
+                with open(self.csv_log_path, 'a', newline='') as f:
+                    csv.DictWriter(f, fieldnames=LOG_FIELDS).writerow(
+                        {field: row[field] for field in LOG_FIELDS}
+                    )
+
+    # Reads
+
+    def get(self, year_month):
+        """
+        Return the latest successful download record for a month.
+
+        Returns
+
+        dict or None — keys: year_month, filename, source_url,
+                       file_size_bytes, sha256, etag, last_modified,
+                       downloaded_at
+        """
+        with self._lock:
+            entry = self._index.get(year_month)
+            return dict(entry) if entry else None
+
+    def is_downloaded(self, year_month, file_size_bytes=None, sha256=None):
+        """
+        Answer "do we already have month X (with size / hash Y)?" in O(1).
+
+        Size and hash are only compared when both the caller and the
+        manifest have a value for them.
+        """
+        entry = self.get(year_month)
+        if entry is None:
+            return False
+
+        if (
+            file_size_bytes is not None
+            and entry['file_size_bytes'] is not None
+            and int(entry['file_size_bytes']) != int(file_size_bytes)
+        ):
+            return False
+
+        if sha256 and entry['sha256'] and entry['sha256'] != sha256:
+            return False
+
+        return True
+
+    def downloaded_months(self):
+        """Return the set of year_month values downloaded successfully."""
+        with self._lock:
+            return set(self._index)
+
+    # Resource URL cache
+
+    def get_resource_url(self, resource_id):
+        """Return the cached direct download URL for a resource, or None."""
+        with self._lock:
+            return self._url_cache.get(resource_id)
+
+    def cache_resource_urls(self, resource_urls):
+        """
+        Store resolved download URLs in one transaction.
+
+        Parameters
+
+        resource_urls : dict — resource_id → direct download URL
+        """
+        changed = {
+            resource_id: url for resource_id, url in resource_urls.items()
+            if url and self._url_cache.get(resource_id) != url
+        }
+        if not changed:
+            return
+
+        resolved_at = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("""
+                    INSERT INTO resource_urls (resource_id, download_url, resolved_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (resource_id) DO UPDATE SET
+                        download_url = excluded.download_url,
+                        resolved_at  = excluded.resolved_at
+                """, [
+                    (resource_id, url, resolved_at)
+                    for resource_id, url in changed.items()
+                ])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._url_cache.update(changed)
+
+    def forget_resource_url(self, resource_id):
+        """Drop a cached URL, e.g. after a download from it failed."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM resource_urls WHERE resource_id = ?", (resource_id,)
+            )
+            self._url_cache.pop(resource_id, None)
+
+    # Combined sources
+
+    def get_combined_sources(self, output_path):
+        """
+        Return the raw files recorded as included in a combined output.
+
+        Returns
+
+        dict — filename → dict(filename, file_size_bytes, mtime_ns, sha256,
+               partitions, combined_at); partitions is a comma-separated
+               list of YEAR_MONTH values (Parquet outputs only)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM combined_sources WHERE output_path = ?",
+                (output_path,)
+            ).fetchall()
+        return {row['filename']: dict(row) for row in rows}
+
+    def record_combined_sources(self, output_path, sources, replace_all=False):
+        """
+        Record raw files as included in a combined output, in one transaction.
+
+        Parameters
+
+        output_path : str  — the combined file or dataset directory
+        sources     : list of dict — filename, file_size_bytes, mtime_ns,
+                      sha256 and optionally partitions (list of YEAR_MONTH)
+        replace_all : bool — forget every other file recorded for the output,
+                      as after a full rebuild
+        """
+        combined_at = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if replace_all:
+                    self._conn.execute(
+                        "DELETE FROM combined_sources WHERE output_path = ?",
+                        (output_path,)
+                    )
+                self._conn.executemany("""
+                    INSERT INTO combined_sources
+                        (output_path, filename, file_size_bytes, mtime_ns,
+                         sha256, partitions, combined_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (output_path, filename) DO UPDATE SET
+                        file_size_bytes = excluded.file_size_bytes,
+                        mtime_ns        = excluded.mtime_ns,
+                        sha256          = excluded.sha256,
+                        partitions      = excluded.partitions,
+                        combined_at     = excluded.combined_at
+                """, [
+                    (
+                        output_path, source['filename'], source['file_size_bytes'],
+                        source['mtime_ns'], source['sha256'],
+                        ','.join(source.get('partitions') or []) or None,
+                        combined_at
+                    )
+                    for source in sources
+                ])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # Partial downloads
+
+    def start_partial(self, year_month, etag=None, last_modified=None):
+        """
+        Remember the validators of a download that is being written to disk,
+        so an interrupted transfer can later be resumed with If-Range.
+        """
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO partial_downloads
+                    (year_month, etag, last_modified, started_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (year_month) DO UPDATE SET
+                    etag          = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    started_at    = excluded.started_at
+            """, (year_month, etag, last_modified, datetime.now().isoformat()))
+
+    def get_partial(self, year_month):
+        """
+        Return the validators of an interrupted download, or None.
+
+        Returns
+
+        dict or None — keys: year_month, etag, last_modified, started_at
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM partial_downloads WHERE year_month = ?",
+                (year_month,)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def clear_partial(self, year_month):
+        """Forget an interrupted download, e.g. when it cannot be resumed."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM partial_downloads WHERE year_month = ?",
+                (year_month,)
+            )
+
+    # Export
+
+    def export_csv(self, output_path=None):
+        """
+        Write the full download history in the original CSV audit format.
+
+        Parameters
+
+        output_path : str — destination file; defaults to csv_log_path
+
+        Returns
+
+        str — path of the written CSV
+        """
+        output_path = output_path or self.csv_log_path
+        tmp_path    = f"{output_path}.tmp"
+
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT {', '.join(LOG_FIELDS)}
+                FROM download_log
+                ORDER BY log_id
+            """).fetchall()
+
+            # Write to a temporary file first so readers never see a
+            # half-written audit log
+            with open(tmp_path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+                writer.writeheader()
+                writer.writerows(dict(row) for row in rows)
+            os.replace(tmp_path, output_path)
+
+        logger.info(f"Exported {len(rows):,} download records to {output_path}")
+        return output_path
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,6 +1,12 @@
 import pandas as pd
+import numpy as np
 import os
+import re
+import json
+import hashlib
 import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 # Logging 
 os.makedirs('pca_data/logs', exist_ok=True)
@@ -16,8 +22,60 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # File Paths 
-INPUT_PATH  = 'pca_data/combined_pca_data.csv'   # output of scraper.py
-OUTPUT_PATH = 'pca_data/staged_pca_data.csv'     # input to loader.py
+RAW_DATA_DIR       = 'pca_data/raw'                     # raw monthly files from scraper.py
+INPUT_PATH         = 'pca_data/combined_pca_data.csv'   # output of scraper.py (CSV format)
+INPUT_DATASET_PATH = 'pca_data/combined_pca_data'       # output of scraper.py (Parquet format)
+OUTPUT_PATH        = 'pca_data/staged_pca_data.csv'     # input to loader.py
+STATE_PATH         = 'pca_data/logs/processor_state.json'  # source months already staged
+
+# Raw monthly file names written by scraper.py — the month is in the name
+RAW_FILE_PATTERN = r'PCA_(\d{6})\.csv'
+
+# The only columns the processor needs from the combined data.
+# BNF_CHEMICAL_SUBSTANCE_CODE is used only to match cohorts by BNF code prefix.
+INPUT_COLUMNS = [
+    'YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'BNF_CHEMICAL_SUBSTANCE_CODE',
+    'ITEMS', 'NIC'
+]
+
+# Where the staged data is built from:
+#   'combined' — the combined output of scraper.py, loaded in one go
+#   'fused'    — each raw monthly file in RAW_DATA_DIR, cleaned, filtered and
+#                aggregated on its own; only the small per-month aggregates
+#                are concatenated. Set COMBINE_OUTPUT = False in scraper.py
+#                so the full combined dataset is never written at all.
+STAGING_MODE    = 'combined'
+
+# Only recompute the months whose source data is new or changed since the
+# last run (tracked in STATE_PATH) and merge them into the existing staged
+# files. Falls back to a full rebuild whenever that cannot be done safely,
+# e.g. on the first run, after a cohort change, or from the combined CSV.
+INCREMENTAL_STAGING = True
+
+# Worker processes aggregating raw monthly files in 'fused' mode
+STAGING_WORKERS = os.cpu_count() or 1
+
+# Input is read in chunks sized so that the rows being processed at once
+# stay within this budget (shared between workers in 'fused' mode).
+# Only the small running aggregate is kept between chunks, so memory use no
+# longer grows with the length of history.
+MEMORY_BUDGET_MB = 512
+
+# Rough number of copies of a chunk alive at once while it is cleaned,
+# filtered and grouped — used to turn MEMORY_BUDGET_MB into a chunk size
+CHUNK_WORKING_COPIES = 4
+
+# Rows sampled from the input to estimate the in-memory size of one row
+CHUNK_SAMPLE_ROWS    = 10_000
+
+GROUP_COLUMNS = ['YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE']
+
+# Text columns carried as categoricals from the moment they are read:
+# millions of rows repeat about seven region names and a few thousand
+# substance names, so each row holds a small integer code instead of a
+# Python string, and string clean-up runs once per distinct value.
+CATEGORY_COLUMNS = ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'BNF_CHEMICAL_SUBSTANCE_CODE']
+CATEGORY_DTYPES  = {col: 'category' for col in CATEGORY_COLUMNS}
 
 # Antidepressant Reference List
 # Only rows matching these BNF chemical substance names will be retained.
@@ -36,51 +94,456 @@ ANTIDEPRESSANTS = [
     'Venlafaxine', 'Vortioxetine',
 ]
 
+# Cohorts
+# Each cohort is a group of drugs staged to its own region-level file. All
+# cohorts are filled from the same single pass over the data, so adding one
+# does not add another read of the combined dataset.
+# A row joins a cohort if its BNF_CHEMICAL_SUBSTANCE is in 'substances' or
+# its BNF_CHEMICAL_SUBSTANCE_CODE starts with one of 'bnf_code_prefixes'
+# (e.g. '0403' — BNF section 4.3, antidepressant drugs). Either may be empty.
+# The 'antidepressants' cohort is the input to forecast.py and loader.py.
+COHORTS = {
+    'antidepressants': {
+        'substances'       : ANTIDEPRESSANTS,
+        'bnf_code_prefixes': [],
+        'output_path'      : OUTPUT_PATH,
+    },
+    # 'antipsychotics': {
+    #     'substances'       : [],
+    #     'bnf_code_prefixes': ['0402'],
+    #     'output_path'      : 'pca_data/staged_antipsychotics.csv',
+    # },
+}
 
-def main():
 
-    # ─Load
-    logger.info("Loading combined data...")
-    df = pd.read_csv(INPUT_PATH)
-    logger.info(f"Loaded {len(df):,} rows.")
+def use_parquet_input():
+    """True if the Parquet dataset is the most recently written combined output."""
+    return os.path.isdir(INPUT_DATASET_PATH) and (
+        not os.path.exists(INPUT_PATH)
+        or os.path.getmtime(INPUT_DATASET_PATH) >= os.path.getmtime(INPUT_PATH)
+    )
+
+
+def load_combined(months=None):
+    """
+    Load the combined output of scraper.py.
+
+    The month-partitioned Parquet dataset is used whenever it is the most
+    recently written output. Only INPUT_COLUMNS are read from it and, when
+    months is given, only those YEAR_MONTH partitions are opened at all.
+    Otherwise the combined CSV is read, for compatibility.
+
+    Input columns missing from older combined outputs are added as empty.
+
+    Args:
+        months : optional list of YEAR_MONTH ints (e.g. [202101]) to load
+
+    Returns:
+        DataFrame with INPUT_COLUMNS, in that order
+    """
+    if use_parquet_input():
+        import pyarrow.dataset as ds
+
+        logger.info(f"Reading Parquet dataset: {INPUT_DATASET_PATH}")
+        dataset = ds.dataset(INPUT_DATASET_PATH, format='parquet', partitioning='hive')
+        df = pd.read_parquet(
+            INPUT_DATASET_PATH,
+            columns = [col for col in INPUT_COLUMNS if col in dataset.schema.names],
+            filters = [('YEAR_MONTH', 'in', list(months))] if months else None
+        )
+        # The partition key comes back as a category — restore plain ints
+        df['YEAR_MONTH'] = df['YEAR_MONTH'].astype(int)
+        return df.reindex(columns=INPUT_COLUMNS)
+
+    logger.info(f"Reading combined CSV: {INPUT_PATH}")
+    usecols, dtypes = csv_input_columns(INPUT_PATH)
+    df = pd.read_csv(INPUT_PATH, usecols=usecols, dtype=dtypes)
+    if months:
+        df = df[df['YEAR_MONTH'].isin(months)]
+    return df.reindex(columns=INPUT_COLUMNS)
+
+
+def csv_input_columns(filepath):
+    """
+    The INPUT_COLUMNS present in a CSV file's header, and their dtypes.
+
+    Returns:
+        tuple of (usecols list, dtype dict for read_csv)
+    """
+    header  = pd.read_csv(filepath, nrows=0).columns
+    usecols = [col for col in INPUT_COLUMNS if col in header]
+    dtypes  = {col: dtype for col, dtype in CATEGORY_DTYPES.items() if col in usecols}
+    return usecols, dtypes
+
+
+def chunk_rows_for_budget(sample, budget_mb=MEMORY_BUDGET_MB):
+    """
+    Number of rows per chunk that keeps processing within budget_mb,
+    estimated from the in-memory size of a sample of the input.
+    """
+    if len(sample) == 0:
+        return CHUNK_SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    return max(1_000, int(budget_mb * 1024 ** 2 / (bytes_per_row * CHUNK_WORKING_COPIES)))
+
+
+def iter_csv_chunks(filepath, budget_mb=MEMORY_BUDGET_MB):
+    """
+    Stream a CSV holding PCA rows (the combined CSV or a raw monthly file)
+    in chunks that fit budget_mb, as DataFrames with INPUT_COLUMNS.
+    """
+    usecols, dtypes = csv_input_columns(filepath)
+    chunksize = chunk_rows_for_budget(
+        pd.read_csv(filepath, usecols=usecols, dtype=dtypes, nrows=CHUNK_SAMPLE_ROWS), budget_mb
+    )
+    with pd.read_csv(filepath, usecols=usecols, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk.reindex(columns=INPUT_COLUMNS)
+
+
+def iter_combined(budget_mb=MEMORY_BUDGET_MB, months=None):
+    """
+    Stream the combined output of scraper.py in chunks that fit budget_mb.
+
+    Reads the same source as load_combined() — the Parquet dataset when it
+    is the most recently written output, otherwise the combined CSV — and
+    yields DataFrames with INPUT_COLUMNS, in file order. When months is
+    given, only those YEAR_MONTH partitions of the Parquet dataset are read
+    (the CSV is filtered after parsing).
+    """
+    if use_parquet_input():
+        import pyarrow.dataset as ds
+
+        dataset   = ds.dataset(INPUT_DATASET_PATH, format='parquet', partitioning='hive')
+        columns   = [col for col in INPUT_COLUMNS if col in dataset.schema.names]
+        chunksize = chunk_rows_for_budget(
+            dataset.head(CHUNK_SAMPLE_ROWS, columns=columns).to_pandas(), budget_mb
+        )
+        logger.info(f"Streaming Parquet dataset: {INPUT_DATASET_PATH} ({chunksize:,} rows per chunk)")
+
+        month_filter = ds.field('YEAR_MONTH').isin(list(months)) if months is not None else None
+        for batch in dataset.to_batches(columns=columns, filter=month_filter, batch_size=chunksize):
+            chunk = batch.to_pandas()
+            chunk['YEAR_MONTH'] = chunk['YEAR_MONTH'].astype(int)
+            yield chunk.reindex(columns=INPUT_COLUMNS)
+        return
+
+    logger.info(f"Streaming combined CSV: {INPUT_PATH}")
+    for chunk in iter_csv_chunks(INPUT_PATH, budget_mb):
+        yield chunk if months is None else chunk[chunk['YEAR_MONTH'].isin(months)]
 
+
+def map_categories(values, func):
+    """
+    Apply a string function once per distinct value of a text column.
+
+    Returns a categorical Series whose categories are the distinct cleaned
+    values in sorted order — values that become equal after cleaning (e.g.
+    'Escitalopram' and 'Escitalopram ') share one category, and grouping by
+    the result orders groups exactly as grouping plain strings would.
+
+    Args:
+        values : Series of strings, plain or categorical
+        func   : function taking and returning a Series of strings,
+                 e.g. lambda s: s.str.strip()
+
+    Returns:
+        categorical Series aligned with values
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values, sort=True)
+
+    new_codes, categories = pd.factorize(
+        func(pd.Series(uniques, dtype=object)), sort=True
+    )
+    # Missing values (code -1) pick the trailing -1 — also when every value
+    # is missing and there are no categories at all
+    codes = np.append(new_codes, -1)[codes]
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=values.index,
+        name=values.name
+    )
+
+
+def compile_cohorts(cohorts=COHORTS):
+    """
+    Precompile cohort definitions into hashed lookups.
+
+    Substance names become a frozenset. BNF code prefixes are grouped by
+    length into frozensets, so a code is tested with one set lookup per
+    distinct prefix length rather than one startswith() per prefix.
+
+    Returns:
+        dict of cohort name → (frozenset of names, {length: frozenset of prefixes})
+    """
+    matchers = {}
+    for name, cohort in cohorts.items():
+        prefixes = {}
+        for prefix in cohort.get('bnf_code_prefixes', []):
+            prefixes.setdefault(len(prefix), set()).add(prefix)
+        matchers[name] = (
+            frozenset(cohort.get('substances', [])),
+            {length: frozenset(group) for length, group in prefixes.items()}
+        )
+    return matchers
+
+
+def _category_mask(values, is_member):
+    """
+    Boolean row mask for a categorical column, evaluating is_member once
+    per category and spreading the answers to rows by category code.
+    """
+    categories = values.cat.categories
+    member = np.fromiter((is_member(c) for c in categories), dtype=bool, count=len(categories))
+    # Missing values have code -1, which picks the trailing False
+    return np.append(member, False)[values.cat.codes.to_numpy()]
+
+
+def cohort_masks(df, matchers):
+    """
+    Row masks selecting each cohort's rows from cleaned PCA rows.
+
+    A row belongs to a cohort if its substance name is in the cohort's
+    substance list or its BNF chemical substance code starts with one of
+    the cohort's prefixes. Cohorts may overlap.
+
+    Returns:
+        dict of cohort name → boolean numpy array
+    """
+    masks = {}
+    for name, (substances, prefixes) in matchers.items():
+        mask = np.zeros(len(df), dtype=bool)
+        if substances:
+            mask |= _category_mask(
+                df['BNF_CHEMICAL_SUBSTANCE'], lambda s: s in substances
+            )
+        if prefixes:
+            mask |= _category_mask(
+                df['BNF_CHEMICAL_SUBSTANCE_CODE'],
+                lambda code: any(code[:length] in group for length, group in prefixes.items())
+            )
+        masks[name] = mask
+    return masks
+
+
+def aggregate_rows(df):
+    """Sum ITEMS and NIC per drug-region-month (only combinations that occur)."""
+    return df.groupby(
+        GROUP_COLUMNS,
+        as_index=False,
+        observed=True
+    ).agg(
+        ITEMS=('ITEMS', 'sum'),
+        NIC=('NIC',   'sum')
+    )
+
+
+def clean_and_aggregate(df, matchers, log=logger.info):
+    """
+    Clean PCA rows, split them into cohorts and aggregate each cohort to
+    drug-region-month level — one pass over the rows for all cohorts.
+
+    This is the per-row work of the processor. Because every group it
+    produces falls within a single YEAR_MONTH, it can equally run on the
+    whole combined dataset or on one monthly file at a time.
+
+    Args:
+        df       : DataFrame with INPUT_COLUMNS
+        matchers : output of compile_cohorts()
+        log      : logging function for the step-by-step row counts
+
+    Returns:
+        dict of cohort name → DataFrame with YEAR_MONTH (202101 format),
+        REGION_NAME, BNF_CHEMICAL_SUBSTANCE, ITEMS and NIC (in whole pence)
+        — one row per drug-region-month
+    """
     # Drop rows with missing values
     # Any row missing a region, drug name, item count, or cost is unusable.
     before = len(df)
     df = df.dropna(subset=['YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ITEMS', 'NIC'])
-    logger.info(f"Dropped {before - len(df):,} rows with missing values.")
+    log(f"Dropped {before - len(df):,} rows with missing values.")
+
+    # Carry NIC in whole pence until finalise_staged()
+    # NHS BSA publishes NIC to the penny, so integer sums are exact and the
+    # totals do not depend on how rows were split into chunks or files.
+    df['NIC'] = np.rint(df['NIC'].astype(float) * 100).astype(np.int64)
 
     # Strip whitespace from text columns ─
     # Trailing spaces cause drugs like 'Sertraline hydrochloride ' to be
     # treated as a different drug — a silent but serious data quality issue.
-    df['REGION_NAME']            = df['REGION_NAME'].str.strip()
-    df['BNF_CHEMICAL_SUBSTANCE'] = df['BNF_CHEMICAL_SUBSTANCE'].str.strip()
-
-    # Filter to antidepressants only 
-    before = len(df)
-    df = df[df['BNF_CHEMICAL_SUBSTANCE'].isin(ANTIDEPRESSANTS)].copy()
-    logger.info(f"Filtered to antidepressants: {len(df):,} rows retained, {before - len(df):,} removed.")
-    logger.info(f"Unique antidepressants found: {df['BNF_CHEMICAL_SUBSTANCE'].nunique()}")
+    # Runs once per distinct name, not once per row.
+    for col in CATEGORY_COLUMNS:
+        df[col] = map_categories(df[col], lambda s: s.str.strip())
 
     # Standardise region names to Title Case 
     # Converts 'NORTH WEST' → 'North West' for clean display in Power BI.
-    df['REGION_NAME'] = df['REGION_NAME'].str.title()
+    df['REGION_NAME'] = map_categories(df['REGION_NAME'], lambda s: s.str.title())
 
-    # Aggregate to region level
-    # The raw NHS BSA data is published at GP practice or ICB sub-level,
-    # meaning there are many rows per drug-region-month combination.
-    # We sum ITEMS and NIC up to the region level — exactly as your
-    # notebook does in cell 13 with groupby().agg().
-    before = len(df)
-    df = df.groupby(
-        ['YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'],
-        as_index=False
-    ).agg(
-        ITEMS=('ITEMS', 'sum'),
-        NIC=('NIC',   'sum')
-    )
-    logger.info(f"Aggregated from {before:,} rows to {len(df):,} rows at region level.")
+    aggregates = {}
+    for name, mask in cohort_masks(df, matchers).items():
+        # Filter to the cohort's drugs only
+        cohort_df = df[mask]
+        log(f"{name}: {len(cohort_df):,} rows retained, {len(df) - len(cohort_df):,} removed.")
+        log(f"{name}: unique substances found: {cohort_df['BNF_CHEMICAL_SUBSTANCE'].nunique()}")
+
+        # Aggregate to region level
+        # The raw NHS BSA data is published at GP practice or ICB sub-level,
+        # meaning there are many rows per drug-region-month combination.
+        # We sum ITEMS and NIC up to the region level — exactly as your
+        # notebook does in cell 13 with groupby().agg().
+        aggregates[name] = aggregate_rows(cohort_df)
+        log(f"{name}: aggregated from {len(cohort_df):,} rows to {len(aggregates[name]):,} rows at region level.")
+
+    return aggregates
+
+
+def merge_partials(partials):
+    """
+    Merge partial drug-region-month aggregates by summing ITEMS and NIC
+    per group. Groups come out sorted, exactly as a single groupby over
+    all the underlying rows would return them.
+
+    Text columns stay categorical: the partials' categories are unioned
+    and re-sorted, since concatenating categoricals with different
+    categories would otherwise fall back to plain strings.
+    """
+    merged = pd.concat(partials, ignore_index=True)
+    for col in ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE']:
+        merged[col] = pd.api.types.union_categoricals(
+            [partial[col] for partial in partials],
+            sort_categories=True,
+            ignore_order=True
+        )
+    return aggregate_rows(merged)
+
+
+def merge_cohort_partials(partials):
+    """merge_partials() per cohort, for a list of clean_and_aggregate() results."""
+    return {
+        name: merge_partials([partial[name] for partial in partials])
+        for name in partials[0]
+    }
+
+
+def aggregate_chunks(chunks, matchers):
+    """
+    Run clean_and_aggregate() on each chunk and fold the partial results
+    into one running aggregate per cohort, so only one chunk of input rows
+    and the (small) aggregates are ever held in memory together.
+
+    ITEMS and NIC (in pence) are integers, so the sums are exact and match
+    a single pass over all the rows.
+
+    Returns:
+        tuple of (input rows read, dict of cohort name → aggregated DataFrame)
+    """
+    rows       = 0
+    aggregates = None
+    for chunk in chunks:
+        rows    += len(chunk)
+        partial  = clean_and_aggregate(chunk, matchers, log=logger.debug)
+        aggregates = (
+            partial if aggregates is None
+            else merge_cohort_partials([aggregates, partial])
+        )
+
+    if aggregates is None:
+        empty = pd.DataFrame(columns=GROUP_COLUMNS + ['ITEMS', 'NIC']).astype(
+            {'REGION_NAME': 'category', 'BNF_CHEMICAL_SUBSTANCE': 'category'}
+        )
+        aggregates = {name: empty.copy() for name in matchers}
+    return rows, aggregates
+
+
+def aggregate_raw_file(filepath, matchers, budget_mb=MEMORY_BUDGET_MB):
+    """
+    Read one raw monthly file from scraper.py in chunks and aggregate it
+    with aggregate_chunks(). Runs in a worker process in 'fused' mode.
+
+    Required columns missing from the file are added as empty, so their
+    rows are dropped as unusable — as they would be from the combined data.
+
+    Returns:
+        tuple of (rows read, dict of cohort name → aggregated DataFrame)
+    """
+    return aggregate_chunks(iter_csv_chunks(filepath, budget_mb), matchers)
 
+
+def stage_from_raw(matchers, raw_dir=RAW_DATA_DIR, workers=STAGING_WORKERS, raw_files=None):
+    """
+    Map-reduce the raw monthly files straight to region-level aggregates.
+
+    Each file is aggregated on its own (in parallel when workers > 1), so
+    only one month of GP-level rows per worker is ever held in memory.
+    The per-month aggregates are then concatenated in date order and
+    summed once more, which merges any month split across files.
+
+    A file that cannot be read is logged and skipped, as in
+    scraper.combine_datasets(), and returned in the list of failed files
+    so the caller can leave its month as it was.
+
+    Args:
+        raw_files : optional list of file names in raw_dir to aggregate;
+                    all CSV files in raw_dir by default
+
+    Returns:
+        tuple of (raw rows read, dict of cohort name → aggregated DataFrame,
+        list of file names that could not be read)
+    """
+    if raw_files is None:
+        raw_files = os.listdir(raw_dir)
+    raw_files = sorted(f for f in raw_files if f.endswith('.csv'))
+    if not raw_files:
+        raise FileNotFoundError(
+            f"No raw CSV files found in {raw_dir}/\n"
+            f"Run scraper.py first to download them."
+        )
+    logger.info(f"Aggregating {len(raw_files)} raw monthly files from {raw_dir}/ ({workers} worker(s))...")
+
+    paths      = [os.path.join(raw_dir, f) for f in raw_files]
+    aggregates = []
+    failed     = []
+    total_rows = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Submitted up front, collected in date order. Each worker gets an
+        # equal share of the memory budget.
+        futures = [
+            pool.submit(aggregate_raw_file, path, matchers, MEMORY_BUDGET_MB / workers)
+            for path in paths
+        ]
+        for filename, future in zip(raw_files, futures):
+            try:
+                rows, aggregate = future.result()
+            except Exception as e:
+                logger.error(f"Error reading {filename}: {e} — skipping.")
+                failed.append(filename)
+                continue
+
+            logger.info(
+                f"  {filename}: {rows:,} rows → "
+                + ", ".join(f"{name} {len(df):,}" for name, df in aggregate.items())
+                + " aggregated rows."
+            )
+            total_rows += rows
+            aggregates.append(aggregate)
+
+    if not aggregates:
+        raise ValueError(f"None of the raw files in {raw_dir}/ could be read.")
+
+    return total_rows, merge_cohort_partials(aggregates), failed
+
+
+def finalise_staged(df):
+    """
+    Turn drug-region-month aggregates into the staged layout expected by
+    loader.py and forecast.py: YEAR, YEAR_MONTH (2021-01 format),
+    REGION_NAME, BNF_CHEMICAL_SUBSTANCE, ITEMS, NIC.
+    """
     # Derive YEAR column from YEAR_MONTH
     # Must happen before Step 8 which changes the YEAR_MONTH format.
     df.insert(0, 'YEAR', df['YEAR_MONTH'].astype(str).str[:4].astype(int))
@@ -95,17 +558,230 @@ def main():
     # Prevents type mismatch errors when loader.py inserts into MySQL.
     df['YEAR']  = df['YEAR'].astype(int)
     df['ITEMS'] = df['ITEMS'].astype(int)
-    df['NIC']   = df['NIC'].astype(float).round(2)
+    df['NIC']   = (df['NIC'] / 100).round(2)  # whole pence → GBP
 
     # Select and order final columns
-    df = df[['YEAR', 'YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ITEMS', 'NIC']]
+    return df[['YEAR', 'YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ITEMS', 'NIC']]
+
+
+def _month_label(year_month):
+    """202101 → '2021-01', the YEAR_MONTH format of the staged output."""
+    year_month = int(year_month)
+    return f"{year_month // 100}-{year_month % 100:02d}"
+
+
+def source_fingerprints():
+    """
+    Fingerprint every source month of the current input, without parsing it.
+
+    'fused' mode        — raw files in RAW_DATA_DIR, keyed on the month in
+                          their file name (PCA_202101.csv), fingerprinted by
+                          size and modification time.
+    Parquet dataset     — one YEAR_MONTH=... partition per month, fingerprinted
+                          by the name, size and modification time of its part
+                          files. scraper.py only rewrites the parts of changed
+                          raw files, so untouched months keep their fingerprint.
+    Combined CSV        — months cannot be told apart without reading the
+                          whole file, so no fingerprints are returned.
+
+    Returns:
+        tuple of (source kind, dict of YEAR_MONTH int → fingerprint, or None)
+    """
+    if STAGING_MODE == 'fused':
+        fingerprints = {}
+        for filename in sorted(os.listdir(RAW_DATA_DIR)):
+            if not filename.endswith('.csv'):
+                continue
+            match = re.fullmatch(RAW_FILE_PATTERN, filename)
+            if not match:
+                logger.info(f"{filename} has no month in its name — months cannot be tracked.")
+                return 'raw', None
+            stat = os.stat(os.path.join(RAW_DATA_DIR, filename))
+            fingerprints[int(match.group(1))] = f"{stat.st_size}:{stat.st_mtime_ns}"
+        return 'raw', fingerprints
+
+    if use_parquet_input():
+        fingerprints = {}
+        for entry in sorted(os.scandir(INPUT_DATASET_PATH), key=lambda e: e.name):
+            if not (entry.is_dir() and entry.name.startswith('YEAR_MONTH=')):
+                continue
+            parts = []
+            for part in sorted(os.scandir(entry.path), key=lambda e: e.name):
+                stat = part.stat()
+                parts.append(f"{part.name}:{stat.st_size}:{stat.st_mtime_ns}")
+            fingerprints[int(entry.name.split('=', 1)[1])] = ','.join(parts)
+        return 'parquet', fingerprints
+
+    return 'csv', None
+
+
+def config_fingerprint(source_kind):
+    """Hash of everything besides the source data that shapes the staged output."""
+    config = {'source': source_kind, 'columns': INPUT_COLUMNS, 'cohorts': COHORTS}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def load_state():
+    """Read STATE_PATH, or return None if there is no usable state."""
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_state(source_kind, fingerprints):
+    """Atomically record the source months the staged outputs now reflect."""
+    state = {
+        'config'      : config_fingerprint(source_kind),
+        'months'      : {str(month): fp for month, fp in fingerprints.items()},
+        'processed_at': datetime.now().isoformat(),
+    }
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def plan_incremental(source_kind, fingerprints):
+    """
+    Work out which months need recomputing since the last run.
+
+    Returns:
+        None if a full rebuild is needed (the reason is logged), otherwise a
+        tuple of (changed or new months, months no longer in the source)
+    """
+    if fingerprints is None:
+        logger.info("Source months cannot be fingerprinted — rebuilding in full.")
+        return None
+
+    state = load_state()
+    if state is None:
+        logger.info(f"No processor state at {STATE_PATH} — rebuilding in full.")
+        return None
+    if state['config'] != config_fingerprint(source_kind):
+        logger.info("Input source or cohort configuration changed — rebuilding in full.")
+        return None
+
+    missing = [c['output_path'] for c in COHORTS.values() if not os.path.exists(c['output_path'])]
+    if missing:
+        logger.info(f"Staged output missing ({', '.join(missing)}) — rebuilding in full.")
+        return None
+
+    previous = {int(month): fp for month, fp in state['months'].items()}
+    changed  = sorted(m for m, fp in fingerprints.items() if previous.get(m) != fp)
+    removed  = sorted(set(previous) - set(fingerprints))
+    return changed, removed
+
+
+def merge_staged(output_path, new_rows, replaced_months):
+    """
+    Replace some months of an existing staged file with freshly computed rows.
+
+    Rows are ordered exactly as a full rebuild orders them — by YEAR_MONTH,
+    REGION_NAME, then BNF_CHEMICAL_SUBSTANCE — so the merged file matches
+    what a full run would have written.
+    """
+    existing = pd.read_csv(output_path)
+    kept     = existing[~existing['YEAR_MONTH'].isin(replaced_months)]
+
+    merged = pd.concat(
+        [kept, new_rows.astype({'REGION_NAME': str, 'BNF_CHEMICAL_SUBSTANCE': str})],
+        ignore_index=True
+    )
+    return merged.sort_values(
+        ['YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE'], kind='stable'
+    ).astype({'YEAR': int, 'ITEMS': int, 'NIC': float}).reset_index(drop=True)
+
+
+def write_staged(df, output_path):
+    """Write a staged file to a temporary path and swap it into place."""
+    tmp_path = f"{output_path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+
+
+def main():
+    matchers = compile_cohorts()
+    logger.info(f"Cohorts: {', '.join(COHORTS)}")
+
+    # Decide what needs recomputing
+    source_kind, fingerprints = source_fingerprints()
+    plan = plan_incremental(source_kind, fingerprints) if INCREMENTAL_STAGING else None
+
+    if plan is not None:
+        changed, removed = plan
+        if not changed and not removed:
+            logger.info("Staged data is up to date — no new or changed source months.")
+            print("\nDone. Staged data is already up to date.")
+            return
+        logger.info(
+            f"Incremental run: {len(changed)} new or changed month(s) to recompute"
+            f"{f', {len(removed)} removed' if removed else ''}, "
+            f"{len(fingerprints) - len(changed)} unchanged."
+        )
+
+    months = plan[0] if plan is not None else None
+
+    # Source months whose raw file could not be read ('fused' mode only)
+    failed_months = []
+
+    if months == []:
+        # Months were only removed from the source — nothing to read
+        rows, aggregates = aggregate_chunks([], matchers)
+    elif STAGING_MODE == 'fused':
+        # Map-reduce over the raw monthly files
+        raw_files = None if months is None else [f"PCA_{month}.csv" for month in months]
+        rows, aggregates, failed_files = stage_from_raw(matchers, raw_files=raw_files)
+        failed_months = sorted(
+            int(match.group(1)) for match in
+            (re.fullmatch(RAW_FILE_PATTERN, filename) for filename in failed_files)
+            if match
+        )
+        if failed_months:
+            logger.warning(
+                f"{len(failed_months)} month(s) could not be read and will be retried "
+                f"on the next run: {', '.join(map(_month_label, failed_months))}"
+            )
+    else:
+        # ─Load, chunk by chunk, aggregating as we go
+        logger.info(f"Streaming combined data (memory budget {MEMORY_BUDGET_MB:,} MB)...")
+        rows, aggregates = aggregate_chunks(iter_combined(months=months), matchers)
+    logger.info(f"Read {rows:,} rows in a single pass for {len(COHORTS)} cohort(s).")
+
+    for name, df in aggregates.items():
+        output_path = COHORTS[name]['output_path']
+        logger.info(
+            f"{name}: {len(df):,} rows at region level, "
+            f"{df['BNF_CHEMICAL_SUBSTANCE'].nunique()} unique substances."
+        )
+
+        df = finalise_staged(df)
+
+        if plan is not None:
+            # Swap the recomputed months into the existing staged file —
+            # months that failed to read keep their previous staged rows
+            replaced = (
+                set(df['YEAR_MONTH']) | {_month_label(m) for m in changed + removed}
+            ) - {_month_label(m) for m in failed_months}
+            df = merge_staged(output_path, df, replaced)
+            logger.info(f"{name}: merged {len(replaced)} month(s) into {output_path}")
+
+        # ave staged output 
+        write_staged(df, output_path)
+
+        logger.info(f"Staged data saved: {len(df):,} rows → {output_path}")
+        print(f"\nDone. {len(df):,} rows saved to {output_path}")
 
-    # ave staged output 
-    df.to_csv(OUTPUT_PATH, index=False)
+    if fingerprints is not None:
+        # A month that failed to read is recorded with a placeholder that never
+        # matches its source, so the next incremental run tries it again
+        save_state(source_kind, {
+            **fingerprints,
+            **{month: 'unreadable' for month in failed_months}
+        })
 
-    logger.info(f"Staged data saved: {len(df):,} rows → {OUTPUT_PATH}")
     logger.info("Next step: run loader.py to load into MySQL.")
-    print(f"\nDone. {len(df):,} rows saved to {OUTPUT_PATH}")
 
 
 if __name__ == "__main__":
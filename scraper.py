@@ -2,12 +2,18 @@ import requests
 import pandas as pd
 import time
 import os
-import csv
+import hashlib
+import shutil
 from datetime import datetime
 from bs4 import BeautifulSoup
 import re
 import logging
-from urllib.parse import urljoin
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+from manifest import DownloadManifest
 
 
 # LOGGING CONFIGURATION
@@ -30,15 +36,69 @@ logger = logging.getLogger(__name__)
 # Constants
 
 BASE_URL          = "https://opendata.nhsbsa.net"
-DATASET_URL       = f"{BASE_URL}/dataset/prescription-cost-analysis-pca-monthly-data"
+DATASET_ID        = "prescription-cost-analysis-pca-monthly-data"
+DATASET_URL       = f"{BASE_URL}/dataset/{DATASET_ID}"
+CKAN_API_URL      = f"{BASE_URL}/api/3/action"     # the portal is CKAN-backed
 RAW_DATA_DIR      = "pca_data/raw"           # Raw CSVs
 COMBINED_DATA_DIR = "pca_data"               # Combined/processed output
 LOG_DIR           = "pca_data/logs"
 DOWNLOAD_LOG_PATH = f"{LOG_DIR}/download_log.csv"
+MANIFEST_PATH     = f"{LOG_DIR}/download_manifest.db"  # indexed download history
 
 # Columns to retain from each monthly file.
 # Defined here so any upstream schema change is caught in one place.
-REQUIRED_COLUMNS  = ['YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'ITEMS', 'NIC']
+# BNF_CHEMICAL_SUBSTANCE_CODE lets processor.py select drug cohorts by BNF
+# code prefix as well as by substance name.
+REQUIRED_COLUMNS  = [
+    'YEAR_MONTH', 'REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'BNF_CHEMICAL_SUBSTANCE_CODE',
+    'ITEMS', 'NIC'
+]
+
+# Explicit dtypes for the retained columns, so pandas never has to infer
+# types (or hold columns as generic objects) while parsing.
+# Nullable Int64 keeps whole-number columns as integers even if a value is
+# missing, instead of silently widening them to float. The text columns are
+# parsed straight to categoricals — a few distinct names repeated on every
+# row — and written to Parquet dictionary-encoded (DICTIONARY_COLUMNS).
+COLUMN_DTYPES     = {
+    'YEAR_MONTH'                 : 'Int64',
+    'REGION_NAME'                : 'category',
+    'BNF_CHEMICAL_SUBSTANCE'     : 'category',
+    'BNF_CHEMICAL_SUBSTANCE_CODE': 'category',
+    'ITEMS'                      : 'Int64',
+    'NIC'                        : 'float64',
+}
+
+# Format of the combined output handed to processor.py:
+#   'parquet' — a columnar, compressed dataset directory partitioned by
+#               YEAR_MONTH (pca_data/combined_pca_data/YEAR_MONTH=202101/...)
+#   'csv'     — the original single combined_pca_data.csv, for compatibility
+COMBINE_FORMAT    = 'parquet'
+
+# Text columns stored dictionary-encoded in the Parquet dataset — a handful
+# of regions and a few thousand substances repeated across millions of rows.
+DICTIONARY_COLUMNS = ['REGION_NAME', 'BNF_CHEMICAL_SUBSTANCE', 'BNF_CHEMICAL_SUBSTANCE_CODE']
+
+# Whether main() writes the combined dataset at all. Set to False when
+# processor.py runs with STAGING_MODE = 'fused' and aggregates the raw
+# monthly files directly — the combined dataset is then never read.
+COMBINE_OUTPUT      = True
+
+# main() only re-processes raw files that are new or changed since the last
+# combine. combine_datasets() itself defaults to a full rebuild.
+COMBINE_INCREMENTAL = True
+
+# Rows parsed per chunk when combining raw files. Peak memory of
+# combine_datasets() scales with this, not with the number of months.
+COMBINE_CHUNKSIZE = 500_000
+
+# Number of worker processes main() uses to parse raw files while combining.
+# combine_datasets() itself defaults to parsing in a single process.
+COMBINE_WORKERS   = os.cpu_count() or 1
+
+# Number of monthly files resolved and downloaded in parallel by main().
+# Set to 1 to download strictly one file at a time.
+DOWNLOAD_WORKERS  = 4
 
 # HTTP request headers — identifies the scraper politely to the server.
 REQUEST_HEADERS = {
@@ -51,88 +111,387 @@ REQUEST_HEADERS = {
 
 
 
-# DOWNLOAD LOG UTILITIES
+# FILE INTEGRITY
+
+def _sha256_of_file(filepath, block_size=1024 * 1024):
+    """Return the hex SHA-256 digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 
-# The download log is a CSV file that records every file downloaded:
-# what was downloaded, when, from where, and whether it succeeded.
-#
-# This serves two purposes in industry:
-#   1. AUDITABILITY  — In regulated sectors like healthcare, you must be able
-#                      to prove exactly what raw data you received and when.
-#   2. INCREMENTAL   — The log lets the scraper skip files already downloaded
-#      LOADING          on a re-run, rather than hammering the NHS BSA server
-#                      again unnecessarily.
+# RATE LIMITING
 
+# A token bucket per host replaces the fixed sleep between files. Every HTTP
+# request takes one token and tokens refill at a steady rate, so the NHS BSA
+# server sees the same polite average request rate no matter how many
+# download workers are running at once.
 
-def _initialise_download_log():
+
+class _TokenBucket:
     """
-    Create the download log CSV with headers if it does not already exist.
-    Called once at scraper startup.
+    Thread-safe token bucket.
+
+    Parameters
+
+    rate     : float — tokens added per second
+    capacity : int   — maximum tokens held, i.e. the largest permitted burst
     """
-    if not os.path.exists(DOWNLOAD_LOG_PATH):
-        with open(DOWNLOAD_LOG_PATH, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'downloaded_at', 'year_month', 'filename',
-                'source_url', 'file_size_bytes', 'status', 'error_message'
-            ])
-            writer.writeheader()
-        logger.info(f"Download log initialised at {DOWNLOAD_LOG_PATH}")
 
+    def __init__(self, rate, capacity=1):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.updated  = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self.lock:
+                now          = time.monotonic()
+                self.tokens  = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
 
-def _log_download(year_month, filename, source_url,
-                  file_size_bytes=None, status='success', error_message=''):
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class _HostRateLimiter:
     """
-    Append a single record to the download log.
+    Keeps one _TokenBucket per host, created on the first request to it.
 
-    Parameters
-    
-    year_month      : str   — e.g. '202101'
-    filename        : str   — local filename saved to RAW_DATA_DIR
-    source_url      : str   — the URL the file was downloaded from
-    file_size_bytes : int   — size of the downloaded file in bytes
-    status          : str   — 'success' or 'failed'
-    error_message   : str   — populated only when status is 'failed'
+    A requests_per_second of None (or 0) disables rate limiting entirely.
     """
-    with open(DOWNLOAD_LOG_PATH, 'a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'downloaded_at', 'year_month', 'filename',
-            'source_url', 'file_size_bytes', 'status', 'error_message'
-        ])
-        writer.writerow({
-            'downloaded_at' : datetime.now().isoformat(),
-            'year_month'    : year_month,
-            'filename'      : filename,
-            'source_url'    : source_url,
-            'file_size_bytes': file_size_bytes,
-            'status'        : status,
-            'error_message' : error_message
-        })
-
-
-def _get_already_downloaded():
+
+    def __init__(self, requests_per_second=None, burst=1):
+        self.requests_per_second = requests_per_second
+        self.burst               = burst
+        self.buckets             = {}
+        self.lock                = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to the host of `url` is permitted."""
+        if not self.requests_per_second:
+            return
+
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = _TokenBucket(self.requests_per_second, self.burst)
+                self.buckets[host] = bucket
+
+        bucket.acquire()
+
+
+class _SkipFile(Exception):
+    """Raised when a raw file has none of the required columns."""
+
+
+def _fingerprint_raw_file(filepath, previous=None):
     """
-    Read the download log and return a set of year_month values
-    that were previously downloaded successfully.
+    Return the identity of a raw file as recorded by the combine step.
 
-    This enables incremental loading — if PCA_202101.csv already exists
-    and was logged as successful, we skip it on the next run rather than
-    re-downloading it from the NHS BSA server.
+    The SHA-256 from a previous record is reused when the file's size and
+    modification time are unchanged; otherwise the file is hashed.
 
     Returns
 
-    set of str — e.g. {'202101', '202102', '202103'}
+    dict — filename, file_size_bytes, mtime_ns, sha256
+    """
+    stat = os.stat(filepath)
+
+    if (
+        previous
+        and previous['file_size_bytes'] == stat.st_size
+        and previous['mtime_ns'] == stat.st_mtime_ns
+    ):
+        sha256 = previous['sha256']
+    else:
+        sha256 = _sha256_of_file(filepath)
+
+    return {
+        'filename'       : os.path.basename(filepath),
+        'file_size_bytes': stat.st_size,
+        'mtime_ns'       : stat.st_mtime_ns,
+        'sha256'         : sha256,
+    }
+
+
+def _source_changed(fingerprint, previous):
+    """True if a raw file is new, or its contents differ from the recorded ones."""
+    recorded = previous.get(fingerprint['filename'])
+    return (
+        recorded is None
+        or recorded['file_size_bytes'] != fingerprint['file_size_bytes']
+        or recorded['sha256'] != fingerprint['sha256']
+    )
+
+
+def _combined_columns(output_path, output_format):
     """
-    if not os.path.exists(DOWNLOAD_LOG_PATH):
-        return set()
+    Column names of an existing combined output, in REQUIRED_COLUMNS form
+    (YEAR_MONTH first for the Parquet dataset, where it is the partition key).
+    """
+    if output_format == 'csv':
+        return list(pd.read_csv(output_path, nrows=0).columns)
+
+    # pyarrow is only needed for the Parquet output
+    import pyarrow.dataset as ds
+    names = ds.dataset(output_path, format='parquet', partitioning='hive').schema.names
+    return ['YEAR_MONTH'] + [name for name in names if name != 'YEAR_MONTH']
+
+
+def _arrow_schema():
+    """
+    Arrow schema of the combined Parquet files. YEAR_MONTH is left out — it
+    lives in the partition directory name, not in the files themselves.
+    """
+    # pyarrow is only needed for the Parquet output
+    import pyarrow as pa
+
+    arrow_types = {'Int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string()}
+    return pa.schema([
+        (
+            col,
+            pa.dictionary(pa.int32(), pa.string()) if col in DICTIONARY_COLUMNS
+            else arrow_types[COLUMN_DTYPES[col]]
+        )
+        for col in REQUIRED_COLUMNS if col != 'YEAR_MONTH'
+    ])
+
+
+
+# RAW FILE PARSING
+
+# Parsing raw files is CPU-bound, so combine_datasets() can farm it out to a
+# pool of worker processes. These functions live at module level, not on
+# the scraper, because workers cannot be handed the scraper's HTTP sessions
+# or its open manifest connection.
+
+def _iter_raw_file_chunks(filepath, chunksize=COMBINE_CHUNKSIZE):
+    """
+    Yield one raw monthly file as DataFrames of at most chunksize rows,
+    holding only REQUIRED_COLUMNS parsed with COLUMN_DTYPES.
+
+    Any required column absent from the file is added as empty, so every
+    chunk has the same columns in the same order.
+
+    Raises
+
+    _SkipFile — when the file contains none of the required columns
+    """
+    # Read the header only, to project columns before parsing any rows
+    # (guards against upstream schema changes in NHS BSA files)
+    header       = pd.read_csv(filepath, nrows=0).columns
+    present_cols = [col for col in REQUIRED_COLUMNS if col in header]
+
+    if not present_cols:
+        logger.warning(
+            f"No required columns found in {filepath} — skipping."
+        )
+        raise _SkipFile(filepath)
+
+    missing_cols = set(REQUIRED_COLUMNS) - set(present_cols)
+    if missing_cols:
+        logger.warning(
+            f"{filepath}: missing columns {missing_cols} — "
+            f"proceeding with available columns."
+        )
+
+    reader = pd.read_csv(
+        filepath,
+        usecols   = present_cols,
+        dtype     = {col: COLUMN_DTYPES[col] for col in present_cols},
+        chunksize = chunksize
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk.reindex(columns=REQUIRED_COLUMNS)
+
+
+def _write_csv_rows(filepath, out):
+    """
+    Append one raw file's projected rows, without a header, to an open CSV.
+
+    If reading fails part-way, the rows written so far are truncated from
+    out before the error is re-raised.
+
+    Returns
+
+    int — rows written
+    """
+    # Remember where this file's rows start, so a file that fails
+    # part-way through can be rolled back out of the output
+    start_pos = out.tell()
+    rows      = 0
+    try:
+        for chunk in _iter_raw_file_chunks(filepath):
+            chunk.to_csv(out, header=False, index=False)
+            rows += len(chunk)
+    except Exception:
+        out.seek(start_pos)
+        out.truncate()
+        raise
+    return rows
+
+
+def _write_csv_fragment(filepath, fragment_path):
+    """
+    Write one raw file's projected rows, without a header, to a CSV fragment
+    that the combining process appends to the output in date order.
+
+    Returns
+
+    int — rows written
+    """
+    try:
+        with open(fragment_path, 'w', newline='') as out:
+            return _write_csv_rows(filepath, out)
+    except Exception:
+        if os.path.exists(fragment_path):
+            os.remove(fragment_path)
+        raise
+
+
+def _append_fragment(out, fragment_path):
+    """
+    Append a CSV fragment to an open output and delete it. A failed copy is
+    truncated back out of the output before the error is re-raised.
+    """
+    start_pos = out.tell()
+    try:
+        with open(fragment_path, newline='') as fragment:
+            shutil.copyfileobj(fragment, out, 1024 * 1024)
+    except Exception:
+        out.seek(start_pos)
+        out.truncate()
+        raise
+    os.remove(fragment_path)
+
+
+def _write_parquet_parts(filepath, dataset_root, schema):
+    """
+    Write one raw file into a hive-partitioned Parquet directory.
+
+    The file's rows for each YEAR_MONTH go to
+    <dataset_root>/YEAR_MONTH=<month>/<raw file stem>.parquet — naming
+    parts after their source file lets a changed month be replaced
+    without touching any other file's data.
+
+    If reading fails part-way, the parts written so far are deleted
+    before the error is re-raised.
+
+    Returns
+
+    tuple — (rows written, sorted list of YEAR_MONTH values written)
+    """
+    # pyarrow is only needed for the Parquet output
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    part_name = os.path.splitext(os.path.basename(filepath))[0] + '.parquet'
+    writers   = {}
+    rows      = 0
+    try:
+        for chunk in _iter_raw_file_chunks(filepath):
+            missing_month = chunk['YEAR_MONTH'].isna()
+            if missing_month.any():
+                logger.warning(
+                    f"{filepath}: dropping {missing_month.sum():,} rows "
+                    f"with no YEAR_MONTH — cannot be partitioned."
+                )
+                chunk = chunk[~missing_month]
+
+            for year_month, part in chunk.groupby('YEAR_MONTH', sort=True):
+                writer = writers.get(year_month)
+                if writer is None:
+                    partition_dir = os.path.join(
+                        dataset_root, f"YEAR_MONTH={year_month}"
+                    )
+                    os.makedirs(partition_dir, exist_ok=True)
+                    writer = pq.ParquetWriter(
+                        os.path.join(partition_dir, part_name),
+                        schema,
+                        compression    = 'zstd',
+                        use_dictionary = DICTIONARY_COLUMNS
+                    )
+                    writers[year_month] = writer
+
+                table = pa.Table.from_pandas(
+                    part.drop(columns='YEAR_MONTH'), preserve_index=False
+                ).cast(schema)
+                writer.write_table(table)
+            rows += len(chunk)
+
+    except Exception:
+        for writer in writers.values():
+            writer.close()
+        # Roll this file's rows back out of every partition it touched
+        for year_month in writers:
+            os.remove(os.path.join(
+                dataset_root, f"YEAR_MONTH={year_month}", part_name
+            ))
+        raise
 
-    already_downloaded = set()
-    with open(DOWNLOAD_LOG_PATH, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['status'] == 'success':
-                already_downloaded.add(row['year_month'])
+    for writer in writers.values():
+        writer.close()
 
-    return already_downloaded
+    return rows, sorted(str(year_month) for year_month in writers)
+
+
+def _per_file_results(job, jobs, workers=1):
+    """
+    Run job(*args) for each args tuple in jobs and yield a completed Future
+    per job, in the order the jobs were given.
+
+    With workers=1 each job runs in this process only when its result is
+    requested. Otherwise jobs run in a pool of worker processes, at most
+    2 × workers ahead of the result being consumed, so finished results
+    waiting to be collected stay bounded.
+
+    Parameters
+
+    job     : callable — module-level function, so it can be sent to a worker
+    jobs    : list of tuple — positional arguments for each call
+    workers : int — worker processes; 1 runs everything in this process
+    """
+    if workers <= 1:
+        for args in jobs:
+            future = Future()
+            try:
+                future.set_result(job(*args))
+            except Exception as e:
+                future.set_exception(e)
+            yield future
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        jobs    = iter(jobs)
+        for args in jobs:
+            pending.append(pool.submit(job, *args))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            future = pending.popleft()
+            for args in jobs:
+                pending.append(pool.submit(job, *args))
+                break
+            future.exception()  # wait for this job to finish
+            yield future
 
 
 # Scraper Class
@@ -145,9 +504,12 @@ class NHSPCADataScraper:
 
     Follows the raw landing zone pattern:
       1. Downloads raw monthly CSV files to pca_data/raw/ — untouched source data.
-      2. Logs every download attempt to pca_data/logs/download_log.csv.
+      2. Logs every download attempt to the download manifest
+         (pca_data/logs/download_manifest.db), mirrored to download_log.csv.
       3. Supports incremental loading — skips files already downloaded.
-      4. Combines raw files into a single combined CSV for downstream processing.
+      4. Downloads several months concurrently, rate limited per host.
+      5. Combines raw files into a single dataset for downstream processing —
+         Parquet partitioned by month by default, or one combined CSV.
 
     The scraper does NOT perform any data transformation or database loading.
     Those responsibilities belong to separate scripts (processor.py, loader.py)
@@ -167,35 +529,154 @@ class NHSPCADataScraper:
         self.session     = requests.Session()
         self.session.headers.update(REQUEST_HEADERS)
 
+        # requests.Session is not guaranteed to be thread-safe, so each
+        # download worker thread lazily gets its own session (see _get).
+        self._thread_local = threading.local()
+
+        # Unlimited until scrape_all_data() configures a request rate
+        self.rate_limiter  = _HostRateLimiter()
+
         # Ensure all required directories exist before any downloads begin
         os.makedirs(RAW_DATA_DIR, exist_ok=True)
         os.makedirs(COMBINED_DATA_DIR, exist_ok=True)
         os.makedirs(LOG_DIR, exist_ok=True)
 
-        # Initialise the download log (creates the file if it does not exist)
-        _initialise_download_log()
+        # Open the download manifest — loaded into memory once, so the
+        # per-file "already downloaded?" check never re-reads the log.
+        # See manifest.py for why the manifest exists.
+        self.manifest = DownloadManifest(MANIFEST_PATH, csv_log_path=DOWNLOAD_LOG_PATH)
 
         logger.info("NHSPCADataScraper initialised.")
         logger.info(f"Raw data directory  : {RAW_DATA_DIR}")
         logger.info(f"Download log        : {DOWNLOAD_LOG_PATH}")
+        logger.info(f"Download manifest   : {MANIFEST_PATH}")
+
+    def _request(self, method, url, **kwargs):
+        """
+        Rate-limited HTTP request, issued on the calling thread's own session.
+
+        The main thread reuses self.session; worker threads each create a
+        session with the same headers on first use.
+        """
+        self.rate_limiter.acquire(url)
+
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            if threading.current_thread() is threading.main_thread():
+                session = self.session
+            else:
+                session = requests.Session()
+                session.headers.update(REQUEST_HEADERS)
+            self._thread_local.session = session
+
+        return session.request(method, url, **kwargs)
+
+    def _get(self, url, **kwargs):
+        """Rate-limited GET request — see _request."""
+        return self._request('GET', url, **kwargs)
+
+    def _head(self, url, **kwargs):
+        """Rate-limited HEAD request — see _request."""
+        return self._request('HEAD', url, allow_redirects=True, **kwargs)
 
  
     # Data discovery
    
 
-    def get_available_datasets(self):
+    def get_available_datasets(self, discovery='ckan'):
+        """
+        Discover all available monthly PCA datasets.
+
+        The NHS BSA portal is CKAN-backed, so by default the whole dataset
+        listing — including each month's direct download URL — comes from a
+        single CKAN package_show API call. Scraping the HTML dataset page is
+        kept as a fallback if the API is unavailable or returns nothing.
+
+        Parameters
+
+        discovery : str — 'ckan' (API, HTML fallback) or 'html' (HTML only)
+
+        Returns
+       
+        list of dict — each dict contains 'title', 'url', 'resource_id',
+                       plus 'download_url' when discovered via the API
+        """
+        if discovery == 'ckan':
+            datasets = self._get_datasets_from_ckan()
+            if datasets:
+                return datasets
+            logger.warning("CKAN discovery returned nothing — falling back to HTML.")
+
+        return self._get_datasets_from_html()
+
+    def _get_datasets_from_ckan(self):
+        """
+        List the dataset's resources with the CKAN package_show API.
+
+        Download URLs arrive with the listing, so they are written straight
+        to the resource URL cache — no resource page has to be fetched.
+
+        Returns
+
+        list of dict — as get_available_datasets; empty on any failure
+        """
+        api_url = f"{CKAN_API_URL}/package_show"
+        logger.info(f"Fetching dataset listing from CKAN API: {api_url}?id={DATASET_ID}")
+
+        try:
+            response = self._get(api_url, params={'id': DATASET_ID}, timeout=30)
+            response.raise_for_status()
+
+            payload = response.json()
+            if not payload.get('success'):
+                logger.error(f"CKAN package_show failed: {payload.get('error')}")
+                return []
+
+            dataset_links = []
+            for resource in payload['result'].get('resources', []):
+                title = resource.get('name') or resource.get('description') or ''
+                if (resource.get('format') or '').upper() != 'CSV':
+                    continue
+                if not self._extract_date_from_title(title, warn=False):
+                    continue
+
+                dataset_links.append({
+                    'title'       : title,
+                    'url'         : f"{self.dataset_url}/resource/{resource['id']}",
+                    'resource_id' : resource['id'],
+                    'download_url': resource.get('url')
+                })
+
+            self.manifest.cache_resource_urls({
+                d['resource_id']: d['download_url'] for d in dataset_links
+            })
+
+            logger.info(f"Found {len(dataset_links)} datasets via the CKAN API.")
+            return dataset_links
+
+        except requests.exceptions.Timeout:
+            logger.error("Request timed out calling the CKAN API.")
+            return []
+        except requests.exceptions.RequestException as e:
+            logger.error(f"HTTP error calling the CKAN API: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error reading the CKAN API response: {e}")
+            return []
+
+    def _get_datasets_from_html(self):
         """
         Scrape the NHS BSA dataset page to discover all available
         monthly PCA dataset links.
 
         Returns
-       
+
         list of dict — each dict contains 'title', 'url', 'resource_id'
         """
         logger.info(f"Fetching dataset index from: {self.dataset_url}")
 
         try:
-            response = self.session.get(self.dataset_url, timeout=30)
+            response = self._get(self.dataset_url, timeout=30)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -225,17 +706,19 @@ class NHSPCADataScraper:
             logger.error(f"Unexpected error fetching dataset index: {e}")
             return []
 
-    def _extract_date_from_title(self, title):
+    def _extract_date_from_title(self, title, warn=True):
         """
         Parse a dataset title and extract the year-month as a 6-digit string.
 
         Example
         
         'Prescription Cost Analysis (PCA) - Jan 2021' → '202101'
+        'PCA_202101'                                  → '202101'
 
         Parameters
         
         title : str
+        warn  : bool — log a warning when no date can be parsed
 
         Returns
      
@@ -255,7 +738,13 @@ class NHSPCADataScraper:
                 if month_num:
                     return f"{year_str}{month_num}"
 
-            logger.warning(f"Could not parse date from title: '{title}'")
+            # CKAN resource names use the compact 'PCA_202101' form
+            match = re.search(r'(?<!\d)(20\d{2})(0[1-9]|1[0-2])(?!\d)', title)
+            if match:
+                return ''.join(match.groups())
+
+            if warn:
+                logger.warning(f"Could not parse date from title: '{title}'")
             return None
 
         except Exception as e:
@@ -306,7 +795,7 @@ class NHSPCADataScraper:
         str or None — direct download URL, or None if not found
         """
         try:
-            response = self.session.get(resource_url, timeout=30)
+            response = self._get(resource_url, timeout=30)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -337,7 +826,180 @@ class NHSPCADataScraper:
             logger.error(f"Error fetching resource page {resource_url}: {e}")
             return None
 
-    def _download_single_file(self, download_url, filename, year_month):
+    def _validate_local_file(self, download_url, filepath, filename,
+                             year_month, entry):
+        """
+        Check whether the local copy of a month still matches the server,
+        at the cost of a single request and no transfer of the body.
+
+        The local file is first hashed and compared with the SHA-256 on
+        record, so a copy damaged on disk is downloaded again rather than
+        confirmed by the server.
+
+        Months with stored validators use a conditional GET (If-None-Match /
+        If-Modified-Since) — a 304 response confirms the local copy. Months
+        without validators, e.g. a file on disk whose log entry is missing,
+        use a HEAD request and compare Content-Length with the local size.
+
+        Any failure of the check itself (a server that rejects HEAD, a
+        timeout) is logged and treated as "not current", so the caller falls
+        back to a full download as it would without a local copy.
+
+        Returns
+
+        bool — True if the local file is current and was recorded as such
+        """
+        local_size   = os.path.getsize(filepath)
+        local_sha256 = _sha256_of_file(filepath)
+
+        if entry and entry['sha256'] and entry['sha256'] != local_sha256:
+            logger.warning(
+                f"{filename} does not match its recorded SHA-256 — downloading again."
+            )
+            return False
+
+        try:
+            return self._revalidate_with_server(
+                download_url, filename, year_month, entry, local_size, local_sha256
+            )
+        except requests.exceptions.RequestException as e:
+            logger.warning(
+                f"Could not revalidate {filename} ({e}) — downloading in full."
+            )
+            return False
+
+    def _revalidate_with_server(self, download_url, filename, year_month,
+                                entry, local_size, local_sha256):
+        """
+        The server half of _validate_local_file() — one conditional GET or
+        HEAD request, recording the month when the local copy is current.
+
+        Returns
+
+        bool — True if the server confirmed the local copy
+        """
+        if entry and (entry['etag'] or entry['last_modified']):
+            headers = {}
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+            response = self._get(
+                download_url, headers=headers, stream=True, timeout=60
+            )
+            response.close()
+            if response.status_code != 304:
+                return False
+
+            logger.info(f"Not modified: {filename} (304 from server).")
+            self.manifest.record(
+                year_month      = year_month,
+                filename        = filename,
+                source_url      = download_url,
+                file_size_bytes = local_size,
+                status          = 'not_modified',
+                sha256          = local_sha256
+            )
+            return True
+
+        response = self._head(download_url, timeout=30)
+        if not response.ok:
+            logger.info(
+                f"HEAD {filename} returned {response.status_code} — downloading in full."
+            )
+            return False
+        content_length = response.headers.get('Content-Length')
+        if content_length is None or int(content_length) != local_size:
+            return False
+
+        logger.info(
+            f"Verified: {filename} matches the server copy "
+            f"({local_size / 1024:.1f} KB) — recording without re-downloading."
+        )
+        self.manifest.record(
+            year_month      = year_month,
+            filename        = filename,
+            source_url      = download_url,
+            file_size_bytes = local_size,
+            status          = 'success',
+            sha256          = local_sha256,
+            etag            = response.headers.get('ETag'),
+            last_modified   = response.headers.get('Last-Modified')
+        )
+        return True
+
+    def _stream_to_part_file(self, download_url, part_path, year_month):
+        """
+        Stream a file to its .part path, resuming an earlier partial
+        transfer with an HTTP Range request when possible.
+
+        The resume is guarded by If-Range with the validator recorded when
+        the partial transfer started: if the server copy has changed since,
+        the server replies 200 with the full body and we start again from
+        byte zero instead of splicing two versions together.
+
+        The SHA-256 is computed while writing; on resume the bytes already
+        on disk are hashed first.
+
+        Returns
+
+        tuple — (file_size, sha256 hex digest, etag, last_modified)
+        """
+        partial     = self.manifest.get_partial(year_month)
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        headers = {}
+        if resume_from and partial and (partial['etag'] or partial['last_modified']):
+            headers['Range']    = f"bytes={resume_from}-"
+            headers['If-Range'] = partial['etag'] or partial['last_modified']
+
+        response = self._get(
+            download_url, headers=headers, stream=True, timeout=60
+        )
+
+        # 416 — the stored partial is not a prefix the server can continue
+        if response.status_code == 416:
+            response.close()
+            logger.warning(f"Cannot resume {part_path} — restarting from byte zero.")
+            os.remove(part_path)
+            self.manifest.clear_partial(year_month)
+            return self._stream_to_part_file(download_url, part_path, year_month)
+
+        response.raise_for_status()
+
+        resuming = response.status_code == 206 and bool(headers)
+        if resuming:
+            etag          = partial['etag']
+            last_modified = partial['last_modified']
+            logger.info(
+                f"Resuming {os.path.basename(part_path)} from byte {resume_from:,}."
+            )
+        else:
+            etag          = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            self.manifest.start_partial(year_month, etag, last_modified)
+
+        digest    = hashlib.sha256()
+        file_size = 0
+
+        if resuming:
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            file_size = resume_from
+
+        with open(part_path, 'ab' if resuming else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    file_size += len(chunk)
+
+        return file_size, digest.hexdigest(), etag, last_modified
+
+    def _download_single_file(self, download_url, filename, year_month,
+                              revalidate=False):
         """
         Download a single CSV file and save it to the raw data directory.
 
@@ -345,52 +1007,69 @@ class NHSPCADataScraper:
         This directory is the raw landing zone — the source of truth for
         all downstream processing.
 
+        Data is streamed to '<filename>.part' and only renamed into place
+        once complete, so the raw directory never holds a truncated file.
+        A failed transfer keeps its .part file and resumes from there on the
+        next run.
+
         Parameters
       
         download_url : str  — direct URL to the CSV file
         filename     : str  — local filename to save as (e.g. 'PCA_202101.csv')
         year_month   : str  — '202101' format, used for logging
+        revalidate   : bool — check months already on record against the
+                              server (one conditional request each) instead
+                              of trusting the manifest
 
         Returns
        
         str or None — full local filepath if successful, None if failed
         """
-        filepath = os.path.join(RAW_DATA_DIR, filename)
+        filepath  = os.path.join(RAW_DATA_DIR, filename)
+        part_path = f"{filepath}.part"
+        entry     = self.manifest.get(year_month)
 
-        # Skip if already downloaded and logged as successful
+        # Skip if already downloaded, logged as successful and the local file
+        # still has the recorded size.
         # This is the incremental loading check — avoids redundant downloads
-        already_done = _get_already_downloaded()
-        if year_month in already_done and os.path.exists(filepath):
+        if not revalidate and os.path.exists(filepath) and self.manifest.is_downloaded(
+            year_month, file_size_bytes=os.path.getsize(filepath)
+        ):
             logger.info(
-                f"Skipping {filename} — already downloaded (found in log)."
+                f"Skipping {filename} — already downloaded (found in manifest)."
             )
             return filepath
 
-        logger.info(f"Downloading: {filename}")
-
         try:
-            response = self.session.get(download_url, stream=True, timeout=60)
-            response.raise_for_status()
+            # A local copy we cannot vouch for (or are asked to revalidate)
+            # costs one HEAD or conditional GET rather than a full transfer
+            if os.path.exists(filepath) and self._validate_local_file(
+                download_url, filepath, filename, year_month, entry
+            ):
+                return filepath
+
+            logger.info(f"Downloading: {filename}")
 
-            file_size = 0
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        file_size += len(chunk)
+            file_size, sha256, etag, last_modified = self._stream_to_part_file(
+                download_url, part_path, year_month
+            )
+            os.replace(part_path, filepath)
 
             logger.info(
                 f"Saved: {filename} "
-                f"({file_size / 1024:.1f} KB) → {RAW_DATA_DIR}/"
+                f"({file_size / 1024:.1f} KB, sha256 {sha256[:12]}…) → {RAW_DATA_DIR}/"
             )
 
             # Log the successful download for auditability and incremental loading
-            _log_download(
+            self.manifest.record(
                 year_month      = year_month,
                 filename        = filename,
                 source_url      = download_url,
                 file_size_bytes = file_size,
-                status          = 'success'
+                status          = 'success',
+                sha256          = sha256,
+                etag            = etag,
+                last_modified   = last_modified
             )
 
             return filepath
@@ -398,7 +1077,7 @@ class NHSPCADataScraper:
         except requests.exceptions.Timeout:
             error_msg = f"Download timed out for {filename}"
             logger.error(error_msg)
-            _log_download(
+            self.manifest.record(
                 year_month    = year_month,
                 filename      = filename,
                 source_url    = download_url,
@@ -410,7 +1089,7 @@ class NHSPCADataScraper:
         except requests.exceptions.RequestException as e:
             error_msg = f"HTTP error downloading {filename}: {e}"
             logger.error(error_msg)
-            _log_download(
+            self.manifest.record(
                 year_month    = year_month,
                 filename      = filename,
                 source_url    = download_url,
@@ -422,51 +1101,151 @@ class NHSPCADataScraper:
         except Exception as e:
             error_msg = f"Unexpected error downloading {filename}: {e}"
             logger.error(error_msg)
-            _log_download(
+            self.manifest.record(
                 year_month    = year_month,
                 filename      = filename,
                 source_url    = download_url,
                 status        = 'failed',
                 error_message = error_msg
             )
-            # Remove partial file if the download was incomplete
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                logger.info(f"Removed partial file: {filepath}")
+            # Any partial data stays in the .part file for the next run to resume
+            if os.path.exists(part_path):
+                logger.info(f"Partial file kept for resume: {part_path}")
             return None
 
     
     # Orchestration
 
 
-    def scrape_all_data(self, start_date="202101", delay_between_requests=2):
+    def _process_dataset(self, dataset, position, total, revalidate=False):
+        """
+        Resolve the download URL for one dataset and download it.
+
+        Runs either inline (sequential mode) or on a download worker thread
+        (concurrent mode). Errors are logged and swallowed so that one bad
+        month never stops the rest of the backfill.
+
+        Parameters
+
+        dataset    : dict — a filtered dataset with 'date', 'title', 'url', 'resource_id'
+        position   : int  — 1-based position in the download queue, for logging
+        total      : int  — size of the download queue, for logging
+        revalidate : bool — passed through to _download_single_file
+
+        Returns
+
+        dict or None — downloaded file metadata, or None if the download failed
+        """
+        logger.info(f"[{position}/{total}] Processing: {dataset['title']}")
+
+        try:
+            # Resolve the direct download URL: from the CKAN listing, the
+            # persistent cache, or — last resort — the resource page
+            resource_id  = dataset['resource_id']
+            from_cache   = False
+            download_url = dataset.get('download_url')
+
+            if not download_url:
+                download_url = self.manifest.get_resource_url(resource_id)
+                from_cache   = download_url is not None
+
+            if not download_url:
+                download_url = self._get_download_url(dataset['url'])
+                if download_url:
+                    self.manifest.cache_resource_urls({resource_id: download_url})
+
+            # Fallback: construct the standard CKAN download URL directly
+            if not download_url:
+                download_url = (
+                    f"{self.dataset_url}"
+                    f"/resource/{dataset['resource_id']}/download"
+                )
+                logger.info(f"Using fallback download URL for {dataset['title']}")
+
+            filename = f"PCA_{dataset['date']}.csv"
+            filepath = self._download_single_file(
+                download_url = download_url,
+                filename     = filename,
+                year_month   = dataset['date'],
+                revalidate   = revalidate
+            )
+
+            # A cached URL that no longer works is dropped so the next run
+            # resolves it afresh
+            if not filepath and from_cache:
+                self.manifest.forget_resource_url(resource_id)
+
+            if filepath:
+                return {
+                    'date'        : dataset['date'],
+                    'title'       : dataset['title'],
+                    'filepath'    : filepath,
+                    'download_url': download_url
+                }
+            return None
+
+        except Exception as e:
+            logger.error(
+                f"Unexpected error processing {dataset['title']}: {e}"
+            )
+            return None
+
+    def scrape_all_data(self, start_date="202101", delay_between_requests=2,
+                        max_workers=1, requests_per_second=None,
+                        revalidate=False, discovery='ckan'):
         """
         Main orchestration method. Discovers, filters, and downloads all
         PCA monthly datasets from start_date to the latest available.
 
-        A polite delay between requests (delay_between_requests seconds) is
-        applied to avoid overloading the NHS BSA server — this is standard
-        practice when scraping public sector websites.
+        Requests are throttled by a token bucket per host rather than a fixed
+        sleep between files. By default the bucket allows one request every
+        delay_between_requests seconds — the same polite rate as before —
+        which avoids overloading the NHS BSA server, standard practice when
+        scraping public sector websites.
+
+        With max_workers > 1 several months are resolved and downloaded at
+        once on a thread pool. The rate limit is shared by all workers, so
+        concurrency overlaps the slow transfers without raising the request
+        rate. Results are always returned in date order.
 
         Parameters
         
-        start_date              : str — '202101' format, inclusive lower bound
-        delay_between_requests  : int — seconds to wait between downloads
+        start_date              : str   — '202101' format, inclusive lower bound
+        delay_between_requests  : int   — minimum average seconds between
+                                          requests to the same host
+        max_workers             : int   — number of files downloaded concurrently
+        requests_per_second     : float — overrides delay_between_requests when
+                                          given; None or 0 derives it from the delay
+        revalidate              : bool  — re-check months already downloaded
+                                          against the server with one HEAD or
+                                          conditional GET each, picking up
+                                          restated files
+        discovery               : str   — 'ckan' or 'html', see
+                                          get_available_datasets
 
         Returns
        
         list of dict — metadata for each successfully downloaded file,
                        including 'date', 'title', 'filepath', 'download_url'
         """
+        if not requests_per_second and delay_between_requests:
+            requests_per_second = 1 / delay_between_requests
+        self.rate_limiter = _HostRateLimiter(requests_per_second)
+
         logger.info("=" * 60)
         logger.info("NHS PCA DATA SCRAPER — STARTING")
         logger.info(f"Start date          : {start_date}")
-        logger.info(f"Request delay       : {delay_between_requests}s")
+        logger.info(
+            f"Request rate        : "
+            f"{f'{requests_per_second:.2f}/s per host' if requests_per_second else 'unlimited'}"
+        )
+        logger.info(f"Download workers    : {max_workers}")
+        logger.info(f"Discovery           : {discovery}")
         logger.info(f"Raw output dir      : {RAW_DATA_DIR}/")
         logger.info("=" * 60)
 
         # Step 1 — Discover all available datasets on the NHS BSA portal
-        all_datasets = self.get_available_datasets()
+        all_datasets = self.get_available_datasets(discovery=discovery)
         if not all_datasets:
             logger.error("No datasets discovered. Exiting.")
             return []
@@ -477,51 +1256,28 @@ class NHSPCADataScraper:
             logger.error(f"No datasets found from {start_date} onwards. Exiting.")
             return []
 
-        # Step 3 — Download each dataset
-        downloaded_files = []
+        # Step 3 — Download each dataset, sequentially or on a worker pool
         total = len(datasets_to_process)
+        jobs  = [
+            (dataset, i, total, revalidate)
+            for i, dataset in enumerate(datasets_to_process, start=1)
+        ]
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers        = max_workers,
+                thread_name_prefix = 'pca-download'
+            ) as executor:
+                results = list(executor.map(lambda job: self._process_dataset(*job), jobs))
+        else:
+            results = [self._process_dataset(*job) for job in jobs]
 
-        for i, dataset in enumerate(datasets_to_process, start=1):
-            logger.info(f"[{i}/{total}] Processing: {dataset['title']}")
-
-            try:
-                # Resolve the direct download URL from the resource page
-                download_url = self._get_download_url(dataset['url'])
-
-                # Fallback: construct the standard CKAN download URL directly
-                if not download_url:
-                    download_url = (
-                        f"{self.base_url}/dataset/"
-                        f"prescription-cost-analysis-pca-monthly-data"
-                        f"/resource/{dataset['resource_id']}/download"
-                    )
-                    logger.info(f"Using fallback download URL for {dataset['title']}")
-
-                filename = f"PCA_{dataset['date']}.csv"
-                filepath = self._download_single_file(
-                    download_url = download_url,
-                    filename     = filename,
-                    year_month   = dataset['date']
-                )
-
-                if filepath:
-                    downloaded_files.append({
-                        'date'        : dataset['date'],
-                        'title'       : dataset['title'],
-                        'filepath'    : filepath,
-                        'download_url': download_url
-                    })
-
-            except Exception as e:
-                logger.error(
-                    f"Unexpected error processing {dataset['title']}: {e}"
-                )
-                continue
-
-            # Polite delay between requests — skip delay after the last file
-            if i < total:
-                logger.info(f"Waiting {delay_between_requests}s before next request...")
-                time.sleep(delay_between_requests)
+        # executor.map preserves input order, but sort explicitly so the
+        # date-ordered contract does not depend on that detail
+        downloaded_files = sorted(
+            (result for result in results if result),
+            key=lambda x: x['date']
+        )
 
         # Step 4 — Summary
         failed_count = total - len(downloaded_files)
@@ -538,14 +1294,38 @@ class NHSPCADataScraper:
 
     # Combining
 
-    def combine_datasets(self, downloaded_files=None, output_filename="combined_pca_data.csv"):
+    def combine_datasets(self, downloaded_files=None, output_filename=None,
+                         output_format=COMBINE_FORMAT, incremental=False,
+                         workers=1):
         """
         Combine all raw monthly CSV files in pca_data/raw/ into a single
-        combined CSV file saved to pca_data/.
+        combined dataset saved to pca_data/.
 
-        This combined file is the input to the next stage of the pipeline
+        This combined dataset is the input to the next stage of the pipeline
         (processor.py → loader.py). It is NOT the same as the raw files —
-        it is a convenience file for downstream use.
+        it is a convenience copy for downstream use.
+
+        Two output formats are supported:
+          'parquet' — a directory of Parquet files partitioned by YEAR_MONTH
+                      (hive style, e.g. YEAR_MONTH=202101/PCA_202101.parquet),
+                      zstd-compressed with dictionary-encoded text columns,
+                      so downstream readers can prune columns and months.
+          'csv'     — one combined CSV file, as produced historically.
+
+        Files are streamed in chunks of COMBINE_CHUNKSIZE rows, parsing only
+        REQUIRED_COLUMNS with explicit dtypes, and each chunk is appended to
+        the output as soon as it is read. Peak memory therefore depends on
+        the chunk size, not on how many months of history are combined.
+
+        Every raw file that contributes to the output is recorded in the
+        manifest with its size and SHA-256. In incremental mode only new or
+        changed files are processed: their Parquet parts are swapped into
+        the existing dataset, or — for CSV, which cannot replace rows in
+        place — new files are appended and a changed file forces a rebuild.
+
+        With workers > 1 raw files are parsed in parallel worker processes.
+        Their results are still collected, logged and written in date order,
+        so the output is the same as a single-process combine.
 
         If downloaded_files is not provided, the method reads all CSV files
         directly from the RAW_DATA_DIR. This means you can run combine_datasets()
@@ -555,12 +1335,26 @@ class NHSPCADataScraper:
         ----------
         downloaded_files : list of dict or None
             If None, reads all CSVs from RAW_DATA_DIR automatically.
-        output_filename  : str — name of the combined output file
+        output_filename  : str — name of the combined output file or directory;
+            defaults to 'combined_pca_data.csv' or 'combined_pca_data'
+        output_format    : str — 'parquet' or 'csv'
+        incremental      : bool — only process raw files that are new or
+            changed since they were last combined into this output
+        workers          : int — worker processes parsing raw files in parallel
 
         Returns
         -------
-        str or None — path to the combined CSV file, or None if failed
+        str or None — path to the combined output, or None if failed
         """
+        if output_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unknown output_format: {output_format!r}")
+
+        if output_filename is None:
+            output_filename = (
+                'combined_pca_data.csv' if output_format == 'csv'
+                else 'combined_pca_data'
+            )
+
         # If no files passed in, read everything from the raw directory
         if downloaded_files is None:
             raw_files = sorted([
@@ -587,75 +1381,339 @@ class NHSPCADataScraper:
             logger.warning("No files to combine.")
             return None
 
-        logger.info(f"Combining {len(downloaded_files)} monthly files...")
-
-        combined_chunks = []
-        files_read      = 0
-        files_failed    = 0
+        output_path = os.path.join(COMBINED_DATA_DIR, output_filename)
 
+        # Fingerprint every raw file. Hashes recorded by the previous combine
+        # are reused for files whose size and mtime have not changed, so
+        # untouched months are never re-read just to be fingerprinted.
+        previous = self.manifest.get_combined_sources(output_path)
         for file_info in downloaded_files:
-            filepath = file_info['filepath']
-            try:
-                df = pd.read_csv(filepath)
+            file_info['fingerprint'] = _fingerprint_raw_file(
+                file_info['filepath'],
+                previous.get(os.path.basename(file_info['filepath']))
+            )
 
-                # Retain only the required columns that are present
-                # (guards against upstream schema changes in NHS BSA files)
-                present_cols = [
-                    col for col in REQUIRED_COLUMNS
-                    if col in df.columns
-                ]
+        # Decide between an incremental update and a full rebuild
+        mode          = 'full'
+        files_to_read = downloaded_files
 
-                if not present_cols:
-                    logger.warning(
-                        f"No required columns found in {filepath} — skipping."
-                    )
-                    files_failed += 1
-                    continue
+        if (
+            incremental and previous and os.path.exists(output_path)
+            and _combined_columns(output_path, output_format) != REQUIRED_COLUMNS
+        ):
+            logger.info(
+                "Combined output was written with different columns than "
+                "REQUIRED_COLUMNS — rebuilding in full."
+            )
 
-                missing_cols = set(REQUIRED_COLUMNS) - set(present_cols)
-                if missing_cols:
-                    logger.warning(
-                        f"{filepath}: missing columns {missing_cols} — "
-                        f"proceeding with available columns."
-                    )
+        elif incremental and previous and os.path.exists(output_path):
+            files_to_read = [
+                f for f in downloaded_files
+                if _source_changed(f['fingerprint'], previous)
+            ]
+            changed = [
+                f for f in files_to_read
+                if os.path.basename(f['filepath']) in previous
+            ]
 
-                combined_chunks.append(df[present_cols].copy())
-                files_read += 1
+            if not files_to_read:
                 logger.info(
-                    f"  Read {len(df):,} rows from "
-                    f"{os.path.basename(filepath)}"
+                    f"Combined output is up to date — all "
+                    f"{len(downloaded_files)} raw files already included: "
+                    f"{output_path}"
                 )
+                return output_path
 
-            except pd.errors.EmptyDataError:
-                logger.warning(f"{filepath} is empty — skipping.")
-                files_failed += 1
-            except Exception as e:
-                logger.error(f"Error reading {filepath}: {e}")
-                files_failed += 1
-                continue
+            if output_format == 'csv' and changed:
+                logger.info(
+                    f"{len(changed)} raw file(s) changed since the last combine "
+                    f"— rows cannot be replaced inside a CSV, rebuilding in full."
+                )
+                files_to_read = downloaded_files
+            else:
+                mode = 'incremental'
+
+        elif incremental:
+            logger.info("No previous combine on record — building in full.")
+
+        logger.info(
+            f"Combining {len(files_to_read)} monthly files "
+            f"({output_format}, {mode}, {workers} worker(s))..."
+        )
+
+        if output_format == 'parquet' and mode == 'incremental':
+            result = self._update_parquet(
+                files_to_read, output_path, previous, workers
+            )
+        elif output_format == 'parquet':
+            result = self._combine_to_parquet(files_to_read, output_path, workers)
+        else:
+            result = self._combine_to_csv(
+                files_to_read, output_path,
+                append  = (mode == 'incremental'),
+                workers = workers
+            )
+        files_read, files_failed, total_rows, contributed = result
 
-        if not combined_chunks:
+        if mode == 'full' and files_read == 0:
             logger.error("No data to combine after reading all files.")
             return None
 
-        # Concatenate all monthly DataFrames into one
-        logger.info("Concatenating all monthly files...")
-        combined_df = pd.concat(combined_chunks, ignore_index=True)
-
-        # Save combined file to the main pca_data/ directory
-        output_path = os.path.join(COMBINED_DATA_DIR, output_filename)
-        combined_df.to_csv(output_path, index=False)
+        # Record which raw files the output now contains. A full rebuild
+        # replaces the record; an incremental update adds to it.
+        self.manifest.record_combined_sources(
+            output_path, contributed, replace_all=(mode == 'full')
+        )
 
         logger.info("=" * 60)
         logger.info("COMBINING COMPLETE")
+        logger.info(f"  Mode                : {mode}")
         logger.info(f"  Files read          : {files_read}")
+        logger.info(f"  Files unchanged     : {len(downloaded_files) - len(files_to_read)}")
         logger.info(f"  Files failed        : {files_failed}")
-        logger.info(f"  Total rows combined : {len(combined_df):,}")
+        logger.info(f"  Total rows combined : {total_rows:,}")
         logger.info(f"  Output saved to     : {output_path}")
         logger.info("=" * 60)
 
         return output_path
 
+    def _combine_to_csv(self, downloaded_files, output_path, append=False,
+                        workers=1):
+        """
+        Stream raw files into one combined CSV.
+
+        A full build writes a temporary file that replaces the output once
+        complete; append=True adds the files' rows to the end of the
+        existing output instead.
+
+        With workers > 1 each file is parsed by a worker process into a
+        CSV fragment, and fragments are appended to the output in date order.
+
+        Returns
+
+        tuple — (files_read, files_failed, total_rows, contributed sources)
+        """
+        tmp_path      = output_path if append else f"{output_path}.tmp"
+        fragment_dir  = f"{output_path}.parts"
+
+        files_read   = 0
+        files_failed = 0
+        total_rows   = 0
+        contributed  = []
+
+        # Stream every file into the output chunk by chunk
+        with open(tmp_path, 'a' if append else 'w', newline='') as out:
+            if not append:
+                pd.DataFrame(columns=REQUIRED_COLUMNS).to_csv(out, index=False)
+
+            if workers > 1:
+                os.makedirs(fragment_dir, exist_ok=True)
+                fragments = [
+                    os.path.join(
+                        fragment_dir,
+                        os.path.basename(f['filepath'])
+                    )
+                    for f in downloaded_files
+                ]
+                results = _per_file_results(
+                    _write_csv_fragment,
+                    [(f['filepath'], fragment)
+                     for f, fragment in zip(downloaded_files, fragments)],
+                    workers
+                )
+            else:
+                fragments = [None] * len(downloaded_files)
+                results   = _per_file_results(
+                    _write_csv_rows,
+                    [(f['filepath'], out) for f in downloaded_files]
+                )
+
+            try:
+                for file_info, fragment, future in zip(
+                    downloaded_files, fragments, results
+                ):
+                    filepath = file_info['filepath']
+                    try:
+                        rows = future.result()
+                        if fragment:
+                            _append_fragment(out, fragment)
+
+                        files_read += 1
+                        total_rows += rows
+                        contributed.append(file_info['fingerprint'])
+                        logger.info(
+                            f"  Read {rows:,} rows from "
+                            f"{os.path.basename(filepath)}"
+                        )
+
+                    except _SkipFile:
+                        files_failed += 1
+                    except pd.errors.EmptyDataError:
+                        logger.warning(f"{filepath} is empty — skipping.")
+                        files_failed += 1
+                    except Exception as e:
+                        logger.error(f"Error reading {filepath}: {e}")
+                        files_failed += 1
+                        continue
+            finally:
+                if workers > 1:
+                    shutil.rmtree(fragment_dir, ignore_errors=True)
+
+        if not append:
+            if files_read == 0:
+                os.remove(tmp_path)
+            else:
+                # Swap the finished file into place
+                os.replace(tmp_path, output_path)
+
+        return files_read, files_failed, total_rows, contributed
+
+    def _parquet_file_loop(self, downloaded_files, dataset_root, on_written=None,
+                           workers=1):
+        """
+        Write each raw file into dataset_root, with per-file error handling
+        and row-count logging shared by full and incremental Parquet builds.
+
+        on_written(file_info, partitions) is called after each file succeeds,
+        in date order, even when files are parsed by parallel workers.
+
+        Returns
+
+        tuple — (files_read, files_failed, total_rows, contributed sources)
+        """
+        schema = _arrow_schema()
+
+        files_read   = 0
+        files_failed = 0
+        total_rows   = 0
+        contributed  = []
+
+        results = _per_file_results(
+            _write_parquet_parts,
+            [(f['filepath'], dataset_root, schema) for f in downloaded_files],
+            workers
+        )
+
+        for file_info, future in zip(downloaded_files, results):
+            filepath = file_info['filepath']
+            try:
+                rows, partitions = future.result()
+                if on_written:
+                    on_written(file_info, partitions)
+
+            except _SkipFile:
+                files_failed += 1
+                continue
+            except pd.errors.EmptyDataError:
+                logger.warning(f"{filepath} is empty — skipping.")
+                files_failed += 1
+                continue
+            except Exception as e:
+                logger.error(f"Error reading {filepath}: {e}")
+                files_failed += 1
+                continue
+
+            files_read += 1
+            total_rows += rows
+            contributed.append(dict(file_info['fingerprint'], partitions=partitions))
+            logger.info(
+                f"  Read {rows:,} rows from "
+                f"{os.path.basename(filepath)}"
+            )
+
+        return files_read, files_failed, total_rows, contributed
+
+    def _combine_to_parquet(self, downloaded_files, output_path, workers=1):
+        """
+        Build the whole Parquet dataset from scratch.
+
+        The dataset is built in a temporary directory and swapped in once
+        complete, so readers never see a half-built dataset.
+
+        Returns
+
+        tuple — (files_read, files_failed, total_rows, contributed sources)
+        """
+        tmp_path = f"{output_path}.tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        result = self._parquet_file_loop(
+            downloaded_files, tmp_path, workers=workers
+        )
+
+        if result[0] == 0:
+            shutil.rmtree(tmp_path)
+            return result
+
+        # Swap the finished dataset into place
+        if os.path.exists(output_path):
+            old_path = f"{output_path}.old"
+            if os.path.exists(old_path):
+                shutil.rmtree(old_path)
+            os.rename(output_path, old_path)
+            os.rename(tmp_path, output_path)
+            shutil.rmtree(old_path)
+        else:
+            os.rename(tmp_path, output_path)
+
+        return result
+
+    def _update_parquet(self, downloaded_files, output_path, previous,
+                        workers=1):
+        """
+        Swap new or changed raw files into an existing Parquet dataset.
+
+        Each file is first written to a staging directory, then its part
+        files are moved into the live dataset one atomic rename at a time.
+        Parts left over from an earlier version of the same raw file, in
+        partitions the new version no longer covers, are removed.
+
+        Returns
+
+        tuple — (files_read, files_failed, total_rows, contributed sources)
+        """
+        staging_path = f"{output_path}.incoming"
+        if os.path.exists(staging_path):
+            shutil.rmtree(staging_path)
+        os.makedirs(staging_path)
+
+        def publish(file_info, partitions):
+            filename  = os.path.basename(file_info['filepath'])
+            part_name = os.path.splitext(filename)[0] + '.parquet'
+
+            for year_month in partitions:
+                partition_dir = os.path.join(output_path, f"YEAR_MONTH={year_month}")
+                os.makedirs(partition_dir, exist_ok=True)
+                os.replace(
+                    os.path.join(staging_path, f"YEAR_MONTH={year_month}", part_name),
+                    os.path.join(partition_dir, part_name)
+                )
+
+            old_partitions = (previous.get(filename) or {}).get('partitions') or ''
+            for year_month in set(old_partitions.split(',')) - set(partitions) - {''}:
+                partition_dir = os.path.join(output_path, f"YEAR_MONTH={year_month}")
+                stale_part    = os.path.join(partition_dir, part_name)
+                if os.path.exists(stale_part):
+                    os.remove(stale_part)
+                if os.path.isdir(partition_dir) and not os.listdir(partition_dir):
+                    os.rmdir(partition_dir)
+
+        try:
+            return self._parquet_file_loop(
+                downloaded_files, staging_path,
+                on_written = publish,
+                workers    = workers
+            )
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            # Parts are replaced inside partition directories, which leaves the
+            # dataset directory's own mtime alone — processor.py compares it
+            # with the combined CSV to pick the newest output
+            os.utime(output_path)
+
+
 
 
 # Entry point
@@ -664,9 +1722,10 @@ def main():
     """
     Run the full scraping pipeline:
       1. Scrape all PCA monthly data from January 2021 onwards.
-      2. Combine all raw monthly files into a single combined CSV.
+      2. Combine all raw monthly files into a single combined dataset
+         (format set by COMBINE_FORMAT).
 
-    The combined CSV is then ready for the next pipeline stage:
+    The combined dataset is then ready for the next pipeline stage:
       → processor.py  (data cleaning and validation)
       → loader.py     (load into MySQL staging table)
     """
@@ -675,12 +1734,23 @@ def main():
     # Stage 1 — Download all monthly raw CSV files
     downloaded_files = scraper.scrape_all_data(
         start_date             = "202101",
-        delay_between_requests = 2
+        delay_between_requests = 2,
+        max_workers            = DOWNLOAD_WORKERS
     )
 
-    # Stage 2 — Combine raw files into a single combined CSV
-    if downloaded_files:
-        combined_path = scraper.combine_datasets(downloaded_files)
+    # Stage 2 — Combine raw files into a single combined dataset
+    if downloaded_files and not COMBINE_OUTPUT:
+        print(f"\nPipeline complete.")
+        print(f"Raw files     : {RAW_DATA_DIR}/")
+        print(f"Download log  : {DOWNLOAD_LOG_PATH}")
+        print(f"\nCombining skipped (COMBINE_OUTPUT = False).")
+        print(f"Next step: run processor.py with STAGING_MODE = 'fused'.")
+    elif downloaded_files:
+        combined_path = scraper.combine_datasets(
+            downloaded_files,
+            incremental = COMBINE_INCREMENTAL,
+            workers     = COMBINE_WORKERS
+        )
         if combined_path:
             print(f"\nPipeline complete.")
             print(f"Raw files     : {RAW_DATA_DIR}/")
@@ -201,14 +201,17 @@ ORDER BY r.region_name, d.`year`;
 
 
 -- 4.2 Percentage change in items and cost per region (2021 vs 2025)
+-- Multiplying by 100.0 keeps the items ratio decimal on engines with integer division.
+
 SELECT
     r.region_name,
     SUM(CASE WHEN d.`year` = 2021 THEN p.items ELSE 0 END)          AS items_2021,
     SUM(CASE WHEN d.`year` = 2025 THEN p.items ELSE 0 END)          AS items_2025,
     ROUND(
+        100.0 *
         (SUM(CASE WHEN d.`year` = 2025 THEN p.items ELSE 0 END) -
          SUM(CASE WHEN d.`year` = 2021 THEN p.items ELSE 0 END))
-        / SUM(CASE WHEN d.`year` = 2021 THEN p.items ELSE 0 END) * 100
+        / SUM(CASE WHEN d.`year` = 2021 THEN p.items ELSE 0 END)
     , 1)                                                             AS items_pct_change,
     ROUND(SUM(CASE WHEN d.`year` = 2021 THEN p.nic ELSE 0 END), 2)  AS cost_2021,
     ROUND(SUM(CASE WHEN d.`year` = 2025 THEN p.nic ELSE 0 END), 2)  AS cost_2025,
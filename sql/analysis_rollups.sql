@@ -0,0 +1,273 @@
+
+
+-- NHS Antidepressant Prescribing Analysis — Analysis Queries on Rollups
+--
+-- The queries from analysis.sql, rewritten to read the rollup tables in
+-- rollups.sql instead of re-aggregating prescriptions. Numbering and result
+-- columns match analysis.sql. Queries that need a grain no rollup keeps
+-- (4.3 region × month, 5.3 drug × month) and the forecast queries in
+-- section 6 are unchanged and stay in analysis.sql.
+
+USE nhs_prescribing;
+
+
+
+-- SECTION 1 — NATIONAL OVERVIEW
+
+-- 1.1 Total items and total cost nationally across the entire period
+
+SELECT
+    SUM(total_items)                                AS total_items,
+    ROUND(SUM(total_nic), 2)                        AS total_cost_gbp,
+    ROUND(SUM(total_nic) / SUM(total_items), 2)     AS overall_mean_cost_per_item
+FROM rollup_national_monthly;
+
+
+-- 1.2 Total items and total cost by year — national annual summary
+
+SELECT
+    `year`,
+    SUM(total_items)                                AS total_items,
+    ROUND(SUM(total_nic), 2)                        AS total_cost_gbp,
+    ROUND(SUM(total_nic) / SUM(total_items), 2)     AS mean_cost_per_item
+FROM rollup_national_monthly
+GROUP BY `year`
+ORDER BY `year`;
+
+
+-- 1.3 Annual mean monthly cost — how average monthly spend changed per year
+
+SELECT
+    `year`,
+    ROUND(SUM(total_nic) / COUNT(*), 2)             AS mean_monthly_cost_gbp
+FROM rollup_national_monthly
+GROUP BY `year`
+ORDER BY `year`;
+
+
+-- 1.4 Annual min, max, and mean monthly cost — distribution by year
+
+SELECT
+    `year`,
+    ROUND(MIN(total_nic), 2)                        AS min_monthly_cost,
+    ROUND(MAX(total_nic), 2)                        AS max_monthly_cost,
+    ROUND(AVG(total_nic), 2)                        AS mean_monthly_cost
+FROM rollup_national_monthly
+GROUP BY `year`
+ORDER BY `year`;
+
+
+
+-- SECTION 2 — MONTHLY TRENDS
+
+
+-- 2.1 Monthly national total items and cost — full time series
+
+SELECT
+    `year_month`,
+    `year`,
+    month_name,
+    total_items,
+    ROUND(total_nic, 2)                             AS total_cost_gbp,
+    ROUND(total_nic / total_items, 2)               AS mean_cost_per_item
+FROM rollup_national_monthly
+ORDER BY `year_month`;
+
+
+-- 2.2 Year-over-year change in monthly cost
+-- Identifies when the cost reduction happened most sharply.
+
+SELECT
+    this_year.`year_month`,
+    ROUND(this_year.total_nic, 2)                                           AS current_cost,
+    ROUND(last_year.total_nic, 2)                                           AS prior_year_cost,
+    ROUND(this_year.total_nic - last_year.total_nic, 2)                     AS cost_change,
+    ROUND(
+        (this_year.total_nic - last_year.total_nic)
+        / last_year.total_nic * 100
+    , 1)                                                                    AS pct_change
+FROM rollup_national_monthly AS this_year
+LEFT JOIN rollup_national_monthly AS last_year
+    ON  this_year.`month` = last_year.`month`
+    AND this_year.`year`  = last_year.`year` + 1
+ORDER BY this_year.`year_month`;
+
+
+
+-- SECTION 3 — DRUG-LEVEL ANALYSIS
+
+
+-- 3.1 Top 10 most prescribed antidepressants by total items (2021–2025)
+
+SELECT
+    dr.bnf_chemical_substance,
+    SUM(r.total_items)                              AS total_items,
+    ROUND(SUM(r.total_nic), 2)                      AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2) AS mean_cost_per_item
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+GROUP BY dr.bnf_chemical_substance
+ORDER BY total_items DESC
+LIMIT 10;
+
+
+-- 3.2 Top 10 most expensive antidepressants by total cost (2021–2025)
+-- Highlights drugs like Venlafaxine that are expensive despite lower volume.
+
+SELECT
+    dr.bnf_chemical_substance,
+    SUM(r.total_items)                              AS total_items,
+    ROUND(SUM(r.total_nic), 2)                      AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2) AS mean_cost_per_item
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+GROUP BY dr.bnf_chemical_substance
+ORDER BY total_cost_gbp DESC
+LIMIT 10;
+
+
+-- 3.3 Items and cost percentage contribution for every drug
+-- Shows which drugs are cost-efficient vs expensive.
+
+SELECT
+    dr.bnf_chemical_substance,
+    SUM(r.total_items)                                                          AS total_items,
+    ROUND(SUM(r.total_nic), 2)                                                  AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2)                             AS mean_cost_per_item,
+    ROUND(SUM(r.total_items) * 100.0 / SUM(SUM(r.total_items)) OVER (), 2)     AS pct_of_total_items,
+    ROUND(SUM(r.total_nic)   * 100.0 / SUM(SUM(r.total_nic))   OVER (), 2)     AS pct_of_total_cost
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+GROUP BY dr.bnf_chemical_substance
+ORDER BY total_items DESC;
+
+
+-- 3.4 Annual trend for the top 5 drugs by items
+
+SELECT
+    r.`year`,
+    dr.bnf_chemical_substance,
+    r.total_items                                   AS total_items,
+    ROUND(r.total_nic, 2)                           AS total_cost_gbp
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+WHERE r.drug_id IN (
+    SELECT drug_id
+    FROM (
+        SELECT drug_id
+        FROM rollup_drug_year
+        GROUP BY drug_id
+        ORDER BY SUM(total_items) DESC
+        LIMIT 5
+    ) AS top5
+)
+ORDER BY r.`year`, total_items DESC;
+
+
+-- SECTION 4 — REGIONAL ANALYSIS
+
+
+-- 4.1 Annual items and cost by region
+
+SELECT
+    rg.region_name,
+    r.`year`,
+    r.total_items                                   AS total_items,
+    ROUND(r.total_nic, 2)                           AS total_cost_gbp,
+    ROUND(r.total_nic / r.total_items, 2)           AS mean_cost_per_item
+FROM rollup_region_year r
+JOIN regions rg ON r.region_id = rg.region_id
+ORDER BY rg.region_name, r.`year`;
+
+
+-- 4.2 Percentage change in items and cost per region (2021 vs 2025)
+-- Multiplying by 100.0 keeps the items ratio decimal on engines with integer division.
+
+SELECT
+    rg.region_name,
+    SUM(CASE WHEN r.`year` = 2021 THEN r.total_items ELSE 0 END)    AS items_2021,
+    SUM(CASE WHEN r.`year` = 2025 THEN r.total_items ELSE 0 END)    AS items_2025,
+    ROUND(
+        100.0 *
+        (SUM(CASE WHEN r.`year` = 2025 THEN r.total_items ELSE 0 END) -
+         SUM(CASE WHEN r.`year` = 2021 THEN r.total_items ELSE 0 END))
+        / SUM(CASE WHEN r.`year` = 2021 THEN r.total_items ELSE 0 END)
+    , 1)                                                             AS items_pct_change,
+    ROUND(SUM(CASE WHEN r.`year` = 2021 THEN r.total_nic ELSE 0 END), 2) AS cost_2021,
+    ROUND(SUM(CASE WHEN r.`year` = 2025 THEN r.total_nic ELSE 0 END), 2) AS cost_2025,
+    ROUND(
+        (SUM(CASE WHEN r.`year` = 2025 THEN r.total_nic ELSE 0 END) -
+         SUM(CASE WHEN r.`year` = 2021 THEN r.total_nic ELSE 0 END))
+        / SUM(CASE WHEN r.`year` = 2021 THEN r.total_nic ELSE 0 END) * 100
+    , 1)                                                             AS cost_pct_change
+FROM rollup_region_year r
+JOIN regions rg ON r.region_id = rg.region_id
+WHERE r.`year` IN (2021, 2025)
+GROUP BY rg.region_name
+ORDER BY items_pct_change DESC;
+
+
+-- SECTION 5 — SERTRALINE DEEP DIVE
+
+
+-- 5.1 Sertraline overall summary — items, cost, and contribution percentages
+
+SELECT
+    dr.bnf_chemical_substance,
+    SUM(r.total_items)                                                                      AS total_items,
+    ROUND(SUM(r.total_nic), 2)                                                              AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2)                                         AS mean_cost_per_item,
+    ROUND(SUM(r.total_items) * 100.0 / (SELECT SUM(total_items) FROM rollup_national_monthly), 2) AS pct_of_total_items,
+    ROUND(SUM(r.total_nic)   * 100.0 / (SELECT SUM(total_nic)   FROM rollup_national_monthly), 2) AS pct_of_total_cost
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+WHERE dr.bnf_chemical_substance = 'Sertraline hydrochloride'
+GROUP BY dr.bnf_chemical_substance;
+
+
+-- 5.2 Sertraline annual cost trend
+
+SELECT
+    r.`year`,
+    r.total_items                                   AS total_items,
+    ROUND(r.total_nic, 2)                           AS total_cost_gbp,
+    ROUND(r.total_nic / r.total_items, 2)           AS mean_cost_per_item
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+WHERE dr.bnf_chemical_substance = 'Sertraline hydrochloride'
+ORDER BY r.`year`;
+
+
+-- 5.4 Sertraline mean cost per item by region
+
+SELECT
+    rg.region_name,
+    SUM(r.total_items)                              AS total_items,
+    ROUND(SUM(r.total_nic), 2)                      AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2) AS mean_cost_per_item
+FROM rollup_drug_region_year r
+JOIN regions rg ON r.region_id = rg.region_id
+JOIN drugs   dr ON r.drug_id   = dr.drug_id
+WHERE dr.bnf_chemical_substance = 'Sertraline hydrochloride'
+GROUP BY rg.region_name
+ORDER BY mean_cost_per_item DESC;
+
+
+-- 5.5 All drugs — cost per item vs national average
+-- Negative pct_above_below_national_avg means cheaper than average.
+
+SELECT
+    dr.bnf_chemical_substance,
+    SUM(r.total_items)                              AS total_items,
+    ROUND(SUM(r.total_nic), 2)                      AS total_cost_gbp,
+    ROUND(SUM(r.total_nic) / SUM(r.total_items), 2) AS mean_cost_per_item,
+    ROUND(
+        (SUM(r.total_nic) / SUM(r.total_items)) /
+        (SELECT SUM(total_nic) / SUM(total_items) FROM rollup_national_monthly)
+        * 100 - 100
+    , 1)                                            AS pct_above_below_national_avg
+FROM rollup_drug_year r
+JOIN drugs dr ON r.drug_id = dr.drug_id
+GROUP BY dr.bnf_chemical_substance
+ORDER BY total_items DESC
+LIMIT 10;
@@ -3,9 +3,10 @@
 --
 -- Run AFTER schema.sql has been executed and the
 -- nhs_prescribing database already exists.
--- Creates a single forecast table to store the Prophet model output
--- generated by forecast.py. One row per calendar month covering both
--- the historical fitted period and the 12-month forward forecast.
+-- Creates the forecast table to store the Prophet model output
+-- generated by forecast.py, and forecast_detail for its drug × region
+-- forecasts. Both cover the historical fitted period and the 12-month
+-- forward forecast.
 --
 -- Power BI connects to this table alongside the existing star schema.
 -- The year_month column joins to dates.year_month for the historical
@@ -64,4 +65,49 @@ ENGINE = InnoDB
 DEFAULT CHARSET = utf8mb4
 COMMENT = 'Prophet 12-month forecast for national antidepressant items, NIC and cost per item. Generated by forecast.py.';
 
+
+-- forecast_detail
+-- One row per calendar month per region per drug — the drug × region
+-- forecasts from forecast.py (FORECAST_DETAIL), reconciled so that for
+-- every month they sum to the national figures in the forecast table.
+-- region_id and drug_id join to the regions and drugs tables; year_month
+-- joins to dates.year_month for the historical period only, so as with
+-- forecast no foreign keys are enforced.
+--
+-- Example forecast row:
+--   year_month='2026-01', region_id=1, drug_id=1, actual_items=NULL,
+--   actual_nic=NULL, items_forecast=185000.00, nic_forecast=310000.00,
+--   is_forecast=1
+
+CREATE TABLE IF NOT EXISTS forecast_detail (
+    forecast_detail_id INT          NOT NULL AUTO_INCREMENT,
+    `year_month`   VARCHAR(7)      NOT NULL,               -- e.g. '2026-01'
+    region_id      INT             NOT NULL,
+    drug_id        INT             NOT NULL,
+
+    -- Actual observed values (NULL for future forecast months)
+    actual_items   BIGINT                   DEFAULT NULL,
+    actual_nic     DECIMAL(15, 2)           DEFAULT NULL,
+
+    -- Reconciled items forecast with 80% confidence interval
+    items_forecast DECIMAL(15, 2)  NOT NULL,
+    items_lower    DECIMAL(15, 2)  NOT NULL,
+    items_upper    DECIMAL(15, 2)  NOT NULL,
+
+    -- Reconciled NIC (cost) forecast with 80% confidence interval
+    nic_forecast   DECIMAL(15, 2)  NOT NULL,
+    nic_lower      DECIMAL(15, 2)  NOT NULL,
+    nic_upper      DECIMAL(15, 2)  NOT NULL,
+
+    -- 1 = future forecast month, 0 = historical fitted month
+    is_forecast    TINYINT(1)      NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (forecast_detail_id),
+    UNIQUE KEY uq_forecast_detail (`year_month`, region_id, drug_id),
+    INDEX idx_forecast_detail_drug (drug_id, region_id)
+)
+ENGINE = InnoDB
+DEFAULT CHARSET = utf8mb4
+COMMENT = 'Prophet drug x region forecasts reconciled to the national forecast. Generated by forecast.py.';
+
 SHOW TABLES;
\ No newline at end of file
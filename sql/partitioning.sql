@@ -0,0 +1,57 @@
+
+-- NHS Antidepressant Prescribing Analysis — Partitioned Fact Table (optional)
+--
+-- MySQL only. Replaces the prescriptions table from schema.sql with one
+-- partitioned by month (LIST on date_id, one partition per month).
+--
+-- What changes compared with schema.sql:
+--   - The primary key is the natural key (date_id, region_id, drug_id).
+--     MySQL requires every unique key of a partitioned table to include
+--     the partitioning column, so the prescription_id surrogate is dropped.
+--   - No foreign keys — MySQL does not support them on partitioned tables.
+--     loader.py only inserts rows whose dimension IDs it has resolved.
+--   - The same covering indexes as schema.sql.
+--
+-- loader.py detects the partitioned table. It adds a partition for each
+-- new month before loading, whatever the load mode. In bulk mode
+-- (LOADER_BULK_LOAD=true) it also loads each month into an unindexed
+-- exchange table, builds that table's indexes once, and swaps it in with
+-- ALTER TABLE ... EXCHANGE PARTITION. A month is therefore
+-- replaced as a whole by the staged data. Queries that filter on date_id
+-- only read the partitions they need.
+--
+-- Migrating an existing database:
+--   1. RENAME TABLE prescriptions TO prescriptions_unpartitioned;
+--   2. Run this script.
+--   3. TRUNCATE TABLE load_state;   (so upsert mode reloads every month)
+--   4. python loader.py             (adds a partition per month and reloads
+--                                    every month from the staged CSV, in any
+--                                    load mode)
+--   5. DROP TABLE prescriptions_unpartitioned; once the data is checked.
+--
+-- Example row:
+--   date_id=1, region_id=1, drug_id=1, items=45231, nic=107248.43
+
+USE nhs_prescribing;
+
+CREATE TABLE IF NOT EXISTS prescriptions (
+    date_id          INT             NOT NULL,
+    region_id        INT             NOT NULL,
+    drug_id          INT             NOT NULL,
+    items            INT             NOT NULL,       -- number of items prescribed
+    nic              DECIMAL(12, 2)  NOT NULL,       -- net ingredient cost in GBP
+
+    PRIMARY KEY (date_id, region_id, drug_id),
+
+    -- Covering indexes for the drug-first and region-first analysis queries
+    INDEX idx_prescriptions_drug   (drug_id,   region_id, date_id, items, nic),
+    INDEX idx_prescriptions_region (region_id, date_id,   drug_id, items, nic)
+)
+ENGINE = InnoDB
+PARTITION BY LIST (date_id) (
+    -- A LIST-partitioned table needs at least one partition; loader.py adds
+    -- p<date_id> for every month it loads. date_id 0 is never used.
+    PARTITION p0 VALUES IN (0)
+);
+
+SHOW TABLES;
@@ -0,0 +1,84 @@
+
+-- NHS Antidepressant Prescribing Analysis — Rollup Tables
+--
+-- Run AFTER schema.sql has been executed and the
+-- nhs_prescribing database already exists.
+-- Creates four pre-aggregated summaries of the prescriptions fact table.
+-- loader.py keeps them current: after each load it recomputes only the
+-- months (national monthly) and years (the three yearly rollups) that the
+-- load touched, so analysis queries and Power BI refreshes no longer
+-- re-aggregate the whole fact table.
+--
+-- sql/analysis_rollups.sql holds the analysis.sql queries rewritten to
+-- read these tables.
+
+USE nhs_prescribing;
+
+-- rollup_national_monthly
+-- One row per month — national totals, with the date attributes copied in
+-- so no join to dates is needed.
+-- Example row:
+--   date_id=1, year_month='2021-01', year=2021, month=1, month_name='January',
+--   total_items=6500000, total_nic=25200000.00
+
+CREATE TABLE IF NOT EXISTS rollup_national_monthly (
+    date_id        INT             NOT NULL,
+    `year_month`   VARCHAR(7)      NOT NULL,
+    `year`         INT             NOT NULL,
+    `month`        INT             NOT NULL,
+    month_name     VARCHAR(10)     NOT NULL,
+    total_items    BIGINT          NOT NULL,
+    total_nic      DECIMAL(15, 2)  NOT NULL,
+
+    PRIMARY KEY (date_id),
+    INDEX idx_rollup_national_monthly_year (`year`)
+);
+
+
+-- rollup_region_year
+-- One row per region per year. months = number of months loaded that year.
+-- Example row:
+--   region_id=1, year=2021, total_items=900000, total_nic=3500000.00, months=12
+
+CREATE TABLE IF NOT EXISTS rollup_region_year (
+    region_id      INT             NOT NULL,
+    `year`         INT             NOT NULL,
+    total_items    BIGINT          NOT NULL,
+    total_nic      DECIMAL(15, 2)  NOT NULL,
+    months         INT             NOT NULL,
+
+    PRIMARY KEY (region_id, `year`)
+);
+
+
+-- rollup_drug_year
+-- One row per drug per year.
+-- Example row:
+--   drug_id=1, year=2021, total_items=2300000, total_nic=4100000.00
+
+CREATE TABLE IF NOT EXISTS rollup_drug_year (
+    drug_id        INT             NOT NULL,
+    `year`         INT             NOT NULL,
+    total_items    BIGINT          NOT NULL,
+    total_nic      DECIMAL(15, 2)  NOT NULL,
+
+    PRIMARY KEY (drug_id, `year`)
+);
+
+
+-- rollup_drug_region_year
+-- One row per drug per region per year.
+-- Example row:
+--   drug_id=1, region_id=1, year=2021, total_items=320000, total_nic=580000.00
+
+CREATE TABLE IF NOT EXISTS rollup_drug_region_year (
+    drug_id        INT             NOT NULL,
+    region_id      INT             NOT NULL,
+    `year`         INT             NOT NULL,
+    total_items    BIGINT          NOT NULL,
+    total_nic      DECIMAL(15, 2)  NOT NULL,
+
+    PRIMARY KEY (drug_id, region_id, `year`)
+);
+
+SHOW TABLES;
@@ -1,11 +1,12 @@
 
 -- NHS Antidepressant Prescribing Analysis — Database Schema
--- This script creates the nhs_prescribing database and all four tables
--- using a star schema design.
+-- This script creates the nhs_prescribing database, the four star schema
+-- tables and the load_state bookkeeping table used by loader.py.
 -- Execution order:
 --   1. Create database
 --   2. Create dimension tables (dates, regions, drugs)
 --   3. Create fact table last (references all three lookup tables)
+--   4. Create load_state (no foreign keys)
 
 -- Database
 
@@ -80,7 +81,37 @@ CREATE TABLE IF NOT EXISTS prescriptions (
     FOREIGN KEY (drug_id)   REFERENCES drugs(drug_id),
 
     -- Prevents duplicate records on re-run
-    UNIQUE KEY uq_prescription (date_id, region_id, drug_id)
+    UNIQUE KEY uq_prescription (date_id, region_id, drug_id),
+
+    -- Back the region and drug foreign keys on their own. InnoDB refuses
+    -- to drop an index a foreign key depends on, so without these the
+    -- covering indexes below could not be dropped for bulk loads.
+    INDEX idx_prescriptions_region_fk (region_id),
+    INDEX idx_prescriptions_drug_fk   (drug_id),
+
+    -- Covering indexes for the drug-first and region-first queries in
+    -- analysis.sql (sections 3 to 5), so they read the index instead of
+    -- the table. loader.py drops and rebuilds them around large bulk loads.
+    INDEX idx_prescriptions_drug   (drug_id,   region_id, date_id, items, nic),
+    INDEX idx_prescriptions_region (region_id, date_id,   drug_id, items, nic)
+);
+
+
+-- load_state
+-- One row per month loaded into prescriptions in upsert mode
+-- (LOADER_UPSERT=true). content_hash is the SHA-256 of that month's staged
+-- rows; a month is only re-sent when its hash changes.
+-- Example row:
+--   year_month='2021-01', content_hash='9f86d0…', row_count=224,
+--   loaded_at='2026-10-17 09:30:00'
+
+CREATE TABLE IF NOT EXISTS load_state (
+    `year_month`     VARCHAR(7)  NOT NULL,     -- format: YYYY-MM
+    content_hash     CHAR(64)    NOT NULL,     -- hex SHA-256 of the month's rows
+    row_count        INT         NOT NULL,
+    loaded_at        DATETIME    NOT NULL,
+
+    PRIMARY KEY (`year_month`)
 );
 
 SHOW TABLES;
\ No newline at end of file
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    # processor.py creates pca_data/logs relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    import processor
+    return processor
+
+
+def test_map_categories_all_missing(processor):
+    values = pd.Series([np.nan, np.nan], dtype=object)
+
+    result = processor.map_categories(values, lambda s: s.str.strip())
+
+    assert result.isna().all()
+    assert len(result.cat.categories) == 0
+
+
+def test_chunk_without_code_column(processor):
+    # A baseline-format combined CSV has no BNF_CHEMICAL_SUBSTANCE_CODE;
+    # iter_csv_chunks() adds it back as an empty column
+    chunk = pd.DataFrame({
+        'YEAR_MONTH'            : [202101, 202101, 202101],
+        'REGION_NAME'           : ['LONDON', 'LONDON ', 'NORTH WEST'],
+        'BNF_CHEMICAL_SUBSTANCE': ['Sertraline hydrochloride'] * 2 + ['Paracetamol'],
+        'ITEMS'                 : [10, 5, 7],
+        'NIC'                   : [1.25, 2.50, 3.00],
+    }).reindex(columns=processor.INPUT_COLUMNS)
+
+    aggregates = processor.clean_and_aggregate(
+        chunk, processor.compile_cohorts(), log=lambda message: None
+    )
+    staged = processor.finalise_staged(aggregates['antidepressants'])
+
+    assert staged.to_dict('records') == [{
+        'YEAR'                  : 2021,
+        'YEAR_MONTH'            : '2021-01',
+        'REGION_NAME'           : 'London',
+        'BNF_CHEMICAL_SUBSTANCE': 'Sertraline hydrochloride',
+        'ITEMS'                 : 15,
+        'NIC'                   : 3.75,
+    }]